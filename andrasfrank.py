@@ -1,5 +1,44 @@
 import networkx as nx
 import heapq
+import numpy as np
+
+from csr import CSRDigraph
+from structures import NIL, LaminarForest, LaminarSigma, SkewHeap, ZeroArcComponents
+from tracing import (
+    AF_ARC_ADDED,
+    AF_ARCS_ENTERING,
+    AF_DRAW_DZERO_INITIAL,
+    AF_DRAW_METHOD1,
+    AF_DRAW_METHOD2,
+    AF_DRAW_PARTIAL,
+    AF_DRAW_PHASE2_FINAL,
+    AF_DRAW_PHASE2_INITIAL,
+    AF_DRAW_SCC,
+    AF_DUAL_ALL,
+    AF_DUAL_FAILED,
+    AF_DUAL_SATISFIED,
+    AF_DUAL_START,
+    AF_F_SIGMA,
+    AF_IN_ARCS,
+    AF_ITERATION,
+    AF_NO_ARBORESCENCE,
+    AF_PHASE1_DONE,
+    AF_PHASE1_START,
+    AF_PHASE2_DONE,
+    AF_PHASE2_START,
+    AF_PHASE2_V2_DONE,
+    AF_PHASE2_V2_START,
+    AF_PROCESS_SOURCE,
+    AF_QUEUE_INIT,
+    AF_QUEUE_PUSHED,
+    AF_RESULT_FAILED,
+    AF_RESULT_OK,
+    AF_SINGLE_SOURCE,
+    AF_SKIP_ROOT_SOURCE,
+    AF_SOURCES,
+    AF_START,
+    get_sink,
+)
 
 def get_in_arcs(D: nx.DiGraph, X: set, **kwargs):
     """
@@ -10,6 +49,7 @@ def get_in_arcs(D: nx.DiGraph, X: set, **kwargs):
     - D: directed graph (DiGraph)
     - X: set of nodes
     - **kwargs: Additional parameters:
+        - trace: Optional event sink (see tracing.get_sink)
         - log: Optional logging function
         - boilerplate: If True, enables logging (default: True)
         - lang: Language for messages ("en" or "pt", default: "pt")
@@ -17,21 +57,14 @@ def get_in_arcs(D: nx.DiGraph, X: set, **kwargs):
     Returns:
     - arcs: list of tuples (u, v, data) where u not in X and v in X
     """
-    log = kwargs.get("log", None)
-    boilerplate = kwargs.get("boilerplate", True)
-    lang = kwargs.get("lang", "pt")
+    trace = get_sink(kwargs)
 
-    arcs = []
+    arcs = [(u, v, data) for u, v, data in D.edges(data=True) if u not in X and v in X]
 
-    if boilerplate and log:
-        if lang == "en":
-            log(f" andras_frank: Found {len(arcs)} arcs entering set X={X}")
-        elif lang == "pt":
-            log(
-                f" andras_frank: Encontrados {len(arcs)} arcos entrando no conjunto X={X}"
-            )
+    if trace:
+        trace(AF_IN_ARCS, len(arcs), X)
 
-    return [(u, v, data) for u, v, data in D.edges(data=True) if u not in X and v in X]
+    return arcs
 
 def update_weights(
     D: nx.DiGraph,
@@ -49,6 +82,7 @@ def update_weights(
         - F: list to store the arcs that reach weight zero
         - D_zero: directed graph (DiGraph) to store the arcs that reach weight zero
         - **kwargs: Additional parameters:
+            - trace: Optional event sink (see tracing.get_sink)
             - log: Optional logging function
             - boilerplate: If True, enables logging (default: True)
             - lang: Language for messages ("en" or "pt", default: "pt")
@@ -62,456 +96,756 @@ def update_weights(
             a = (u, v)
     return a
 
-def has_arborescence(D: nx.DiGraph, r: int):
+def get_in_arcs_csr(D: CSRDigraph, X: set[int]):
+    """
+    Get the ids of the arcs entering a set X of integer vertices in a CSRDigraph D,
+    in arc order.
+
+    Parameters:
+        - D: directed graph (CSRDigraph)
+        - X: set of integer vertex ids
+
+    Returns:
+        - arcs: NumPy array with the ids of the arcs (u, v) where u not in X and v in X
+    """
+    inside = np.zeros(D.n, dtype=bool)
+    inside[list(X)] = True
+    return np.flatnonzero(inside[D.dst] & ~inside[D.src])
+
+def update_weights_csr(w: np.ndarray, arcs: np.ndarray, min_weight: float):
+    """
+    Subtract min_weight from the weights w of the given arcs.
+    ATTENTION: The function updates w in place.
+
+    Parameters:
+        - w: array with the current weight of every arc
+        - arcs: ids of the arcs entering X
+        - min_weight: minimum weight to be subtracted from the arcs weights
+
+    Returns:
+        - The id of the last arc, in arc order, whose weight reached zero
+    """
+    w[arcs] -= min_weight
+    return arcs[w[arcs] == 0][-1].item()
+
+def update_weights_overlay(w: list, arcs: list[int], min_weight: float):
+    """
+    Subtract min_weight from the weights w of the given arcs, as
+    update_weights does on the graph itself. w is an overlay of reduced
+    weights indexed by arc id, so the graph is left untouched.
+    ATTENTION: The function updates w in place.
+
+    Parameters:
+        - w: list with the current weight of every arc
+        - arcs: ids of the arcs entering X, in arc order
+        - min_weight: minimum weight to be subtracted from the arcs weights
+
+    Returns:
+        - The id of the last arc, in arc order, whose weight reached zero
+    """
+    for e in arcs:
+        w[e] -= min_weight
+        if w[e] == 0:
+            a = e
+    return a
+
+def edge_data_of(D: nx.DiGraph | CSRDigraph, u, v) -> dict:
+    """
+    Return the attributes of the arc (u, v) of D.
+
+    Parameters:
+        - D: directed graph (DiGraph or CSRDigraph)
+        - u, v: tail and head of the arc
+
+    Returns:
+        - dict with the arc attributes (only "w" for a CSRDigraph)
+    """
+    if isinstance(D, CSRDigraph):
+        return {"w": D.weight_of(u, v)}
+    return D.get_edge_data(u, v)
+
+def has_arborescence(D: nx.DiGraph | CSRDigraph, r: int):
     """
     Check if a directed graph D has an arborescence with root r.
     The function returns True if an arborescence exists, otherwise False.
 
     Parameters:
-        - D: directed graph (DiGraph)
+        - D: directed graph (DiGraph or CSRDigraph)
         - r: root node
 
     Returns:
         - bool: True if an arborescence exists, otherwise False
     """
+    if isinstance(D, CSRDigraph):
+        return bool(D.reachable_from(r).all())
+
     # Verify if the graph is a DFS tree with root r
     tree = nx.dfs_tree(D, r)
 
     return tree.number_of_nodes() == D.number_of_nodes()
 
 def phase1(
-    D_original: nx.DiGraph,
+    D_original: nx.DiGraph | CSRDigraph,
     r: int,
     **kwargs,
 ):
     """
     Find the minimum arborescence in a directed graph D with root r.
     The function returns the minimum arborescence as a list of arcs.
+    The strongly connected components of D_zero and their sources are kept up
+    to date arc by arc (ZeroArcComponents) instead of recomputing the
+    condensation every iteration. The same structure indexes the arcs entering
+    each component, so finding the arcs entering X costs about the size of the
+    in-edge lists of X rather than a scan of every edge (get_in_arcs).
+    D_original is not copied nor modified: the reduced weights are an overlay
+    indexed by arc id, a list for a DiGraph (update_weights_overlay) and a
+    NumPy array updated with vectorized operations for a CSRDigraph; sigma
+    still uses the original vertices.
+
+    With engine="heap" there is no overlay: each component owns a skew heap
+    of the arcs entering it, keyed by their reduced weight, and subtracting
+    z(X) is a lazy offset on the heap of X. Merging components melds their heaps and
+    the arcs that became internal are discarded when they reach the top, so
+    phase 1 runs in O(E log V). Ties go to the arc that comes last in edge
+    order, as with update_weights, so sigma is the same for every engine.
+
+    With engine="batch" each iteration handles all its sources in one NumPy
+    pass over the arcs: given the component of every vertex, the arcs whose
+    head lies in a source and whose tail does not are grouped by that source,
+    np.minimum.at gives each z(X), the weights are reduced at once and
+    np.maximum.at picks the last zero arc of each source. Within an
+    iteration the sources are disjoint and stay sources, and the arcs
+    entering one are never touched by another, so the choices do not depend
+    on the order; the arcs are then added in the order of the sources.
+
+    sigma is returned as a LaminarSigma: each set X only records its arc,
+    z(X), its size and the sets it was merged from, so sigma takes
+    O(n + |sigma|) memory. Iterating over it still gives the (a, X, z(X))
+    tuples, building each X when it is reached.
 
     Parameters:
-        - D_original: directed graph (DiGraph)
+        - D_original: directed graph (DiGraph or CSRDigraph)
         - r: root node
         - **kwargs: Additional parameters:
+            - trace: Optional event sink (see tracing.get_sink)
             - draw_fn: Optional drawing function
             - log: Optional logging function
             - boilerplate: If True, enables logging (default: True)
             - lang: Language for messages ("en" or "pt", default: "pt")
             - metrics: Optional dict to collect algorithm metrics
+            - engine: "index" (default), "heap" or "batch"
 
     Returns:
-        - sigma: list of tuples (X, z(X))
+        - sigma: LaminarSigma of the tuples (a, X, z(X))
     """
 
 
     # Extract parameters from kwargs with defaults
-    draw_fn = kwargs.get("draw_fn", None)
-    log = kwargs.get("log", None)
-    boilerplate = kwargs.get("boilerplate", True)
+    trace = get_sink(kwargs)
     lang = kwargs.get("lang", "pt")
     metrics = kwargs.get("metrics", None)
-
-    D_copy = D_original.copy()
-    sigma = []  # List to store the variables (a, X, z(X))
-    D_zero = nx.DiGraph()
-    D_zero.add_nodes_from(D_copy.nodes())
+    engine = kwargs.get("engine", "index")
+
+    if lang == "en":
+        assert engine in ("index", "heap", "batch"), f"\n andras_frank: Unknown engine '{engine}'."
+    elif lang == "pt":
+        assert engine in ("index", "heap", "batch"), f"\n andras_frank: Motor desconhecido '{engine}'."
+    heap = engine == "heap"
+    batch = engine == "batch"
+
+    # D_original is never modified: the reduced weights live in w, indexed
+    # by arc id in edge order (or in the heaps, with engine="heap")
+    csr = isinstance(D_original, CSRDigraph)
+    if csr:
+        nodes = D_original.nodes
+        root = D_original.index[r]
+        src, dst = D_original.src.tolist(), D_original.dst.tolist()
+        w = D_original.weight.tolist() if heap else D_original.weight.copy()
+    else:
+        nodes = list(D_original.nodes())
+        index = {v: i for i, v in enumerate(nodes)}
+        root = index[r]
+        edges = list(D_original.edges(data="w"))
+        src = [index[u] for u, _, _ in edges]
+        dst = [index[v] for _, v, _ in edges]
+        w = [c for _, _, c in edges]
+
+    if heap:
+        m = len(src)
+        in_arcs = [[] for _ in nodes]
+        for e, v in enumerate(dst):
+            in_arcs[v].append(e)
+
+        # Items are m - 1 - e so that ties on the weight go to the last arc
+        pool = SkewHeap()
+        heap_of = []
+        for ids in in_arcs:
+            ids.sort(key=lambda e: (w[e], -e))
+            heap_of.append(pool.chain([w[e] for e in ids], [m - 1 - e for e in ids]))
+    elif batch:
+        # Arc arrays for the vectorized rounds; comp[v] is the representative
+        # of the component of v, relabelled on each merge
+        src_a = np.asarray(src, dtype=np.int64)
+        dst_a = np.asarray(dst, dtype=np.int64)
+        w = np.array(w)
+        comp = np.arange(len(nodes))
+        is_source = np.zeros(len(nodes), dtype=bool)
+
+    # The variables (a, X, z(X)) as a laminar forest; entry[c] is the set of
+    # component c in sigma and merged_from lists the sets merged into a new
+    # component until it enters sigma itself
+    sigma = LaminarSigma()
+    entry = [NIL] * len(nodes)
+    merged_from = {}
+
+    # The components of D_zero are kept up to date as its arcs are added, over
+    # integer vertex ids, together with the arcs entering each of them;
+    # D_zero itself is only built to be drawn
+    components = ZeroArcComponents(len(nodes), None if heap or batch else dst)
+    D_zero = None
+    if trace:
+        D_zero = nx.DiGraph()
+        D_zero.add_nodes_from(nodes)
 
     iteration = 0
 
-    if boilerplate and log:
-        if lang == "en":
-            log(f"\n andras_frank: Phase 1 - Starting the algorithm")
-            log(
-                f" andras_frank: Graph has {D_copy.number_of_nodes()} nodes and {D_copy.number_of_edges()} edges"
-            )
-            log(f" andras_frank: Root node: {r}")
-        elif lang == "pt":
-            log(f"\n andras_frank: Fase 1 - Iniciando algoritmo")
-            log(
-                f" andras_frank: Grafo possui {D_copy.number_of_nodes()} nós e {D_copy.number_of_edges()} arestas"
-            )
-            log(f" andras_frank: Nó raiz: {r}")
-
-    if boilerplate and draw_fn:
-        if lang == "en":
-            draw_fn(D_zero, title="Initial D_zero")
-        elif lang == "pt":
-            draw_fn(D_zero, title="D_zero Inicial")
+    if trace:
+        trace(
+            AF_PHASE1_START,
+            D_original.number_of_nodes(),
+            D_original.number_of_edges(),
+            r,
+        )
+        trace(AF_DRAW_DZERO_INITIAL, D_zero)
 
     while True:
         iteration += 1
-        if boilerplate and log:
-            if lang == "en":
-                log(f"\nIteration {iteration} ----------------------------")
-            elif lang == "pt":
-                log(f"\nIteração {iteration} ----------------------------")
-
-        # Calculate the strongly connected components of the graph D_zero.
-        C = nx.condensation(D_zero)
-        if boilerplate and draw_fn:
-            if lang == "en":
-                draw_fn(
-                    C,
-                    title=f"Strongly connected components in D_zero - Iteration {iteration}",
-                )
-            elif lang == "pt":
-                draw_fn(
-                    C,
-                    title=f"Componentes fortemente conexos em D_zero - Iteração {iteration}",
-                )
-
-        # The sources are where there are no incoming arcs, r is always a source.
-        sources = [x for x in C.nodes() if C.in_degree(x) == 0]
-
-        if boilerplate and log:
-            if lang == "en":
-                log(f"\nSources: {sources}")
-            elif lang == "pt":
-                log(f"\nFontes: {sources}")
-
-        if len(sources) == 1:
+        if trace:
+            trace(AF_ITERATION, iteration)
+
+        if trace:
+            trace(AF_DRAW_SCC, D_zero, iteration)
+
+        # The sources are the components no arc enters, r is always a source.
+        # A source is named by the vertex representing its component. They are
+        # handled by their smallest vertex, the order nx.condensation gives them
+        sources = sorted(components.sources, key=components.least.__getitem__)
+
+        if trace:
+            trace(AF_SOURCES, [nodes[x] for x in sources])
+
+        if len(components.sources) == 1:
             # If there is only one source, it means it is r and there are no more arcs to be processed.
-            if boilerplate and log:
-                if lang == "en":
-                    log(f"\nOnly one source found, algorithm finished.")
-                elif lang == "pt":
-                    log(f"\nApenas uma fonte encontrada, algoritmo finalizado.")
+            if trace:
+                trace(AF_SINGLE_SOURCE)
             break
 
+        root_source = components.find(root)
+
+        if batch:
+            # The candidate arcs enter a source other than the root's from outside it
+            is_source[:] = False
+            is_source[sources] = True
+            is_source[root_source] = False
+            heads = comp[dst_a]
+            candidates = np.flatnonzero(is_source[heads] & (comp[src_a] != heads))
+            heads = heads[candidates]
+            if trace:
+                weights = w[candidates]
+
+            # z starts at one candidate weight of each source
+            z = np.zeros(len(nodes), dtype=w.dtype)
+            z[heads] = w[candidates]
+            np.minimum.at(z, heads, w[candidates])
+            w[candidates] -= z[heads]
+            zero = w[candidates] == 0
+            chosen = np.full(len(nodes), NIL, dtype=np.int64)
+            np.maximum.at(chosen, heads[zero], candidates[zero])
+
         for u in sources:
-            X = C.nodes[u]["members"]
-            if r in X:
-                if boilerplate and log:
-                    if lang == "en":
-                        log(f" andras_frank: Skipping source {u} (contains root {r})")
-                    elif lang == "pt":
-                        log(f" andras_frank: Ignorando fonte {u} (contém raiz {r})")
+            if u == root_source:
+                if trace:
+                    trace(AF_SKIP_ROOT_SOURCE, nodes[u], r)
                 continue
 
-            if boilerplate and log:
-                if lang == "en":
-                    log(f"\n andras_frank: Processing source {u} with set X={X}")
-                elif lang == "pt":
-                    log(f"\n andras_frank: Processando fonte {u} com conjunto X={X}")
+            X_ids = components.members[u]
+            X = {nodes[x] for x in X_ids} if trace else None
+
+            if trace:
+                trace(AF_PROCESS_SOURCE, nodes[u], X)
 
-            arcs = get_in_arcs(D_copy, X, **kwargs)
+            if heap:
+                # Discard the arcs that became internal to X
+                h = heap_of[u]
+                while h != NIL:
+                    min_weight, item = pool.top(h)
+                    e = m - 1 - item
+                    if components.find(src[e]) != u:
+                        break
+                    h = pool.pop(h)
 
-            if boilerplate and log:
                 if lang == "en":
-                    log(
-                        f" andras_frank: Arcs entering X: {[(u, v, data['w']) for u, v, data in arcs]}"
+                    assert h != NIL, f"\n andras_frank: No arc enters X={ {nodes[x] for x in X_ids} }."
+                elif lang == "pt":
+                    assert h != NIL, f"\n andras_frank: Nenhum arco entra em X={ {nodes[x] for x in X_ids} }."
+
+                pool.add(h, -min_weight)
+                heap_of[u] = h
+                s, t = src[e], dst[e]
+            elif batch:
+                if trace:
+                    mine = heads == u
+                    if not csr:
+                        trace(AF_IN_ARCS, int(np.count_nonzero(mine)), X)
+                    trace(
+                        AF_ARCS_ENTERING,
+                        [
+                            (nodes[src[e]], nodes[dst[e]], {"w": c})
+                            for e, c in zip(
+                                candidates[mine].tolist(), weights[mine].tolist()
+                            )
+                        ],
                     )
+
+                e = chosen[u].item()
+                if lang == "en":
+                    assert e != NIL, f"\n andras_frank: No arc enters X={ {nodes[x] for x in X_ids} }."
                 elif lang == "pt":
-                    log(
-                        f" andras_frank: Arcos entrando em X: {[(u, v, data['w']) for u, v, data in arcs]}"
+                    assert e != NIL, f"\n andras_frank: Nenhum arco entra em X={ {nodes[x] for x in X_ids} }."
+
+                min_weight = z[u].item()
+                s, t = src[e], dst[e]
+            elif csr:
+                arcs = np.array(components.entering_arcs(u, src), dtype=np.int64)
+
+                if trace:
+                    trace(
+                        AF_ARCS_ENTERING,
+                        [
+                            (nodes[s], nodes[t], {"w": c})
+                            for s, t, c in zip(
+                                D_original.src[arcs].tolist(),
+                                D_original.dst[arcs].tolist(),
+                                w[arcs].tolist(),
+                            )
+                        ],
+                    )
+
+                min_weight = w[arcs].min().item()
+                e = update_weights_csr(w, arcs, min_weight)
+                s, t = src[e], dst[e]
+            else:
+                arcs = components.entering_arcs(u, src)
+
+                if trace:
+                    trace(AF_IN_ARCS, len(arcs), X)
+                    trace(
+                        AF_ARCS_ENTERING,
+                        [(edges[e][0], edges[e][1], {"w": w[e]}) for e in arcs],
                     )
 
-            min_weight = min(data["w"] for _, _, data in arcs)
+                min_weight = min(w[e] for e in arcs)
 
-            a = update_weights(D_copy, arcs, min_weight)
+                e = update_weights_overlay(w, arcs, min_weight)
+                s, t = src[e], dst[e]
 
-            D_zero.add_edge(a[0], a[1])
+            # X is a single vertex or the union of the sets merged into it
+            entry[u] = sigma.append(
+                (nodes[s], nodes[t]),
+                min_weight,
+                len(X_ids),
+                merged_from.pop(u, ()),
+                nodes[u] if len(X_ids) == 1 else None,
+            )
 
-            sigma.append((a, X, min_weight))
+            merged = components.add_arc(s, t)
+            if merged:
+                rep = components.find(t)
+                merged_from[rep] = [entry[rep]] + [entry[c] for c in merged if c != rep]
+                if heap:
+                    h = NIL
+                    for c in merged:
+                        h = pool.meld(h, heap_of[c])
+                    heap_of[rep] = h
+                elif batch:
+                    # The members of the other components were appended to rep's
+                    k = sum(sigma.size[entry[c]] for c in merged if c != rep)
+                    comp[components.members[rep][-k:]] = rep
+            if trace:
+                D_zero.add_edge(nodes[s], nodes[t])
 
     # Collect metrics if requested
     if metrics is not None:
         metrics["phase1_iterations"] = iteration
-        metrics["d0_edges"] = D_zero.number_of_edges()
-        metrics["d0_nodes"] = D_zero.number_of_nodes()
+        metrics["d0_edges"] = components.arcs
+        metrics["d0_nodes"] = len(nodes)
         metrics["dual_count"] = len(sigma)
 
-    if boilerplate and log:
-        if lang == "en":
-            log(f"\n andras_frank: Phase 1 completed in {iteration} iterations")
-            log(f" andras_frank: sigma has {len(sigma)} variables")
-        elif lang == "pt":
-            log(f"\n andras_frank: Fase 1 concluída em {iteration} iterações")
-            log(f" andras_frank: sigma possui {len(sigma)} variáveis")
+    if trace:
+        trace(AF_PHASE1_DONE, iteration, len(sigma))
 
     return sigma
 
-def phase2(D_original: nx.DiGraph, r: int, F: list[tuple[int, int]], **kwargs):
+def phase2_order(F: list[tuple[int, int]], r: int):
+    """
+    Yield the arcs of F in the order phase2 adds them: each one is the first
+    arc of F whose tail is already reached from r and whose head is not.
+    F is scanned once, from start to end. An arc that the scan passed while
+    its tail was still unreached is pushed on a heap of arc positions when its
+    tail is reached; such an arc comes before every arc the scan has not seen,
+    so the heap is served first. This takes O(n + |F| + B log B), where B is
+    the number of arcs that go through the heap. The served positions are not
+    monotone, so a forward-only bucket cursor cannot replace the heap; on the
+    F of phase 1, B is close to |F|.
+
+    Parameters:
+        - F: list of arcs (u, v), in the order phase 1 added them
+        - r: root node
+
+    Returns:
+        - Iterator over the arcs (u, v) that form the arborescence
+    """
+    out = {}
+    for i, (u, _) in enumerate(F):
+        out.setdefault(u, []).append(i)
+
+    reached = {r}
+    behind = []  # positions, before the scan, of arcs whose tail is reached
+    m = len(F)
+    p = 0
+
+    while True:
+        while behind and F[behind[0]][1] in reached:
+            heapq.heappop(behind)
+        if behind:
+            i = heapq.heappop(behind)
+        else:
+            while p < m and (F[p][0] not in reached or F[p][1] in reached):
+                p += 1
+            if p == m:
+                return
+            i = p
+            p += 1
+
+        u, v = F[i]
+        reached.add(v)
+        # Arcs of v from p on will be met by the scan
+        for j in out.get(v, ()):
+            if j >= p:
+                break
+            heapq.heappush(behind, j)
+        yield u, v
+
+def phase2(
+    D_original: nx.DiGraph | CSRDigraph, r: int, F: list[tuple[int, int]], **kwargs
+):
     """
     Find the minimum arborescence in a directed graph D with root r.
     The function returns the minimum arborescence as a DiGraph.
+    Each pass rescans F from the start for the first arc that leaves the
+    arborescence, which is O(n·|F|). With linear=True the arcs come from
+    phase2_order instead, which yields exactly the same arcs in the same order.
 
     Parameters:
-        - D_original: directed graph (DiGraph)
+        - D_original: directed graph (DiGraph or CSRDigraph)
         - r: root node
         - F: list of arcs (u, v) that form the minimum arborescence
         - **kwargs: Additional parameters:
+            - trace: Optional event sink (see tracing.get_sink)
             - draw_fn: Optional drawing function
             - log: Optional logging function
             - boilerplate: If True, enables logging (default: True)
             - lang: Language for messages ("en" or "pt", default: "pt")
+            - linear: If True, use phase2_order (default: False)
 
     Returns:
         - Arb: directed graph (DiGraph) representing the minimum arborescence
     """
 
     # Extract parameters from kwargs with defaults
-    draw_fn = kwargs.get("draw_fn", None)
-    log = kwargs.get("log", None)
-    boilerplate = kwargs.get("boilerplate", True)
-    lang = kwargs.get("lang", "pt")
+    trace = get_sink(kwargs)
+    linear = kwargs.get("linear", False)
     Arb = nx.DiGraph()
 
-    if boilerplate and log:
-        if lang == "en":
-            log(f"\n andras_frank: Phase 2 - Building arborescence from F")
-            log(f" andras_frank: Starting with root {r}")
-            log(f" andras_frank: Total arcs in F: {len(F)}")
-        elif lang == "pt":
-            log(
-                f"\n andras_frank: Fase 2 - Construindo arborescência a partir de F"
-            )
-            log(f" andras_frank: Iniciando com raiz {r}")
-            log(f" andras_frank: Total de arcos em F: {len(F)}")
+    if trace:
+        trace(AF_PHASE2_START, r, len(F))
 
     # Add the root node
     Arb.add_node(r)
-    n = len(D_original.nodes())
+    n = D_original.number_of_nodes()
+
+    order = phase2_order(F, r) if linear else None
 
     # While there are arcs to be considered
     for _ in range(n - 1):
-        for u, v in F:
-            if u in Arb.nodes() and v not in Arb.nodes():
-                edge_data = D_original.get_edge_data(u, v)
-                Arb.add_edge(u, v, **edge_data)
-                if boilerplate and log:
-                    if lang == "en":
-                        log(
-                            f" andras_frank: Added arc ({u}, {v}) with weight {edge_data['w']}"
-                        )
-                    elif lang == "pt":
-                        log(
-                            f" andras_frank: Adicionado arco ({u}, {v}) com peso {edge_data['w']}"
-                        )
-                # Restart the loop after adding an edge
-                break
-        if boilerplate and draw_fn:
-            if lang == "en":
-                draw_fn(Arb, title=f"Partial arborescence - Iteration {_+1}")
-            elif lang == "pt":
-                draw_fn(Arb, title=f"Arborescência parcial - Iteração {_+1}")
-
-    if boilerplate and log:
-        if lang == "en":
-            log(
-                f" andras_frank: Phase 2 completed. Arborescence has {Arb.number_of_edges()} edges"
-            )
-        elif lang == "pt":
-            log(
-                f" andras_frank: Fase 2 concluída. Arborescência possui {Arb.number_of_edges()} arestas"
-            )
+        if linear:
+            arc = next(order, None)
+        else:
+            arc = None
+            for u, v in F:
+                if u in Arb.nodes() and v not in Arb.nodes():
+                    # Restart the loop after adding an edge
+                    arc = (u, v)
+                    break
+        if arc is not None:
+            u, v = arc
+            edge_data = edge_data_of(D_original, u, v)
+            Arb.add_edge(u, v, **edge_data)
+            if trace:
+                trace(AF_ARC_ADDED, u, v, edge_data["w"])
+        if trace:
+            trace(AF_DRAW_PARTIAL, Arb, _ + 1)
+
+    if trace:
+        trace(AF_PHASE2_DONE, Arb.number_of_edges())
 
     return Arb
 
-def phase2_v2(D_original: nx.DiGraph, r: int, F: list[tuple[int, int]], **kwargs):
+def phase2_v2(
+    D_original: nx.DiGraph | CSRDigraph, r: int, F: list[tuple[int, int]], **kwargs
+):
     """
     Find the minimum arborescence in a directed graph D with root r.
     The function returns the minimum arborescence as a DiGraph.
+    The priority of an arc is its position in F (the last one, if an arc is
+    repeated). With queue="heap" the arcs of F are put in a DiGraph and
+    served by heapq. With queue="bucket" no graph is built: the arcs are
+    indexed by tail and the queue is an array of flags, one per position of
+    F, read by a cursor that only moves forward. An arc pushed behind the
+    cursor (its position is below an arc already served) goes to a small
+    heap that is served first. Both queues pop the arcs in the same order.
 
     Parameters:
-        - D_original: directed graph (DiGraph)
+        - D_original: directed graph (DiGraph or CSRDigraph)
         - r: root node
         - F: list of arcs (u, v) that form the minimum arborescence
         - **kwargs: Additional parameters:
+            - trace: Optional event sink (see tracing.get_sink)
             - draw_fn: Optional drawing function
             - log: Optional logging function
             - boilerplate: If True, enables logging (default: True)
             - lang: Language for messages ("en" or "pt", default: "pt")
+            - metrics: Optional dict to collect algorithm metrics
+            - queue: "heap" (default) or "bucket"
 
     Returns:
         - Arb: directed graph (DiGraph) representing the minimum arborescence
     """
 
     # Extract parameters from kwargs with defaults
-    draw_fn = kwargs.get("draw_fn", None)
-    log = kwargs.get("log", None)
-    boilerplate = kwargs.get("boilerplate", True)
+    trace = get_sink(kwargs)
     lang = kwargs.get("lang", "pt")
+    metrics = kwargs.get("metrics", None)
+    queue = kwargs.get("queue", "heap")
 
-    if boilerplate and log:
-        if lang == "en":
-            log(
-                f"\n andras_frank: Phase 2 v2 - Building arborescence using priority queue"
-            )
-            log(f" andras_frank: Starting with root {r}")
-            log(f" andras_frank: Total arcs in F: {len(F)}")
-        elif lang == "pt":
-            log(
-                f"\n andras_frank: Fase 2 v2 - Construindo arborescência usando fila de prioridade"
-            )
-            log(f" andras_frank: Iniciando com raiz {r}")
-            log(f" andras_frank: Total de arcos em F: {len(F)}")
+    if lang == "en":
+        assert queue in ("heap", "bucket"), f"Unknown phase 2 queue: {queue}"
+    elif lang == "pt":
+        assert queue in ("heap", "bucket"), f"Fila da fase 2 desconhecida: {queue}"
 
-    Arb = nx.DiGraph()
+    if trace:
+        trace(AF_PHASE2_V2_START, r, len(F))
+
+    # Position of each arc in F; a repeated arc keeps the last one
+    position = {}
     for i, (u, v) in enumerate(F):
-        Arb.add_edge(u, v, w=i)
+        position[(u, v)] = i
+
+    Arb = None
+    if queue == "heap" or trace:
+        Arb = nx.DiGraph()
+        for (u, v), i in position.items():
+            Arb.add_edge(u, v, w=i)
 
     # Set of visited vertices, starting with the root
     V = {r}
 
-    # Priority queue to store the edges
-    q = []
-    for u, v, data in Arb.out_edges(r, data=True):
-        # Add edges to the priority queue with their weights
-        heapq.heappush(q, (data["w"], u, v))
+    A = nx.DiGraph()  # Arborescência resultante
+    pushes = 0
+    pops = 0
+
+    if queue == "heap":
+        # Priority queue to store the edges
+        q = []
+        for u, v, data in Arb.out_edges(r, data=True):
+            # Add edges to the priority queue with their weights
+            heapq.heappush(q, (data["w"], u, v))
+        pushes += len(q)
+
+        if trace:
+            trace(AF_QUEUE_INIT, len(q))
+            trace(AF_DRAW_PHASE2_INITIAL, Arb)
+
+        # While the queue is not empty
+        while q:
+            _, u, v = heapq.heappop(q)
+            pops += 1
+
+            if v in V:  # If the vertex has already been visited, continue
+                continue
 
-    if boilerplate and log:
-        if lang == "en":
-            log(
-                f" andras_frank: Initialized priority queue with {len(q)} edges from root"
-            )
-        elif lang == "pt":
-            log(
-                f" andras_frank: Inicializada fila de prioridade com {len(q)} arestas da raiz"
-            )
+            # Add the edge to the arborescence
+            weight = edge_data_of(D_original, u, v)["w"]
+            A.add_edge(u, v, w=weight)
 
-    A = nx.DiGraph()  # Arborescência resultante
+            if trace:
+                trace(AF_ARC_ADDED, u, v, weight)
 
-    if boilerplate and draw_fn:
-        if lang == "en":
-            draw_fn(Arb, title=f"Initial arborescence with weights - Phase 2")
-        elif lang == "pt":
-            draw_fn(Arb, title=f"Arborescência inicial com pesos - Fase 2")
-
-    # While the queue is not empty
-    edges_added = 0
-    while q:
-        _, u, v = heapq.heappop(q)
-
-        if v in V:  # If the vertex has already been visited, continue
-            continue
-
-        # Add the edge to the arborescence
-        weight = D_original[u][v]["w"]
-        A.add_edge(u, v, w=weight)
-        edges_added += 1
-
-        if boilerplate and log:
-            if lang == "en":
-                log(f" andras_frank: Added arc ({u}, {v}) with weight {weight}")
-            elif lang == "pt":
-                log(f" andras_frank: Adicionado arco ({u}, {v}) com peso {weight}")
-
-        # Mark the vertex as visited
-        V.add(v)
-
-        # Add the outgoing edges of the visited vertex to the priority queue
-        new_edges = 0
-        for x, y, data in Arb.out_edges(v, data=True):
-            heapq.heappush(q, (data["w"], x, y))
-            new_edges += 1
-
-        if boilerplate and log and new_edges > 0:
-            if lang == "en":
-                log(f" andras_frank: Added {new_edges} new edges to priority queue")
-            elif lang == "pt":
-                log(
-                    f" andras_frank: Adicionadas {new_edges} novas arestas à fila de prioridade"
-                )
-
-    if boilerplate and log:
-        if lang == "en":
-            log(
-                f" andras_frank: Phase 2 v2 completed. Arborescence has {A.number_of_edges()} edges"
-            )
-        elif lang == "pt":
-            log(
-                f" andras_frank: Fase 2 v2 concluída. Arborescência possui {A.number_of_edges()} arestas"
-            )
+            # Mark the vertex as visited
+            V.add(v)
+
+            # Add the outgoing edges of the visited vertex to the priority queue
+            new_edges = 0
+            for x, y, data in Arb.out_edges(v, data=True):
+                heapq.heappush(q, (data["w"], x, y))
+                new_edges += 1
+            pushes += new_edges
+
+            if trace and new_edges > 0:
+                trace(AF_QUEUE_PUSHED, new_edges)
+    else:
+        # Positions of the arcs leaving each vertex, in increasing order
+        out = {}
+        for i, (u, v) in enumerate(F):
+            if position[(u, v)] == i:
+                out.setdefault(u, []).append(i)
+
+        m = len(F)
+        queued = bytearray(m)  # queued[i] == 1: arc F[i] waits at or after the cursor
+        behind = []  # heap of the positions pushed behind the cursor
+        cursor = 0
+
+        for i in out.get(r, ()):
+            queued[i] = 1
+        pushes += len(out.get(r, ()))
+
+        if trace:
+            trace(AF_QUEUE_INIT, pushes)
+            trace(AF_DRAW_PHASE2_INITIAL, Arb)
+
+        while True:
+            if behind:
+                i = heapq.heappop(behind)
+            else:
+                while cursor < m and not queued[cursor]:
+                    cursor += 1
+                if cursor == m:
+                    break
+                i = cursor
+                cursor += 1
+            pops += 1
+
+            u, v = F[i]
+            if v in V:  # If the vertex has already been visited, continue
+                continue
+
+            # Add the edge to the arborescence
+            weight = edge_data_of(D_original, u, v)["w"]
+            A.add_edge(u, v, w=weight)
+
+            if trace:
+                trace(AF_ARC_ADDED, u, v, weight)
+
+            # Mark the vertex as visited
+            V.add(v)
 
-    if boilerplate and draw_fn:
-        if lang == "en":
-            draw_fn(A, title=f"Final arborescence - Phase 2")
-        elif lang == "pt":
-            draw_fn(A, title=f"Arborescência final - Fase 2")
+            # Queue the outgoing arcs of the visited vertex
+            new_edges = out.get(v, ())
+            for j in new_edges:
+                if j < cursor:
+                    heapq.heappush(behind, j)
+                else:
+                    queued[j] = 1
+            pushes += len(new_edges)
+
+            if trace and new_edges:
+                trace(AF_QUEUE_PUSHED, len(new_edges))
+
+    # Collect metrics if requested
+    if metrics is not None:
+        metrics["phase2_v2_queue"] = queue
+        metrics["phase2_v2_pushes"] = pushes
+        metrics["phase2_v2_pops"] = pops
+
+    if trace:
+        trace(AF_PHASE2_V2_DONE, A.number_of_edges())
+        trace(AF_DRAW_PHASE2_FINAL, A)
     # Return the resulting arborescence
     return A
 
 def check_dual_optimality_condition(
-    Arb: nx.DiGraph, sigma: list[tuple[int, set[int], float]], **kwargs
+    Arb: nx.DiGraph | CSRDigraph, sigma: list[tuple[int, set[int], float]], **kwargs
 ):
     """
     Verifica a condição dual: z(X) > 0 implica que exatamente uma aresta de Arb entra em X.
+    Os conjuntos X de sigma formam uma família laminar; com a floresta laminar
+    (LaminarForest) as arestas de Arb que entram em cada X são contadas de uma
+    só vez, em tempo quase linear em n + |sigma|.
 
     Parameters:
-        - Arb: arborescência (DiGraph)
-        - sigma: lista de tuplas (X, z(X)) representando as variáveis duais
+        - Arb: arborescência (DiGraph ou CSRDigraph)
+        - sigma: variáveis duais (a, X, z(X)), como LaminarSigma ou lista de tuplas
         - **kwargs: Additional parameters:
+            - trace: Optional event sink (see tracing.get_sink)
             - log: Optional logging function
             - boilerplate: If True, enables logging (default: True)
             - lang: Language for messages ("en" or "pt", default: "pt")
+            - laminar: Optional LaminarForest of the sets of sigma, to reuse it
+              across several checks of the same sigma
 
     Returns:
         - bool: True se a condição dual é satisfeita, False caso contrário
     """
 
     # Extract parameters from kwargs with defaults
-    log = kwargs.get("log", None)
-    boilerplate = kwargs.get("boilerplate", True)
-    lang = kwargs.get("lang", "pt")
+    trace = get_sink(kwargs)
+    laminar = kwargs.get("laminar", None)
+    if laminar is None:
+        if isinstance(sigma, LaminarForest):
+            laminar = sigma
+        else:
+            laminar = LaminarForest(X for _, X, _ in sigma)
 
-    if boilerplate and log:
-        if lang == "en":
-            log(f"\n andras_frank: Checking dual optimality condition")
-            log(f" andras_frank: Checking {len(sigma)} dual variables")
-        elif lang == "pt":
-            log(f"\n andras_frank: Verificando condição de otimalidade dual")
-            log(f" andras_frank: Verificando {len(sigma)} variáveis duais")
-
-    for _, X, z in sigma:
-        count = 0
-        for u, v in Arb.edges():
-            if u not in X and v in X:
-                count += 1
-                if count > 1:
-                    if boilerplate and log:
-                        if lang == "en":
-                            log(
-                                f"\n andras_frank: ❌ Dual condition failed for X={X} with z(X)={z}. Incoming arcs: {count}"
-                            )
-                        elif lang == "pt":
-                            log(
-                                f"\n andras_frank: ❌ Falha na condição dual para X={X} com z(X)={z}. Arcos entrando: {count}"
-                            )
-                    return False
-
-        if boilerplate and log:
-            if lang == "en":
-                log(
-                    f" andras_frank: ✓ Dual condition satisfied for X={X} with z(X)={z}. Incoming arcs: {count}"
-                )
-            elif lang == "pt":
-                log(
-                    f" andras_frank: ✓ Condição dual satisfeita para X={X} com z(X)={z}. Arcos entrando: {count}"
-                )
-
-    if boilerplate and log:
-        if lang == "en":
-            log(f" andras_frank: ✅ All dual conditions satisfied")
-        elif lang == "pt":
-            log(f" andras_frank: ✅ Todas as condições duais satisfeitas")
+    if trace:
+        trace(AF_DUAL_START, len(sigma))
+
+    counts = laminar.entering_counts(Arb.edges())
+
+    for k, count in enumerate(counts):
+        if count > 1:
+            if trace:
+                _, X, z = sigma[k]
+                trace(AF_DUAL_FAILED, X, z, count)
+            return False
+
+        if trace:
+            _, X, z = sigma[k]
+            trace(AF_DUAL_SATISFIED, X, z, count)
+
+    if trace:
+        trace(AF_DUAL_ALL)
 
     return True
 
 def andras_frank_algorithm(
-    D: nx.DiGraph,
+    D: nx.DiGraph | CSRDigraph,
     **kwargs,
 ):
     """
     Execute the András Frank algorithm to find minimum arborescence.
 
     Parameters:
-        - D: directed graph (DiGraph)
+        - D: directed graph (DiGraph or CSRDigraph)
         - **kwargs: Additional parameters:
+            - trace: Optional event sink (see tracing.get_sink)
             - draw_fn: Optional drawing function
             - log: Optional logging function
             - boilerplate: If True, enables logging (default: True)
             - lang: Language for messages ("en" or "pt", default: "pt")
             - metrics: Optional dict to collect algorithm metrics
+            - engine: Phase 1 engine, "index" (default), "heap" or "batch"
+            - linear: If True, phase 2 uses phase2_order (default: False)
+            - queue: Queue of phase2_v2, "heap" (default) or "bucket"
 
     Returns:
         - arborescence_frank: DiGraph from phase2
@@ -520,16 +854,11 @@ def andras_frank_algorithm(
         - dual_frank_v2: bool indicating if dual condition is satisfied for v2
     """
     # Extract parameters from kwargs with defaults
-    draw_fn = kwargs.get("draw_fn", None)
-    log = kwargs.get("log", None)
-    boilerplate = kwargs.get("boilerplate", True)
-    lang = kwargs.get("lang", "pt")
+    trace = get_sink(kwargs)
+    kwargs["trace"] = trace
 
-    if boilerplate and log:
-        if lang == "en":
-            log(f"\n Executing András Frank algorithm...")
-        elif lang == "pt":
-            log(f"\n Executando algoritmo de András Frank...")
+    if trace:
+        trace(AF_START)
 
     sigma = phase1(
         D,
@@ -537,18 +866,14 @@ def andras_frank_algorithm(
         **kwargs,
     )
 
-    F = [a for a, _, _ in sigma]
+    F = list(sigma.arc)
 
-    if boilerplate and log:
-        log(f"\n F: \n{F}")
-        log(f"\n sigma: \n{sigma}")
+    if trace:
+        trace(AF_F_SIGMA, F, sigma)
 
     if not has_arborescence(D, 0):
-        if boilerplate and log:
-            if lang == "en":
-                log(f"\nThe graph does not contain an arborescence with root 0.")
-            elif lang == "pt":
-                log(f"\nO grafo não contém uma arborescência com raiz 0.")
+        if trace:
+            trace(AF_NO_ARBORESCENCE, 0)
         return None, None
 
     arborescence_frank = phase2(D, 0, F, **kwargs)
@@ -562,38 +887,12 @@ def andras_frank_algorithm(
     )
 
     if dual_frank and dual_frank_v2:
-        if boilerplate and log:
-            if lang == "en":
-                log(f"\n✅ Dual condition satisfied for András Frank.")
-            elif lang == "pt":
-                log(f"\n✅ Condição dual satisfeita para András Frank.")
+        if trace:
+            trace(AF_RESULT_OK)
     else:
-        if boilerplate and log:
-            if lang == "en":
-                log(f"\n❌ Dual condition failed for András Frank.")
-            elif lang == "pt":
-                log(f"\n❌ Condição dual falhou para András Frank.")
-
-        if draw_fn:
-            if boilerplate and draw_fn:
-                if lang == "en":
-                    draw_fn(
-                        arborescence_frank,
-                        title="András Frank Arborescence - Method 1",
-                    )
-                    draw_fn(
-                        arborescence_frank_v2,
-                        title="András Frank Arborescence - Method 2",
-                    )
-                elif lang == "pt":
-                    draw_fn(
-                        arborescence_frank,
-                        title="Arborescência de András Frank - Método 1",
-                    )
-
-                    draw_fn(
-                        arborescence_frank_v2,
-                        title="Arborescência de András Frank - Método 2",
-                    )
+        if trace:
+            trace(AF_RESULT_FAILED)
+            trace(AF_DRAW_METHOD1, arborescence_frank)
+            trace(AF_DRAW_METHOD2, arborescence_frank_v2)
 
     return arborescence_frank, arborescence_frank_v2, dual_frank, dual_frank_v2
@@ -0,0 +1,279 @@
+import gc
+import json
+import math
+import platform
+import statistics as stats
+import sys
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from andrasfrank import check_dual_optimality_condition, phase1, phase2, phase2_v2
+from chuliu import ENGINES, chuliu_edmonds
+from tests import FAMILIES, PESO_MAX, PESO_MIN, build_rooted_digraph_np, get_edge_count_range
+
+# Scaling benchmark: for every family and size n, one instance is built (a
+# CSRDigraph from the numpy generator, with a fixed seed), and every solver is
+# timed on it with warmup runs, several repeats and the garbage collector off.
+# A solver whose time, predicted from the smaller sizes, passes the limit stops.
+# The results (median and interquartile range per solver, family and n) are
+# written as JSON; with a baseline file, any solver/family/n whose median got
+# slower than the threshold is reported as a regression.
+
+SIZES = (100, 1000, 10000, 100000, 1000000)
+# Named solver variants: (function, keyword arguments). phase2, phase2_v2 and
+# dual run on the F, sigma and arborescence of the instance (see _context)
+VARIANTS = {
+    "cle": ("chuliu", {}),
+    "cle_batch": ("chuliu", {"batch": True}),
+    **{name: ("chuliu", {"engine": name}) for name in ENGINES},
+    "iterative_batch": ("chuliu", {"engine": "iterative", "batch": True}),
+    "phase1": ("phase1", {}),
+    "phase1_heap": ("phase1", {"engine": "heap"}),
+    "phase1_batch": ("phase1", {"engine": "batch"}),
+    "phase2": ("phase2", {}),
+    "phase2_linear": ("phase2", {"linear": True}),
+    "phase2_v2": ("phase2_v2", {}),
+    "phase2_v2_bucket": ("phase2_v2", {"queue": "bucket"}),
+    "dual": ("dual", {}),
+}
+SOLVERS = tuple(VARIANTS)
+WARMUP = 1  # Untimed runs before the repeats
+REPEATS = 5  # Timed runs per solver, family and n
+TIME_LIMIT = 30.0  # A solver predicted (or measured) above this (s) skips the larger n
+THRESHOLD = 0.10  # Relative slowdown over the baseline reported as a regression
+SEED = 0
+OUTPUT_PATH = "benchmark.json"
+BASELINE_PATH = None  # JSON of an earlier run to compare against
+
+
+def _context(D, r: int, context: Dict, key: str):
+    # Inputs of the solvers that depend on an earlier phase, computed untimed
+    # and only when a solver asks for them, with the linear-time variants
+    if key not in context:
+        if key in ("sigma", "F"):
+            sigma = phase1(D, r, boilerplate=False)
+            context["sigma"] = sigma
+            context["F"] = list(sigma.arc)
+        elif key == "arbo":
+            F = _context(D, r, context, "F")
+            context["arbo"] = phase2_v2(D, r, F, boilerplate=False, queue="bucket")
+    return context[key]
+
+
+def _solver(name: str, D, r: int, context: Dict) -> Callable[[], object]:
+    # A callable running one solver variant on D
+    kind, kwargs = VARIANTS[name]
+    if kind == "phase1":
+        return lambda: phase1(D, r, boilerplate=False, **kwargs)
+    if kind == "phase2":
+        F = _context(D, r, context, "F")
+        return lambda: phase2(D, r, F, boilerplate=False, **kwargs)
+    if kind == "phase2_v2":
+        F = _context(D, r, context, "F")
+        return lambda: phase2_v2(D, r, F, boilerplate=False, **kwargs)
+    if kind == "dual":
+        arbo = _context(D, r, context, "arbo")
+        sigma = _context(D, r, context, "sigma")
+        return lambda: check_dual_optimality_condition(arbo, sigma, boilerplate=False)
+    return lambda: chuliu_edmonds(D, r, boilerplate=False, **kwargs)
+
+
+def predict(history: list, n: int) -> Optional[float]:
+    """
+    Predict the median time of a solver at n from its earlier (n, median)
+    measurements: the last time scaled by the growth exponent of the last two
+    (linear growth when there is only one).
+    """
+    if not history:
+        return None
+    last_n, last = history[-1]
+    exponent = 1.0
+    if len(history) > 1:
+        prev_n, prev = history[-2]
+        if prev > 0 and last > 0:
+            exponent = max(1.0, math.log(last / prev) / math.log(last_n / prev_n))
+    return last * (n / last_n) ** exponent
+
+
+def time_solver(run: Callable[[], object], warmup: int, repeats: int) -> list:
+    """
+    Time run() repeats times after warmup untimed runs. The collector runs
+    before each timed run and is disabled during it.
+
+    Returns:
+        - the running times in seconds
+    """
+    for _ in range(warmup):
+        run()
+    times = []
+    enabled = gc.isenabled()
+    try:
+        for _ in range(repeats):
+            gc.collect()
+            gc.disable()
+            t0 = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - t0)
+            if enabled:
+                gc.enable()
+    finally:
+        if enabled:
+            gc.enable()
+    return times
+
+
+def summarize(times: list) -> Tuple[float, float]:
+    """Median and interquartile range of a list of times."""
+    if len(times) < 2:
+        return times[0], 0.0
+    q1, _, q3 = stats.quantiles(times, n=4, method="inclusive")
+    return stats.median(times), q3 - q1
+
+
+def run_benchmark(
+    sizes: Tuple[int, ...] = SIZES,
+    families: Tuple[str, ...] = FAMILIES,
+    solvers: Tuple[str, ...] = SOLVERS,
+    **kwargs,
+) -> Dict:
+    """
+    Sweep n for every family and time every solver.
+
+    Parameters:
+        - sizes: numbers of vertices
+        - families: instance families
+        - solvers: names of solver variants, keys of VARIANTS
+        - **kwargs: Additional parameters:
+            - warmup: untimed runs per solver (default: WARMUP)
+            - repeats: timed runs per solver (default: REPEATS)
+            - time_limit: a solver whose median, measured or predicted from
+              the smaller sizes, exceeds it skips the larger sizes of that
+              family (default: TIME_LIMIT)
+            - seed: seed of the instances (default: SEED)
+            - log: Optional function receiving a line per measurement
+
+    Returns:
+        - dict with "meta" (settings and platform) and "results", one entry
+          per solver, family and n: median_s, iqr_s and times_s
+    """
+    warmup = kwargs.get("warmup", WARMUP)
+    repeats = kwargs.get("repeats", REPEATS)
+    time_limit = kwargs.get("time_limit", TIME_LIMIT)
+    seed = kwargs.get("seed", SEED)
+    log = kwargs.get("log", None)
+    r = 0
+
+    results = []
+    for family in families:
+        skipped = set()
+        history = {name: [] for name in solvers}
+        for n in sorted(sizes):
+            # Skip before running a size whose predicted time is over the limit
+            for name in solvers:
+                predicted = predict(history[name], n)
+                if predicted is not None and predicted > time_limit:
+                    if log and name not in skipped:
+                        log(f"{name:16} {family:8} n={n:<8} skipped (~{predicted:.1f}s predicted)")
+                    skipped.add(name)
+            pending = [s for s in solvers if s not in skipped]
+            if not pending:
+                break
+            min_edges, max_edges = get_edge_count_range(n, family)
+            m = (min_edges + max_edges) // 2
+            D = build_rooted_digraph_np(
+                n, m, r, PESO_MIN, PESO_MAX, family, seed=seed + n, csr=True
+            )
+            context = {}
+            for name in pending:
+                times = time_solver(_solver(name, D, r, context), warmup, repeats)
+                median, iqr = summarize(times)
+                history[name].append((n, median))
+                results.append(
+                    {
+                        "solver": name,
+                        "family": family,
+                        "n": n,
+                        "m": len(D.src),
+                        "median_s": median,
+                        "iqr_s": iqr,
+                        "times_s": times,
+                    }
+                )
+                if log:
+                    log(f"{name:16} {family:8} n={n:<8} {median:.4f}s ± {iqr:.4f}")
+                if median > time_limit:
+                    skipped.add(name)
+
+    return {
+        "meta": {
+            "warmup": warmup,
+            "repeats": repeats,
+            "seed": seed,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def compare_to_baseline(
+    current: Dict, baseline: Dict, threshold: float = THRESHOLD
+) -> list:
+    """
+    Compare the medians of two runs of run_benchmark.
+
+    Parameters:
+        - current: the new run
+        - baseline: the earlier run
+        - threshold: relative slowdown reported (0.10 = 10% slower)
+
+    Returns:
+        - regressions: (solver, family, n, baseline median, current median)
+          for every entry of both runs whose median grew by more than threshold
+          and by more than the sum of the two interquartile ranges
+    """
+    base = {(e["solver"], e["family"], e["n"]): e for e in baseline["results"]}
+    regressions = []
+    for e in current["results"]:
+        old = base.get((e["solver"], e["family"], e["n"]))
+        if old is None:
+            continue
+        before, after = old["median_s"], e["median_s"]
+        # A slowdown within the spread of the two runs is noise
+        noise = old["iqr_s"] + e["iqr_s"]
+        if after > before * (1 + threshold) and after - before > noise:
+            regressions.append((e["solver"], e["family"], e["n"], before, after))
+    return regressions
+
+
+def main(
+    output_path: str = OUTPUT_PATH,
+    baseline_path: Optional[str] = BASELINE_PATH,
+    threshold: float = THRESHOLD,
+    **kwargs,
+) -> int:
+    """
+    Run the benchmark, write it to output_path and compare it to the baseline.
+
+    Returns:
+        - 1 if some solver got slower than the threshold, else 0
+    """
+    current = run_benchmark(log=print, **kwargs)
+    with open(output_path, "w") as f:
+        json.dump(current, f, indent=2)
+
+    if baseline_path is None:
+        return 0
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = compare_to_baseline(current, baseline, threshold)
+    for solver, family, n, before, after in regressions:
+        print(
+            f"x {solver} {family} n={n}: {before:.4f}s -> {after:.4f}s "
+            f"(+{100 * (after / before - 1):.0f}%)"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,30 @@
 import networkx as nx
+import numpy as np
 from typing import cast
 
+from chuliu_engines import DONE, NEW, ON_PATH, build_arborescence, expand_contraction_forest
+from chuliu_engines import ENGINES as ARRAY_ENGINES
+from csr import CSRDigraph
+from structures import NIL
+from tracing import (
+    CLE_BUILD_DZERO,
+    CLE_CSR_START,
+    CLE_DRAW_DZERO,
+    CLE_DRAW_FINAL,
+    CLE_DRAW_NORMALIZED,
+    CLE_DRAW_REMOVED,
+    CLE_EXPAND_CYCLE_EDGE,
+    CLE_EXPAND_IN_EDGE,
+    CLE_EXPAND_OUT_EDGE,
+    CLE_EXPAND_REMOVED,
+    CLE_FINAL,
+    CLE_LEVEL_START,
+    CLE_NORMALIZE,
+    CLE_NOT_ARBORESCENCE,
+    CLE_REMOVE_IN_EDGES,
+    get_sink,
+)
+
 def remove_in_edges_to(D: nx.DiGraph, r: int):
     """
     Remove all edges entering the root vertex r in digraph D.
@@ -60,35 +84,124 @@ def get_Dzero(D: nx.DiGraph, r: int):
             D_zero.add_edge(u, v, w=0)
     return D_zero
 
-def find_cycle(D_zero: nx.DiGraph):
+def normalize_in_edges(dst: np.ndarray, w: np.ndarray, size: int):
     """
-    Finds a directed cycle in the digraph.
-    Returns a subgraph containing the cycle, or None if there is none.
+    Batch version of reduce_costs and get_Dzero for all vertices at once.
+    The arcs are laid out by head (CSR in-edges); a segmented minimum gives
+    y(v) for every head v, which is subtracted from the weights, and the first
+    arc of each segment attaining the minimum becomes the arc entering v in D_zero.
 
     Parameters:
-        - D_zero: A directed graph (networkx.DiGraph)
+        - dst: head of every arc
+        - w: weight of every arc
+        - size: number of vertex ids
 
     Returns:
-        - A directed graph (networkx.DiGraph) representing the cycle.
+        - w: the reduced weights (a new array)
+        - parent: arc entering each vertex in D_zero (NIL where no arc enters)
     """
-    nodes_in_cycle = set()
-    # Extract nodes involved in the cycle
-    for u, v, _ in nx.find_cycle(D_zero, orientation="original"):
-        nodes_in_cycle.update([u, v])
+    parent = np.full(size, NIL, dtype=np.int64)
+    if dst.size == 0:
+        return w.copy(), parent
+
+    order = np.argsort(dst, kind="stable")
+    heads = dst[order]
+    w_sorted = w[order]
+    starts = np.flatnonzero(np.r_[True, heads[1:] != heads[:-1]])
+    counts = np.diff(np.r_[starts, heads.size])
+
+    # Segmented minimum: y(v) for every head v
+    y = np.minimum.reduceat(w_sorted, starts)
+    y_of = np.zeros(size, dtype=w.dtype)
+    y_of[heads[starts]] = y
+
+    # Vectorized argmin: first arc of each segment attaining its minimum
+    at_min = np.flatnonzero(w_sorted == np.repeat(y, counts))
+    first = np.r_[True, heads[at_min[1:]] != heads[at_min[:-1]]]
+    parent[heads[at_min[first]]] = order[at_min[first]]
 
-    # Create a subgraph containing only the cycle
-    D_zero_digraph = D_zero.subgraph(
-        nodes_in_cycle
-    ).to_directed()  # Note: convert to directed graph because subgraph returns a Graph
-    return D_zero_digraph
+    return w - y_of[dst], parent
 
-def contract_cycle(D: nx.DiGraph, C: nx.DiGraph, label: int):
+def get_parent_map(D: nx.DiGraph, r: int):
+    """
+    Parent-array form of get_Dzero: maps every vertex v other than r to the tail
+    of the first zero-weight edge entering v in digraph D.
+
+    Parameters:
+        - D: A directed graph (networkx.DiGraph)
+        - r: The root vertex
+
+    Returns:
+        - parent: dict mapping each non-root vertex to its parent in D_zero
+    """
+    parent = {}
+    for v, pred in D.pred.items():
+        if v != r:
+            parent[v] = next(u for u, data in pred.items() if data["w"] == 0)
+    return parent
+
+def parent_map_to_digraph(parent: dict, D: nx.DiGraph | None = None):
+    """
+    Build the digraph of a parent map, e.g. D_zero for drawing or the final
+    arborescence of a level.
+
+    Parameters:
+        - parent: dict mapping each non-root vertex to its parent
+        - D: Optional directed graph (networkx.DiGraph) giving the edge weights
+          (weight 0 if None)
+
+    Returns:
+        - A directed graph (networkx.DiGraph) with the edges (parent[v], v)
+    """
+    G = nx.DiGraph()
+    if D is None:
+        G.add_edges_from(((u, v) for v, u in parent.items()), w=0)
+    else:
+        G.add_weighted_edges_from(
+            ((u, v, D[u][v]["w"]) for v, u in parent.items()), weight="w"
+        )
+    return G
+
+def find_zero_cycles(parent: dict, batch: bool = False):
+    """
+    Finds the cycles of D_zero given as a parent map, colouring every vertex once.
+    Since each non-root vertex has exactly one parent, D_zero is an arborescence
+    exactly when no cycle is found.
+
+    Parameters:
+        - parent: dict mapping each non-root vertex to its parent in D_zero
+        - batch: If True, return every cycle instead of only the first (default: False)
+
+    Returns:
+        - list of cycles, each a dict mapping a cycle vertex to its parent in the cycle
+    """
+    state = {}
+    cycles = []
+    for s in parent:
+        if s in state:
+            continue
+        path = []
+        x = s
+        while x in parent and x not in state:
+            state[x] = ON_PATH
+            path.append(x)
+            x = parent[x]
+        if state.get(x) == ON_PATH:
+            cycles.append({y: parent[y] for y in path[path.index(x) :]})
+            if not batch:
+                break
+        for y in path:
+            state[y] = DONE
+    return cycles
+
+def contract_cycle(D: nx.DiGraph, C: dict | nx.DiGraph, label: int):
     """
     Contract a cycle C in digraph D, replacing it with a supernode labeled `label`.
     Returns the modified digraph D' with the contracted cycle, the list of incoming edges (in_edge), and outgoing edges (out_edge).
     Parameters:
         - D: A directed graph (networkx.DiGraph)
-        - C: A directed graph (networkx.DiGraph) representing the cycle to be contracted
+        - C: The cycle to be contracted, as a dict mapping each cycle vertex to its
+          parent in the cycle (a directed graph with the cycle is also accepted)
         - label: The label for the new supernode
 
     Returns:
@@ -96,46 +209,31 @@ def contract_cycle(D: nx.DiGraph, C: nx.DiGraph, label: int):
         - out_from_cycle: A dictionary mapping nodes outside the cycle to tuples (node_in_cycle, weight)
     """
 
-    cycle_nodes: set[int] = set(C.nodes())
+    cycle_nodes: set[int] = set(C)
+
+    # Only the edges incident to the cycle are visited, so the cost is
+    # proportional to the total degree of its vertices
 
     # Stores the vertex u outside the cycle and the vertex v inside the cycle that receives the minimum weight edge
     in_to_cycle: dict[int, tuple[int, float]] = {}
-
-    for u in D.nodes:
-        if u not in cycle_nodes:
-            # Find the minimum weight edge that u has to any vertex in C
-            min_weight_edge_to_cycle = min(
-                (
-                    (v, data["w"])
-                    for _, v, data in D.out_edges(u, data=True)
-                    if v in cycle_nodes
-                ),
-                key=lambda x: x[1],
-                default=None,
-            )
-            if min_weight_edge_to_cycle:
-                in_to_cycle[u] = min_weight_edge_to_cycle
-
-    for u, (v, c) in in_to_cycle.items():
-        D.add_edge(u, label, w=c)
+    for v in C:
+        for u, data in D.pred[v].items():
+            if u not in cycle_nodes:
+                best = in_to_cycle.get(u)
+                if best is None or data["w"] < best[1]:
+                    in_to_cycle[u] = (v, data["w"])
 
     # Stores the vertex v outside the cycle that receives the minimum weight edge from a vertex u inside the cycle
     out_from_cycle: dict[int, tuple[int, float]] = {}
+    for u in C:
+        for v, data in D.succ[u].items():
+            if v not in cycle_nodes:
+                best = out_from_cycle.get(v)
+                if best is None or data["w"] < best[1]:
+                    out_from_cycle[v] = (u, data["w"])
 
-    for v in D.nodes:
-        if v not in cycle_nodes:
-            # Find the minimum weight edge that v receives from any vertex in C
-            min_weight_edge_from_cycle = min(
-                (
-                    (u, data["w"])
-                    for u, _, data in D.in_edges(v, data=True)
-                    if u in cycle_nodes
-                ),
-                key=lambda x: x[1],
-                default=None,
-            )
-            if min_weight_edge_from_cycle:
-                out_from_cycle[v] = min_weight_edge_from_cycle
+    for u, (v, c) in in_to_cycle.items():
+        D.add_edge(u, label, w=c)
 
     for v, (u, c) in out_from_cycle.items():
         D.add_edge(label, v, w=c)
@@ -145,25 +243,29 @@ def contract_cycle(D: nx.DiGraph, C: nx.DiGraph, label: int):
     return in_to_cycle, out_from_cycle
 
 def expand_arborescence(
-    D: nx.DiGraph,
     label: int,
-    C: nx.DiGraph,
+    C: dict,
     in_to_cycle: dict[int, tuple[int, float]],
     out_from_cycle: dict[int, tuple[int, float]],
-    F_prime: nx.DiGraph,
+    parent: dict,
     **kwargs,
 ):
     """
-    Expand the contracted cycle back into the arborescence.
+    Expand the contracted cycle back into the arborescence, given as a parent map.
+    Only the entries of the supernode, of the cycle vertices and of the vertices
+    entered from the supernode change, so the cost follows the cycle's degree.
+    Edge weights are not touched: the caller attaches them once, when the final
+    arborescence is built (parent_map_to_digraph).
 
     Parameters:
-        - D: Original directed graph
         - label: Label of the contracted supernode
-        - C: The cycle that was contracted
+        - C: The cycle that was contracted (dict mapping each cycle vertex to its parent)
         - in_to_cycle: Dictionary mapping external nodes to cycle entry points
         - out_from_cycle: Dictionary mapping external nodes to cycle exit points
-        - F_prime: The arborescence with contracted cycle
+        - parent: The arborescence with the contracted cycle, as a dict mapping each
+          non-root vertex to its parent (updated in place)
         - **kwargs: Additional parameters:
+            - trace: Optional event sink (see tracing.get_sink)
             - draw_fn: Optional drawing function
             - log: Optional logging function
             - boilerplate: If True, enables logging (default: True)
@@ -171,28 +273,24 @@ def expand_arborescence(
             - indent: Indentation string for logging (default: "")
 
     Returns:
-        - F_prime: The expanded arborescence
+        - parent: The expanded arborescence, as a parent map
     """
 
     # Extract parameters from kwargs with defaults
-    draw_fn = kwargs.get("draw_fn", None)
-    log = kwargs.get("log", None)
-    boilerplate = kwargs.get("boilerplate", True)
+    trace = get_sink(kwargs)
     lang = kwargs.get("lang", "pt")
     indent = kwargs.get("indent", "")
 
-    in_edge = next(iter(F_prime.in_edges(label, data=True)))
+    u = parent.get(label)
 
     if lang == "en":
         assert (
-            in_edge is not None
+            u is not None
         ), f"\nchuliu_edmonds: No incoming edge found for vertex '{label}'."
     elif lang == "pt":
         assert (
-            in_edge is not None
+            u is not None
         ), f"\nchuliu_edmonds: Nenhuma aresta encontrada entrando no vértice '{label}'."
-    # At this point in_edge is guaranteed not None
-    u, _, _ = cast(tuple, in_edge)
     v, _ = in_to_cycle[u]
 
     if lang == "en":
@@ -205,112 +303,128 @@ def expand_arborescence(
         ), f"\n chuliu_edmonds: Nenhum vértice do ciclo encontrado que recebeu a aresta de entrada de '{u}'."
 
     # Add the external edge entering the cycle and restore remaining cycle edges
-    F_prime.add_edge(u, v)
-    if boilerplate and log:
-        if lang == "en":
-            log(f"\n chuliu_edmonds:{indent}Adding incoming edge to cycle: ({u}, {v})")
-        elif lang == "pt":
-            log(
-                f"\n chuliu_edmonds:{indent}Adicionando aresta de entrada ao ciclo: ({u}, {v})"
-            )
+    parent[v] = u
+    if trace:
+        trace(CLE_EXPAND_IN_EDGE, indent, u, v)
 
-    for u_c, v_c in C.edges:
+    for v_c, u_c in C.items():
         if v_c != v:
-            F_prime.add_edge(u_c, v_c)
-        if boilerplate and log:
-            if lang == "en":
-                log(f"\nchuliu_edmonds:{indent}Adding cycle edge: ({u_c}, {v_c})")
-            elif lang == "pt":
-                log(
-                    f"\nchuliu_edmonds:{indent}Adicionando aresta do ciclo: ({u_c}, {v_c})"
-                )
-
-    # Add the external edges leaving the cycle
-    for _, z, _ in list(F_prime.out_edges(label, data=True)):
-        if lang == "en":
-            assert (
-                z in out_from_cycle
-            ), f"\n chuliu_edmonds: No outgoing edge found for vertex '{z}'."
-        elif lang == "pt":
-            assert (
-                z in out_from_cycle
-            ), f"\n chuliu_edmonds: Nenhuma aresta de saída encontrada para o vértice '{z}'."
-        u_cycle, _ = out_from_cycle[z]
-        F_prime.add_edge(u_cycle, z)
-        if boilerplate and log:
-            if lang == "en":
-                log(
-                    f"\n chuliu_edmonds:{indent}Adding outgoing edge from cycle: ({u_cycle}, {z})"
-                )
-            elif lang == "pt":
-                log(
-                    f"\n chuliu_edmonds:{indent}Adicionando aresta externa de saída: ({u_cycle}, {z})"
-                )
+            parent[v_c] = u_c
+        if trace:
+            trace(CLE_EXPAND_CYCLE_EDGE, indent, u_c, v_c)
+
+    # Redirect the external edges leaving the cycle; only vertices of
+    # out_from_cycle can be entered from the supernode
+    for z, (u_cycle, _) in out_from_cycle.items():
+        if parent.get(z) != label:
+            continue
+        parent[z] = u_cycle
+        if trace:
+            trace(CLE_EXPAND_OUT_EDGE, indent, u_cycle, z)
 
     # Remove the contracted node
-    if lang == "en":
-        assert (
-            label in F_prime
-        ), f"\n chuliu_edmonds: Vertex '{label}' not found in the graph."
-    elif lang == "pt":
-        assert (
-            label in F_prime
-        ), f"\n chuliu_edmonds: Vértice '{label}' não encontrado no grafo."
-    F_prime.remove_node(label)
+    del parent[label]
 
-    if boilerplate and log:
-        if lang == "en":
-            log(f"\n chuliu_edmonds:{indent}Contracted vertex '{label}' removed.")
-        elif lang == "pt":
-            log(f"\n chuliu_edmonds:{indent}Vértice contraído '{label}' removido.")
+    if trace:
+        trace(CLE_EXPAND_REMOVED, indent, label)
+        trace(CLE_FINAL, indent, parent)
+        trace(CLE_DRAW_FINAL, parent, indent)
+    return parent
 
-    # Update the edge weights with the original weights from G
-    for u2, v2 in F_prime.edges:
-        if lang == "en":
-            assert (
-                u2 in D and v2 in D
-            ), f"\n chuliu_edmonds: Vertex '{u2}' or '{v2}' not found in the original graph."
-        elif lang == "pt":
-            assert (
-                u2 in D and v2 in D
-            ), f"\n chuliu_edmonds: Vértice '{u2}' ou '{v2}' não encontrado no grafo original."
-        F_prime[u2][v2]["w"] = D[u2][v2]["w"]
+def reduce_and_find_cycles(D_copy: nx.DiGraph, r: int, **kwargs):
+    """
+    Run one level of the Chu-Liu/Edmonds algorithm on D_copy: reduce the costs
+    of the edges entering every vertex, build D_zero as a parent map and look for
+    cycles in it. D_zero is only built as a digraph when it is drawn.
 
-    if boilerplate and log:
-        if lang == "en":
-            log(f"\n ✅{indent}Final arborescence: {list(F_prime.edges)}")
-        elif lang == "pt":
-            log(f"\n ✅{indent}Arborescência final: {list(F_prime.edges)}")
-        if draw_fn:
-            if lang == "en":
-                draw_fn(F_prime, f"\n {indent}Final Arborescence.")
-            elif lang == "pt":
-                draw_fn(F_prime, f"\n {indent}Arborescência final.")
-    return F_prime
+    Parameters:
+        - D_copy: A directed graph (networkx.DiGraph), modified in place
+        - r: The root node
+        - **kwargs: Additional parameters:
+            - trace: Optional event sink (see tracing.get_sink)
+            - draw_fn: Optional drawing function
+            - log: Optional logging function
+            - boilerplate: If True, enables logging (default: True)
+            - lang: Language for messages ("en" or "pt", default: "pt")
+            - indent: Indentation string for logging (default: "")
+            - batch: If True, return every cycle of D_zero instead of the first one
+              (default: False)
+
+    Returns:
+        - parent: dict mapping each non-root vertex to the tail of its zero edge (D_zero)
+        - cycles: list of cycles of D_zero, each a dict mapping a cycle vertex to
+          its parent, empty if D_zero is an arborescence
+    """
+    trace = get_sink(kwargs)
+    indent = kwargs.get("indent", "")
+    batch = kwargs.get("batch", False)
+
+    if trace:
+        trace(CLE_REMOVE_IN_EDGES, indent, r)
+        trace(CLE_DRAW_REMOVED, D_copy, indent)
+
+    for v in D_copy.nodes:
+        if v != r:
+            reduce_costs(D_copy, v)
+
+        if trace:
+            trace(CLE_NORMALIZE, indent, v)
+            trace(CLE_DRAW_NORMALIZED, D_copy, indent)
+
+    # Build D_zero
+    parent = get_parent_map(D_copy, r)
+
+    if trace:
+        trace(CLE_BUILD_DZERO, indent)
+        trace(CLE_DRAW_DZERO, parent, indent)
+
+    cycles = find_zero_cycles(parent, batch)
+    if cycles and trace:
+        trace(CLE_NOT_ARBORESCENCE, indent)
+
+    return parent, cycles
 
 def chuliu_edmonds(
-    D: nx.DiGraph,
+    D: nx.DiGraph | CSRDigraph,
     r: int,
     level=0,
+    engine="cle",
     **kwargs,
 ):
     """
     Wrapper function for the Chu-Liu/Edmonds algorithm.
 
     Parameters:
-        - D: A directed graph (networkx.DiGraph)
+        - D: A directed graph (networkx.DiGraph or CSRDigraph)
         - r: The root node
         - level: Recursion level (default: 0)
-        - **kwargs: Additional parameters passed to cle:
+        - engine: "cle" for the recursive reference implementation, or the name
+          of an engine in ENGINES ("iterative", "tarjan")
+        - **kwargs: Additional parameters passed to the engine:
+            - trace: Optional event sink (see tracing.get_sink)
             - draw_fn: Optional drawing function
             - log: Optional logging function
             - boilerplate: If True, enables logging (default: True)
             - lang: Language for messages ("en" or "pt", default: "pt")
             - metrics: Optional dict to collect algorithm metrics
+            - batch: If True, "cle" and "iterative" contract every cycle of
+              D_zero per level instead of one (default: False)
 
     Returns:
         - Optimum arborescence as a directed graph (networkx.DiGraph)
     """
+    if engine != "cle":
+        lang = kwargs.get("lang", "pt")
+        if lang == "en":
+            assert (
+                engine in ENGINES
+            ), f"\n chuliu_edmonds: Unknown engine '{engine}'."
+        elif lang == "pt":
+            assert (
+                engine in ENGINES
+            ), f"\n chuliu_edmonds: Motor desconhecido '{engine}'."
+        return ENGINES[engine](D, r, **kwargs)
+
     return cle(
         D,
         r,
@@ -328,28 +442,60 @@ def cle(
 ):
     """
     Finds the optimum arborescence in a directed graph G with root r using the Chu-Liu/Edmonds algorithm.
+    The levels work on parent maps (see cle_parent_map); the digraph with the
+    original weights is built once, from the expanded parent map.
+    A CSRDigraph is solved by cle_csr.
 
     Parameters:
-        - D: A directed graph (networkx.DiGraph)
+        - D: A directed graph (networkx.DiGraph or CSRDigraph)
         - r: The root node
         - label: Label for contracted supernodes
         - level: Recursion level (default: 0)
         - **kwargs: Additional parameters:
+            - trace: Optional event sink (see tracing.get_sink)
             - draw_fn: Optional drawing function
             - log: Optional logging function
             - boilerplate: If True, enables logging (default: True)
             - lang: Language for messages ("en" or "pt", default: "pt")
             - metrics: Optional dict to collect algorithm metrics
+            - batch: If True, contract every cycle of D_zero at this level, each into
+              its own supernode, and expand them together (default: False)
 
     Returns:
         - Optimum arborescence as a directed graph (networkx.DiGraph)
     """
+    if isinstance(D, CSRDigraph):
+        return cle_csr(D, r, **kwargs)
+
+    parent = cle_parent_map(D, r, label, level, **kwargs)
+    return parent_map_to_digraph(parent, D)
+
+def cle_parent_map(
+    D: nx.DiGraph,
+    r: int,
+    label: int,
+    level=0,
+    **kwargs,
+):
+    """
+    Recursive step of cle: solves one level of D and returns the optimum
+    arborescence as a parent map, without edge weights.
+
+    Parameters:
+        - D: A directed graph (networkx.DiGraph)
+        - r: The root node
+        - label: Label for contracted supernodes
+        - level: Recursion level (default: 0)
+        - **kwargs: Additional parameters, as in cle
+
+    Returns:
+        - parent: dict mapping each non-root vertex to its parent in the arborescence
+    """
     # Extract parameters from kwargs with defaults
-    draw_fn = kwargs.get("draw_fn", None)
-    log = kwargs.get("log", None)
-    boilerplate = kwargs.get("boilerplate", True)
+    trace = get_sink(kwargs)
     lang = kwargs.get("lang", "pt")
     metrics = kwargs.get("metrics", None)
+    batch = kwargs.get("batch", False)
 
     indent = "  " * level
 
@@ -360,11 +506,8 @@ def cle(
         if level > metrics["max_depth"]:
             metrics["max_depth"] = level
 
-    if boilerplate and log:
-        if lang == "en":
-            log(f"\n chuliu_edmonds:{indent}Starting level {level}")
-        elif lang == "pt":
-            log(f"\n chuliu_edmonds:{indent}Iniciando nível {level}")
+    if trace:
+        trace(CLE_LEVEL_START, indent, level)
 
     if lang == "en":
         assert r in D, (
@@ -381,109 +524,344 @@ def cle(
 
     D_copy = cast(nx.DiGraph, D.copy())
 
-    if boilerplate and log:
-        if lang == "en":
-            log(f"\n chuliu_edmonds:{indent}Removing edges entering '{r}'")
-        elif lang == "pt":
-            log(f"\n chuliu_edmonds:{indent}Removendo arestas que entram em '{r}'")
-        if draw_fn:
-            if lang == "en":
-                draw_fn(
-                    D_copy,
-                    f"\n chuliu_edmonds:{indent}After removing incoming edges",
-                )
-            elif lang == "pt":
-                draw_fn(
-                    D_copy,
-                    f"\n chuliu_edmonds:{indent}Após remoção de entradas",
-                )
-
-    for v in D_copy.nodes:
-        if v != r:
-            reduce_costs(D_copy, v)
-
-        if boilerplate and log:
-            if lang == "en":
-                log(
-                    f"\n chuliu_edmonds:{indent}Normalizing weights of incoming edges to '{v}'"
-                )
-            elif lang == "pt":
-                log(
-                    f"\n chuliu_edmonds:{indent}Normalizando pesos de arestas de entrada para '{v}'"
-                )
-            if draw_fn:
-                if lang == "en":
-                    draw_fn(
-                        D_copy,
-                        f"\nchuliu_edmonds:{indent}After weight adjustment",
-                    )
-                elif lang == "pt":
-                    draw_fn(
-                        D_copy,
-                        f"\nchuliu_edmonds:{indent}Após ajuste de pesos",
-                    )
-
-    # Build D_zero
-    D_zero = get_Dzero(D_copy, r)
-
-    if boilerplate and log:
-        if lang == "en":
-            log(f"\nchuliu_edmonds:{indent}Building D_zero")
-        elif lang == "pt":
-            log(f"\nchuliu_edmonds:{indent}Construindo D_zero")
-        if draw_fn:
-            if lang == "en":
-                draw_fn(D_zero, f"\nchuliu_edmonds:{indent}D_zero")
-            elif lang == "pt":
-                draw_fn(D_zero, f"\nchuliu_edmonds:{indent}D_zero")
-
-    if nx.is_arborescence(D_zero):
-        for u, v in D_zero.edges:
-            D_zero[u][v]["w"] = D[u][v]["w"]
-        return D_zero
-
-    # Otherwise, contract a cycle and recurse
-    if boilerplate and log:
-        if lang == "en":
-            log(
-                f"\nchuliu_edmonds:{indent}D_zero is not an arborescence. Continuing..."
-            )
-        elif lang == "pt":
-            log(
-                f"\nchuliu_edmonds:{indent}D_zero não é uma arborescência. Continuando..."
-            )
+    parent, cycles = reduce_and_find_cycles(
+        D_copy,
+        r,
+        trace=trace,
+        lang=lang,
+        indent=indent,
+        batch=batch,
+    )
 
-    C = find_cycle(D_zero)
+    if not cycles:
+        return parent
 
     if metrics is not None:
-        metrics["contractions"] += 1
+        metrics["contractions"] += len(cycles)
 
-    in_to_cycle, out_from_cycle = contract_cycle(D_copy, C, label)
+    contracted = []
+    for i, C in enumerate(cycles):
+        in_to_cycle, out_from_cycle = contract_cycle(D_copy, C, label + i)
+        contracted.append((label + i, C, in_to_cycle, out_from_cycle))
 
     # Recursive call
-    F_prime = cle(
+    parent = cle_parent_map(
         D_copy,
         r,
-        label + 1,
+        label + len(cycles),
         level + 1,
-        draw_fn=None,
-        log=None,
-        boilerplate=boilerplate,
+        boilerplate=False,
         lang=lang,
         metrics=metrics,
+        batch=batch,
     )
 
-    F_prime_expanded = expand_arborescence(
-        D,
-        label,
-        draw_fn=draw_fn,
-        log=log,
-        boilerplate=boilerplate,
-        lang=lang,
-        indent=indent,
-        C=C,
-        in_to_cycle=in_to_cycle,
-        out_from_cycle=out_from_cycle,
-        F_prime=F_prime,
+    # Expand the supernodes of this level, last contracted first
+    for cycle_label, C, in_to_cycle, out_from_cycle in reversed(contracted):
+        parent = expand_arborescence(
+            cycle_label,
+            trace=trace,
+            lang=lang,
+            indent=indent,
+            C=C,
+            in_to_cycle=in_to_cycle,
+            out_from_cycle=out_from_cycle,
+            parent=parent,
+        )
+    return parent
+
+def cle_iterative(
+    D: nx.DiGraph,
+    r: int,
+    **kwargs,
+):
+    """
+    Non-recursive Chu-Liu/Edmonds. Keeps a single working copy of D, contracts
+    one cycle (or, with batch, every cycle) per level in it and records each
+    contraction (label, cycle, in_to_cycle, out_from_cycle) on an explicit stack,
+    which is then unwound over a parent map with expand_arborescence. Memory
+    holds one graph plus the contraction records, whatever the contraction
+    depth. A CSRDigraph is solved by cle_csr.
+
+    Parameters:
+        - D: A directed graph (networkx.DiGraph or CSRDigraph)
+        - r: The root node
+        - **kwargs: Additional parameters:
+            - trace: Optional event sink (see tracing.get_sink)
+            - draw_fn: Optional drawing function
+            - log: Optional logging function
+            - boilerplate: If True, enables logging (default: True)
+            - lang: Language for messages ("en" or "pt", default: "pt")
+            - metrics: Optional dict to collect algorithm metrics
+            - batch: If True, contract every cycle of D_zero per level (default: False)
+
+    Returns:
+        - Optimum arborescence as a directed graph (networkx.DiGraph)
+    """
+    # Extract parameters from kwargs with defaults
+    trace = get_sink(kwargs)
+    lang = kwargs.get("lang", "pt")
+    metrics = kwargs.get("metrics", None)
+    batch = kwargs.get("batch", False)
+
+    if isinstance(D, CSRDigraph):
+        return cle_csr(D, r, **kwargs)
+
+    if metrics is not None:
+        metrics.setdefault("contractions", 0)
+        metrics.setdefault("max_depth", 0)
+
+    if lang == "en":
+        assert r in D, (
+            "\n chuliu_edmonds: The root vertex '"
+            + str(r)
+            + "' is not present in the graph."
+        )
+    elif lang == "pt":
+        assert r in D, (
+            "\n chuliu_edmonds: O vértice raiz '"
+            + str(r)
+            + "' não está presente no grafo."
+        )
+
+    D_work = cast(nx.DiGraph, D.copy())
+    label = len(D.nodes)
+    stack = []
+    level = 0
+
+    # Contract cycles level by level until D_zero is an arborescence
+    while True:
+        indent = "  " * level
+        if metrics is not None and level > metrics["max_depth"]:
+            metrics["max_depth"] = level
+
+        # As in cle, only the outermost level logs and draws
+        if trace and level == 0:
+            trace(CLE_LEVEL_START, indent, level)
+
+        parent, cycles = reduce_and_find_cycles(
+            D_work,
+            r,
+            trace=trace if level == 0 else None,
+            boilerplate=False,
+            lang=lang,
+            indent=indent,
+            batch=batch,
+        )
+        if not cycles:
+            break
+
+        if metrics is not None:
+            metrics["contractions"] += len(cycles)
+
+        for C in cycles:
+            in_to_cycle, out_from_cycle = contract_cycle(D_work, C, label)
+            stack.append((label, C, in_to_cycle, out_from_cycle))
+            label += 1
+        level += 1
+
+    # Unwind the contractions, innermost first
+    while stack:
+        label, C, in_to_cycle, out_from_cycle = stack.pop()
+        outermost = not stack
+        parent = expand_arborescence(
+            label,
+            trace=trace if outermost else None,
+            boilerplate=False,
+            lang=lang,
+            indent="",
+            C=C,
+            in_to_cycle=in_to_cycle,
+            out_from_cycle=out_from_cycle,
+            parent=parent,
+        )
+    return parent_map_to_digraph(parent, D)
+
+def find_parent_cycles(vertices: list[int], tail: list[int], batch: bool = True):
+    """
+    Find the cycles of the functional graph where every vertex v points to tail[v],
+    in a single colouring pass. Walks stop at the root, whose tail is NIL.
+
+    Parameters:
+        - vertices: the non-root vertices
+        - tail: tail of the arc entering each vertex (NIL for the root)
+        - batch: If False, stop at the first cycle found (default: True)
+
+    Returns:
+        - list with the vertices of each cycle, empty if the arcs form an arborescence
+    """
+    state = [NEW] * len(tail)
+    cycles = []
+    for s in vertices:
+        if state[s] != NEW:
+            continue
+        path = []
+        x = s
+        while tail[x] != NIL and state[x] == NEW:
+            state[x] = ON_PATH
+            path.append(x)
+            x = tail[x]
+        if state[x] == ON_PATH:
+            cycles.append(path[path.index(x) :])
+            if not batch:
+                break
+        for y in path:
+            state[y] = DONE
+    return cycles
+
+def cheapest_per_key(arcs: np.ndarray, key: np.ndarray, w: np.ndarray):
+    """
+    Among the given arcs, keep the cheapest one for every value of key
+    (the first in arc order on ties).
+
+    Parameters:
+        - arcs: ids of the candidate arcs, in arc order
+        - key: array giving the grouping value of every arc (e.g. its tail)
+        - w: weight of every arc
+
+    Returns:
+        - ids of the kept arcs, ordered by key
+    """
+    if arcs.size == 0:
+        return arcs
+    arcs = arcs[np.lexsort((w[arcs], key[arcs]))]
+    k = key[arcs]
+    return arcs[np.r_[True, k[1:] != k[:-1]]]
+
+def cle_csr(D: CSRDigraph, r, **kwargs):
+    """
+    Chu-Liu/Edmonds on a CSRDigraph. Follows cle level by level (reduce the costs
+    entering every vertex, pick a zero arc per vertex, contract one cycle or, with
+    batch, all of them), but a level is a set of parallel NumPy arc arrays
+    instead of a graph copy and each arc of a level remembers the original arc
+    it stands for. The first two steps run as one batch per level
+    (normalize_in_edges). The contracted cycles form a forest, which
+    expand_contraction_forest unwinds into the original arcs.
+
+    Parameters:
+        - D: A directed graph (CSRDigraph)
+        - r: The root node
+        - **kwargs: Additional parameters:
+            - trace: Optional event sink (see tracing.get_sink)
+            - draw_fn: Optional drawing function
+            - log: Optional logging function
+            - boilerplate: If True, enables logging (default: True)
+            - lang: Language for messages ("en" or "pt", default: "pt")
+            - metrics: Optional dict to collect algorithm metrics
+            - batch: If True, contract every cycle of D_zero per level (default: False)
+
+    Returns:
+        - Optimum arborescence as a directed graph (networkx.DiGraph)
+    """
+    trace = get_sink(kwargs)
+    lang = kwargs.get("lang", "pt")
+    metrics = kwargs.get("metrics", None)
+    batch = kwargs.get("batch", False)
+
+    if metrics is not None:
+        metrics.setdefault("contractions", 0)
+        metrics.setdefault("max_depth", 0)
+
+    if lang == "en":
+        assert r in D, (
+            "\n chuliu_edmonds: The root vertex '"
+            + str(r)
+            + "' is not present in the graph."
+        )
+    elif lang == "pt":
+        assert r in D, (
+            "\n chuliu_edmonds: O vértice raiz '"
+            + str(r)
+            + "' não está presente no grafo."
+        )
+
+    if trace:
+        trace(CLE_CSR_START)
+
+    n = D.n
+    root = D.index[r]
+    keep = D.dst != root
+    eid = np.flatnonzero(keep)
+    src = D.src[keep]
+    dst = D.dst[keep]
+    w = D.weight[keep]
+    vertices = [v for v in range(n) if v != root]
+
+    chosen = [NIL] * n
+    forest_parent = [NIL] * n
+    children = [[] for _ in range(n)]
+    level = 0
+
+    while True:
+        if metrics is not None and level > metrics["max_depth"]:
+            metrics["max_depth"] = level
+        size = len(chosen)
+
+        # Reduce the costs entering every vertex and build D_zero in one batch
+        w, parent = normalize_in_edges(dst, w, size)
+        if lang == "en":
+            assert (
+                parent[vertices] != NIL
+            ).all(), "\n chuliu_edmonds: The graph does not contain an arborescence with the given root."
+        elif lang == "pt":
+            assert (
+                parent[vertices] != NIL
+            ).all(), "\n chuliu_edmonds: O grafo não contém uma arborescência com a raiz dada."
+
+        has_parent = parent != NIL
+        tail = np.full(size, NIL, dtype=np.int64)
+        tail[has_parent] = src[parent[has_parent]]
+        cycles = find_parent_cycles(vertices, tail.tolist(), batch)
+        if not cycles:
+            for v, e in zip(vertices, eid[parent[vertices]].tolist()):
+                chosen[v] = e
+            break
+
+        # Contract each cycle into its own super-vertex, keeping the cheapest arc
+        # between every pair of (super-)vertices
+        if metrics is not None:
+            metrics["contractions"] += len(cycles)
+        group = np.arange(size, dtype=np.int64)
+        contracted = set()
+        for C in cycles:
+            c = len(chosen)
+            chosen.append(NIL)
+            forest_parent.append(NIL)
+            children.append(C)
+            group[C] = c
+            contracted.update(C)
+            for x, e in zip(C, eid[parent[C]].tolist()):
+                chosen[x] = e
+                forest_parent[x] = c
+
+        tails = group[src]
+        heads = group[dst]
+        moved = (tails != src) | (heads != dst)
+        outside = np.flatnonzero(~moved)
+        kept = cheapest_per_key(
+            np.flatnonzero(moved & (tails != heads)), tails * len(chosen) + heads, w
+        )
+
+        src = np.concatenate([src[outside], tails[kept]])
+        dst = np.concatenate([dst[outside], heads[kept]])
+        w = np.concatenate([w[outside], w[kept]])
+        eid = np.concatenate([eid[outside], eid[kept]])
+        vertices = [v for v in vertices if v not in contracted]
+        vertices.extend(range(size, len(chosen)))
+        level += 1
+
+    in_edge = expand_contraction_forest(
+        root, D.dst.tolist(), chosen, forest_parent, children, n
     )
-    return F_prime_expanded
+    A = build_arborescence(D.nodes, root, D.src.tolist(), D.weight.tolist(), in_edge)
+
+    if trace:
+        trace(CLE_FINAL, "", A)
+        trace(CLE_DRAW_FINAL, A, "")
+    return A
+
+# Engines selectable through chuliu_edmonds(..., engine=name), besides "cle"
+ENGINES = {
+    "iterative": cle_iterative,
+    **ARRAY_ENGINES,
+}
@@ -0,0 +1,282 @@
+import networkx as nx
+
+from csr import CSRDigraph
+from structures import NIL, SkewHeap, UnionFind
+from tracing import CLE_DRAW_FINAL, CLE_ENGINE_START, CLE_FINAL, get_sink
+
+# States of a (super-)vertex while growing paths
+NEW, ON_PATH, DONE = 0, 1, 2
+
+def edge_arrays(D: nx.DiGraph | CSRDigraph, r):
+    """
+    Relabel the vertices of D to 0..n-1 and list its arcs as parallel arrays.
+    Arcs entering the root are skipped, since no arborescence uses them.
+
+    Parameters:
+        - D: A directed graph (networkx.DiGraph or CSRDigraph)
+        - r: The root node
+
+    Returns:
+        - nodes: list mapping each integer id back to its vertex of D
+        - root: integer id of r
+        - src, dst, w: tail, head and weight of every arc
+    """
+    if isinstance(D, CSRDigraph):
+        root = D.index[r]
+        keep = D.dst != root
+        return (
+            list(D.nodes),
+            root,
+            D.src[keep].tolist(),
+            D.dst[keep].tolist(),
+            D.weight[keep].tolist(),
+        )
+
+    nodes = list(D.nodes)
+    index = {v: i for i, v in enumerate(nodes)}
+    root = index[r]
+    src, dst, w = [], [], []
+    for u, v, weight in D.edges(data="w"):
+        j = index[v]
+        if j != root:
+            src.append(index[u])
+            dst.append(j)
+            w.append(weight)
+    return nodes, root, src, dst, w
+
+def expand_contraction_forest(
+    root: int,
+    dst: list[int],
+    chosen: list[int],
+    forest_parent: list[int],
+    children: list[list[int]],
+    n: int,
+):
+    """
+    Recover the arc entering each original vertex from a contraction forest.
+    Every top-level (super-)vertex keeps its chosen arc e; the (super-)vertices on
+    the forest path from the head of e up to it lose theirs, and their siblings
+    become top-level in turn.
+
+    Parameters:
+        - root: integer id of the root
+        - dst: head of every arc
+        - chosen: arc chosen to enter each (super-)vertex
+        - forest_parent: super-vertex each (super-)vertex was contracted into (NIL if none)
+        - children: cycle members of each super-vertex (empty for original vertices)
+        - n: number of original vertices
+
+    Returns:
+        - in_edge: list with the arc entering each original vertex (NIL for the root)
+    """
+    in_edge = [NIL] * n
+    active = [
+        x for x in range(len(chosen)) if forest_parent[x] == NIL and x != root
+    ]
+    while active:
+        x = active.pop()
+        e = chosen[x]
+        y = dst[e]
+        in_edge[y] = e
+        while y != x:
+            p = forest_parent[y]
+            for c in children[p]:
+                if c != y:
+                    active.append(c)
+            y = p
+    return in_edge
+
+def tarjan_in_edges(
+    n: int,
+    root: int,
+    src: list[int],
+    dst: list[int],
+    w: list,
+    metrics: dict | None = None,
+):
+    """
+    Tarjan's O(E log V) version of Chu-Liu/Edmonds on integer arrays.
+    Each (super-)vertex keeps a skew heap with its entering arcs, keyed by reduced
+    cost; contractions are tracked with union-find and a contraction forest, so the
+    graph is never copied.
+
+    Parameters:
+        - n: number of vertices (ids 0..n-1)
+        - root: integer id of the root
+        - src, dst, w: tail, head and weight of every arc
+        - metrics: Optional dict to collect algorithm metrics
+
+    Returns:
+        - in_edge: list with the arc entering each vertex in the optimum arborescence
+    """
+    pool = SkewHeap()
+    heap = [NIL] * n
+    incoming = [[] for _ in range(n)]
+    for e, v in enumerate(dst):
+        incoming[v].append(e)
+    for v in range(n):
+        arcs = incoming[v]
+        if arcs and v != root:
+            arcs.sort(key=w.__getitem__)
+            heap[v] = pool.chain([w[e] for e in arcs], arcs)
+
+    uf = UnionFind(n)
+    state = [NEW] * n
+    state[root] = DONE
+    chosen = [NIL] * n
+    forest_parent = [NIL] * n
+    children = [[] for _ in range(n)]
+    depth = [0] * n
+    contractions = 0
+
+    for s in range(n):
+        if state[s] != NEW:
+            continue
+        path = []
+        x = s
+        while True:
+            state[x] = ON_PATH
+            path.append(x)
+
+            # Cheapest arc entering x from outside it
+            h = heap[x]
+            while True:
+                assert (
+                    h != NIL
+                ), "\n chuliu_edmonds: The graph does not contain an arborescence with the given root."
+                key, e = pool.top(h)
+                u = uf.find(src[e])
+                if u != x:
+                    break
+                h = pool.pop(h)
+
+            # Reduce the costs of the arcs entering x
+            h = pool.pop(h)
+            pool.add(h, -key)
+            heap[x] = h
+            chosen[x] = e
+
+            if state[u] == DONE:
+                break
+            if state[u] == NEW:
+                x = u
+                continue
+
+            # u is on the current path: contract the cycle u -> ... -> x -> u
+            contractions += 1
+            c = uf.make_set()
+            heap.append(NIL)
+            state.append(NEW)
+            chosen.append(NIL)
+            forest_parent.append(NIL)
+            children.append([])
+            depth.append(0)
+            merged = NIL
+            d = 0
+            while True:
+                y = path.pop()
+                children[c].append(y)
+                forest_parent[y] = c
+                uf.link(y, c)
+                merged = pool.meld(merged, heap[y])
+                d = max(d, depth[y])
+                if y == u:
+                    break
+            depth[c] = d + 1
+            heap[c] = merged
+            x = c
+
+        for y in path:
+            state[y] = DONE
+
+    if metrics is not None:
+        metrics.setdefault("contractions", 0)
+        metrics.setdefault("forest_depth", 0)
+        metrics["contractions"] += contractions
+        metrics["forest_depth"] = max(metrics["forest_depth"], max(depth, default=0))
+
+    return expand_contraction_forest(root, dst, chosen, forest_parent, children, n)
+
+def build_arborescence(nodes: list, root: int, src: list[int], w: list, in_edge: list[int]):
+    """
+    Build the arborescence as a directed graph from the arc entering each vertex.
+
+    Parameters:
+        - nodes: list mapping each integer id back to its vertex
+        - root: integer id of the root
+        - src, w: tail and weight of every arc
+        - in_edge: arc entering each vertex (NIL for the root)
+
+    Returns:
+        - A directed graph (networkx.DiGraph) with the original weights
+    """
+    A = nx.DiGraph()
+    A.add_node(nodes[root])
+    for v, e in enumerate(in_edge):
+        if e != NIL:
+            A.add_edge(nodes[src[e]], nodes[v], w=w[e])
+    return A
+
+def run_engine(D: nx.DiGraph | CSRDigraph, r, solver, name: str, **kwargs):
+    """
+    Run an array-based Chu-Liu/Edmonds solver on D and return the arborescence.
+
+    Parameters:
+        - D: A directed graph (networkx.DiGraph or CSRDigraph)
+        - r: The root node
+        - solver: function (n, root, src, dst, w, metrics) -> in_edge
+        - name: Engine name used in log messages
+        - **kwargs: Additional parameters:
+            - trace: Optional event sink (see tracing.get_sink)
+            - draw_fn: Optional drawing function
+            - log: Optional logging function
+            - boilerplate: If True, enables logging (default: True)
+            - lang: Language for messages ("en" or "pt", default: "pt")
+            - metrics: Optional dict to collect algorithm metrics. There are no
+              levels to count, so instead of "max_depth" (the deepest level of
+              cle) the engines record "forest_depth", the nesting depth of the
+              contracted super-vertices.
+
+    Returns:
+        - Optimum arborescence as a directed graph (networkx.DiGraph)
+    """
+    trace = get_sink(kwargs)
+    lang = kwargs.get("lang", "pt")
+    metrics = kwargs.get("metrics", None)
+
+    if lang == "en":
+        assert r in D, (
+            "\n chuliu_edmonds: The root vertex '"
+            + str(r)
+            + "' is not present in the graph."
+        )
+    elif lang == "pt":
+        assert r in D, (
+            "\n chuliu_edmonds: O vértice raiz '"
+            + str(r)
+            + "' não está presente no grafo."
+        )
+
+    if trace:
+        trace(CLE_ENGINE_START, name)
+
+    nodes, root, src, dst, w = edge_arrays(D, r)
+    in_edge = solver(len(nodes), root, src, dst, w, metrics)
+    A = build_arborescence(nodes, root, src, w, in_edge)
+
+    if trace:
+        trace(CLE_FINAL, "", A)
+        trace(CLE_DRAW_FINAL, A, "")
+    return A
+
+def tarjan(D: nx.DiGraph, r, **kwargs):
+    """
+    Finds the optimum arborescence of D rooted at r with Tarjan's O(E log V)
+    engine (skew heaps of arcs). See run_engine for the parameters.
+    """
+    return run_engine(D, r, tarjan_in_edges, "tarjan", **kwargs)
+
+# Engines selectable through chuliu.chuliu_edmonds(..., engine=name)
+ENGINES = {
+    "tarjan": tarjan,
+}
@@ -0,0 +1,15 @@
+"""Seeded instances shared by the unit tests."""
+
+from tests import PESO_MAX, PESO_MIN, build_rooted_digraph_np, get_edge_count_range
+
+SEEDS = range(10)
+N = 40
+
+
+def instance(family: str, seed: int, csr: bool = False):
+    m = sum(get_edge_count_range(N, family)) // 2
+    return build_rooted_digraph_np(N, m, 0, PESO_MIN, PESO_MAX, family, seed=seed, csr=csr)
+
+
+def cost(A) -> float:
+    return sum(w for _, _, w in A.edges(data="w"))
@@ -0,0 +1,193 @@
+import os
+import random
+import zipfile
+from typing import Optional
+
+import numpy as np
+
+# A corpus is a directory of instances generated once, one uncompressed .npz
+# file per instance, so every run and every engine reads byte-identical arcs:
+#     src, dst, weight: arcs over the vertex ids 0..n-1, root at id 0, without
+#                       the arcs entering the root
+#     family, n, m, seed: metadata, as 0-d arrays
+# The members are stored uncompressed so that load_instance can map each array
+# straight from its offset in the zip file.
+
+CORPUS_DIR = "corpus"
+NUM_INSTANCES = 20
+MIN_VERTICES = 2000
+MAX_VERTICES = 2000
+FAMILY = "random"
+SEED = 0
+ARRAYS = ("src", "dst", "weight")
+
+
+def instance_path(directory: str, family: str, index: int) -> str:
+    """Path of instance #index of a family inside a corpus directory."""
+    return os.path.join(directory, f"{family}_{index:05d}.npz")
+
+
+def save_instance(
+    path: str, src, dst, weight, family: str, n: int, seed: Optional[int]
+) -> None:
+    """
+    Store one instance. The arcs entering the root (id 0) are dropped, as the
+    solvers would remove them anyway.
+
+    Parameters:
+        - path: .npz file to write
+        - src, dst, weight: tail, head and weight of every arc
+        - family: instance family
+        - n: number of vertices
+        - seed: seed the instance was generated from (None if unknown)
+    """
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    weight = np.asarray(weight)
+    keep = dst != 0
+    np.savez(
+        path,
+        src=src[keep],
+        dst=dst[keep],
+        weight=weight[keep],
+        family=np.array(family),
+        n=np.array(n, dtype=np.int64),
+        m=np.array(int(keep.sum()), dtype=np.int64),
+        seed=np.array(-1 if seed is None else seed, dtype=np.int64),
+    )
+
+
+def _map_member(path: str, info: zipfile.ZipInfo) -> np.ndarray:
+    # np.load ignores mmap_mode for .npz files, so map the .npy member from
+    # its offset in the zip: local header (30 bytes + name + extra), then the
+    # .npy header, then the raw array
+    with open(path, "rb") as f:
+        f.seek(info.header_offset)
+        header = f.read(30)
+        name_len = int.from_bytes(header[26:28], "little")
+        extra_len = int.from_bytes(header[28:30], "little")
+        f.seek(info.header_offset + 30 + name_len + extra_len)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    if not shape or 0 in shape:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(
+        path,
+        dtype=dtype,
+        mode="r",
+        offset=offset,
+        shape=shape,
+        order="F" if fortran else "C",
+    )
+
+
+def load_instance(path: str, mmap_mode: Optional[str] = "r") -> dict:
+    """
+    Load an instance written by save_instance.
+
+    Parameters:
+        - path: .npz file
+        - mmap_mode: "r" to map src/dst/weight read-only from the file instead
+          of reading them (default: "r"); None reads them into memory
+
+    Returns:
+        - dict with the arrays src, dst, weight and the metadata family (str),
+          n, m and seed (int, None if unknown)
+    """
+    instance = {}
+    with np.load(path) as data:
+        for key in ("family", "n", "m", "seed"):
+            instance[key] = data[key].item()
+        if mmap_mode is None:
+            for key in ARRAYS:
+                instance[key] = data[key]
+    if instance["seed"] == -1:
+        instance["seed"] = None
+
+    if mmap_mode is not None:
+        with zipfile.ZipFile(path) as archive:
+            for key in ARRAYS:
+                info = archive.getinfo(key + ".npy")
+                if info.compress_type == zipfile.ZIP_STORED:
+                    instance[key] = _map_member(path, info)
+                else:
+                    with archive.open(info) as f:
+                        instance[key] = np.lib.format.read_array(f)
+    return instance
+
+
+def list_instances(directory: str) -> list:
+    """Paths of the instances of a corpus directory, in name order."""
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith(".npz")
+    )
+
+
+def build_corpus(
+    directory: str = CORPUS_DIR,
+    num_instances: int = NUM_INSTANCES,
+    min_vertices: int = MIN_VERTICES,
+    max_vertices: int = MAX_VERTICES,
+    family: str = FAMILY,
+    seed: int = SEED,
+    **kwargs,
+) -> list:
+    """
+    Generate num_instances instances with tests.build_rooted_arcs and store them.
+    Instance i is drawn from tests.derive_test_seed(seed, i), like test #i of
+    volume_tester, and existing files are kept, so a corpus can be extended.
+
+    Parameters:
+        - directory: corpus directory (created if missing)
+        - num_instances: number of instances
+        - min_vertices, max_vertices: range of the number of vertices
+        - family: instance family
+        - seed: master seed
+        - **kwargs: Additional parameters:
+            - peso_min, peso_max: range of the weights (default: tests.PESO_MIN,
+              tests.PESO_MAX)
+
+    Returns:
+        - paths of the instances
+    """
+    # tests imports this module, so import the generators only when used
+    from tests import (
+        PESO_MAX,
+        PESO_MIN,
+        build_rooted_arcs,
+        derive_test_seed,
+        get_edge_count_range,
+    )
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(1, num_instances + 1):
+        path = instance_path(directory, family, i)
+        paths.append(path)
+        if os.path.exists(path):
+            continue
+        instance_seed = derive_test_seed(seed, i)
+        rng = random.Random(instance_seed)
+        n = rng.randint(min_vertices, max_vertices)
+        m = rng.randint(*get_edge_count_range(n, family))
+        src, dst, weight = build_rooted_arcs(
+            n,
+            m,
+            kwargs.get("peso_min", PESO_MIN),
+            kwargs.get("peso_max", PESO_MAX),
+            family,
+            seed=instance_seed,
+        )
+        save_instance(path, src, dst, weight, family, n, instance_seed)
+    return paths
+
+
+if __name__ == "__main__":
+    for path in build_corpus():
+        print(path)
@@ -0,0 +1,158 @@
+import numpy as np
+import networkx as nx
+
+class CSRDigraph:
+    """
+    Compact directed graph for the solvers' hot loops. Vertices are relabelled
+    to 0..n-1 and arc i is the i-th arc of the source graph's edge order, stored
+    in NumPy arrays. The arcs are also grouped by head (in-edges) and by tail
+    (out-edges) in compressed sparse row layout: the arcs entering v are the
+    positions in_indptr[v]..in_indptr[v+1]-1 of the in_* arrays, in arc order.
+
+    Attributes:
+        - nodes: list mapping each integer id to its original vertex
+        - index: dict mapping each original vertex to its integer id
+        - src, dst, weight: tail, head and weight of every arc
+        - in_indptr, in_src, in_weight, in_eid: arcs grouped by head (in_eid is the arc id)
+        - out_indptr, out_dst, out_weight, out_eid: arcs grouped by tail
+
+    Parameters:
+        - nodes: list of the original vertices, in id order
+        - src, dst: integer ids of the tail and head of every arc
+        - weight: weight of every arc
+    """
+
+    def __init__(self, nodes: list, src, dst, weight):
+        self.nodes = list(nodes)
+        self.index = {v: i for i, v in enumerate(self.nodes)}
+        n = len(self.nodes)
+        self.src = np.asarray(src, dtype=np.int64)
+        self.dst = np.asarray(dst, dtype=np.int64)
+        self.weight = np.asarray(weight)
+        if self.weight.dtype == object or self.weight.size == 0:
+            self.weight = self.weight.astype(np.float64)
+
+        # In-edges: arcs sorted by head, keeping arc order inside each head
+        self.in_eid = np.argsort(self.dst, kind="stable")
+        self.in_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.dst, minlength=n), out=self.in_indptr[1:])
+        self.in_src = self.src[self.in_eid]
+        self.in_weight = self.weight[self.in_eid]
+
+        # Out-edges: arcs sorted by tail
+        self.out_eid = np.argsort(self.src, kind="stable")
+        self.out_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.src, minlength=n), out=self.out_indptr[1:])
+        self.out_dst = self.dst[self.out_eid]
+        self.out_weight = self.weight[self.out_eid]
+
+        self._edge_ids = None
+
+    @classmethod
+    def from_networkx(cls, D: nx.DiGraph, weight: str = "w"):
+        """
+        Build a CSRDigraph from a networkx.DiGraph, keeping its node and edge order.
+
+        Parameters:
+            - D: A directed graph (networkx.DiGraph)
+            - weight: Edge attribute holding the weight (default: "w")
+
+        Returns:
+            - The CSRDigraph of D
+        """
+        nodes = list(D.nodes)
+        index = {v: i for i, v in enumerate(nodes)}
+        m = D.number_of_edges()
+        src = np.empty(m, dtype=np.int64)
+        dst = np.empty(m, dtype=np.int64)
+        w = []
+        for i, (u, v, c) in enumerate(D.edges(data=weight)):
+            src[i] = index[u]
+            dst[i] = index[v]
+            w.append(c)
+        return cls(nodes, src, dst, w)
+
+    def to_networkx(self, weight: str = "w") -> nx.DiGraph:
+        """
+        Convert back to a networkx.DiGraph with the original vertices.
+
+        Parameters:
+            - weight: Edge attribute that receives the weight (default: "w")
+
+        Returns:
+            - D: A directed graph (networkx.DiGraph)
+        """
+        D = nx.DiGraph()
+        nodes = self.nodes
+        D.add_nodes_from(nodes)
+        D.add_weighted_edges_from(
+            zip(
+                [nodes[u] for u in self.src.tolist()],
+                [nodes[v] for v in self.dst.tolist()],
+                self.weight.tolist(),
+            ),
+            weight=weight,
+        )
+        return D
+
+    @property
+    def n(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def m(self) -> int:
+        return len(self.src)
+
+    def number_of_nodes(self) -> int:
+        return self.n
+
+    def number_of_edges(self) -> int:
+        return self.m
+
+    def __contains__(self, v) -> bool:
+        return v in self.index
+
+    def __len__(self) -> int:
+        return self.n
+
+    def edges(self):
+        """
+        Iterate over the arcs as (u, v) pairs of original vertices, in arc order.
+        """
+        nodes = self.nodes
+        for u, v in zip(self.src.tolist(), self.dst.tolist()):
+            yield nodes[u], nodes[v]
+
+    def edge_id(self, u, v) -> int:
+        """
+        Return the id of the arc (u, v), given as original vertices.
+        """
+        if self._edge_ids is None:
+            self._edge_ids = {
+                (a, b): i
+                for i, (a, b) in enumerate(zip(self.src.tolist(), self.dst.tolist()))
+            }
+        return self._edge_ids[(self.index[u], self.index[v])]
+
+    def weight_of(self, u, v):
+        """
+        Return the weight of the arc (u, v), given as original vertices.
+        """
+        return self.weight[self.edge_id(u, v)].item()
+
+    def reachable_from(self, r) -> np.ndarray:
+        """
+        Return a boolean array marking the vertices reachable from r.
+        """
+        seen = np.zeros(self.n, dtype=bool)
+        indptr, out_dst = self.out_indptr.tolist(), self.out_dst.tolist()
+        start = self.index[r]
+        seen[start] = True
+        stack = [start]
+        while stack:
+            u = stack.pop()
+            for v in out_dst[indptr[u] : indptr[u + 1]]:
+                if not seen[v]:
+                    seen[v] = True
+                    stack.append(v)
+        return seen
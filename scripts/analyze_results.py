@@ -57,6 +57,12 @@ def summarize(rows):
         if b and b > 0:
             speedups.append(a / b)
 
+    # speedup v1 vs v2 per phase2_v2 queue (older CSVs only have the heap)
+    speedups_by_queue = defaultdict(list)
+    for r, a, b in zip(rows, t_f2v1, t_f2v2):
+        if b and b > 0:
+            speedups_by_queue[r.get("Fila_v2") or "heap"].append(a / b)
+
     # structural metrics
     contractions = [to_int(r.get("Contractions"), 0) for r in rows]
     depth = [to_int(r.get("MaxDepth"), 0) for r in rows]
@@ -80,6 +86,7 @@ def summarize(rows):
         "t_f2v2_mean_median": m(t_f2v2),
         "speedup_count": len(speedups),
         "speedup_mean_median": m(speedups),
+        "speedup_by_queue": {q: m(x) for q, x in speedups_by_queue.items()},
         "contractions_mean_median": m(contractions),
         "depth_mean_median": m(depth),
         "peak_kb_mean_median": m(peak_kb),
@@ -364,6 +371,9 @@ def main():
     if summary["speedup_count"]:
         m_sp, md_sp = summary["speedup_mean_median"]
         print(f"  speedup Fase II (v1/v2) médio/mediano: {m_sp:.2f}/{md_sp:.2f}×")
+        if len(summary["speedup_by_queue"]) > 1:
+            for q, (m_q, md_q) in sorted(summary["speedup_by_queue"].items()):
+                print(f"    fila {q}: {m_q:.2f}/{md_q:.2f}×")
     m_contr, md_contr = summary["contractions_mean_median"]
     m_depth, md_depth = summary["depth_mean_median"]
     print(
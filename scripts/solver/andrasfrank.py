@@ -1,6 +1,8 @@
 import networkx as nx
 import heapq
 
+from util.step_trace import run_traced
+
 id = 1
 
 
@@ -118,7 +120,7 @@ def phase1_find_minimum_arborescence(D_original, r0, iteration=0, **kwargs):
         - r0: root node
         - iteration: Current iteration number
         - **kwargs: Additional parameters:
-            - draw_step: Optional function for step-by-step visualization
+            - trace: Optional StepTrace that records the steps on the graph "D_zero"
             - log: Optional logging function (default: log_dummy)
             - boilerplate: If True, enables logging (default: True)
             - lang: Language for messages ("en" or "pt", default: "pt")
@@ -130,7 +132,7 @@ def phase1_find_minimum_arborescence(D_original, r0, iteration=0, **kwargs):
     """
 
     # Extract parameters from kwargs with defaults
-    draw_step = kwargs.get("draw_step", None)
+    trace = kwargs.get("trace", None)
     log = kwargs.get("log", log_dummy)
     boilerplate = kwargs.get("boilerplate", True)
     lang = kwargs.get("lang", "pt")
@@ -140,17 +142,18 @@ def phase1_find_minimum_arborescence(D_original, r0, iteration=0, **kwargs):
     Dual_list = []  # List to store the dual variables (X, z(X))
     D_zero = build_D_zero(D_copy)
 
-    if boilerplate and draw_step:
+    if boilerplate and trace:
+        trace.init("D_zero", D_zero)
         if lang == "en":
-            draw_step(
-                D_zero,
+            trace.step(
+                "D_zero",
                 id=iteration,
                 title="Initial D_zero",
                 description="Initial D_zero",
             )
         elif lang == "pt":
-            draw_step(
-                D_zero,
+            trace.step(
+                "D_zero",
                 id=iteration,
                 title="D_zero Inicial",
                 description="D_zero Inicial",
@@ -168,20 +171,22 @@ def phase1_find_minimum_arborescence(D_original, r0, iteration=0, **kwargs):
 
         # Calculate the strongly connected components of the graph D_zero.
         C = nx.condensation(D_zero)
-        if boilerplate and draw_step:
+        if boilerplate and trace:
             if lang == "en":
-                draw_step(
-                    C,
+                trace.step(
+                    "D_zero",
                     id=iteration,
                     title=f"Strongly connected components in D_zero - Iteration {iteration}",
                     description=f"Strongly connected components in D_zero - Iteration {iteration}",
+                    view="condensation",
                 )
             elif lang == "pt":
-                draw_step(
-                    C,
+                trace.step(
+                    "D_zero",
                     id=iteration,
                     title=f"Componentes fortemente conexos em D_zero - Iteração {iteration}",
                     description=f"Componentes fortemente conexos em D_zero - Iteração {iteration}",
+                    view="condensation",
                 )
 
         # The sources are where there are no incoming arcs, R0 is always a source.
@@ -219,7 +224,11 @@ def phase1_find_minimum_arborescence(D_original, r0, iteration=0, **kwargs):
                     log(f"\nArestas que entram em X: {arcs}")
                     log(f"\nPeso mínimo encontrado: {min_weight}")
 
+            added = len(A_zero)
             update_weights_in_X(D_copy, arcs, min_weight, A_zero, D_zero)
+            if boilerplate and trace:
+                for u_zero, v_zero in A_zero[added:]:
+                    trace.add_edge("D_zero", u_zero, v_zero)
 
             if boilerplate and log:
                 if lang == "en":
@@ -249,7 +258,7 @@ def phase2_find_minimum_arborescence(D_original, r0, A_zero, iteration=0, **kwar
         - iteration: Current iteration number
         - **kwargs: Additional parameters:
             - draw_fn: Optional drawing function
-            - draw_step: Optional function for step-by-step visualization
+            - trace: Optional StepTrace that records the steps on the graph "Arb"
             - log: Optional logging function (default: log_dummy)
             - boilerplate: If True, enables logging (default: True)
             - lang: Language for messages ("en" or "pt", default: "pt")
@@ -260,7 +269,7 @@ def phase2_find_minimum_arborescence(D_original, r0, A_zero, iteration=0, **kwar
 
     # Extract parameters from kwargs with defaults
     draw_fn = kwargs.get("draw_fn", None)
-    draw_step = kwargs.get("draw_step", None)
+    trace = kwargs.get("trace", None)
     log = kwargs.get("log", log_dummy)
     boilerplate = kwargs.get("boilerplate", True)
     lang = kwargs.get("lang", "pt")
@@ -270,28 +279,33 @@ def phase2_find_minimum_arborescence(D_original, r0, A_zero, iteration=0, **kwar
     Arb.add_node(r0)
     n = len(D_original.nodes())
 
+    if boilerplate and trace:
+        trace.init("Arb", Arb)
+
     # While there are arcs to be considered
     for _ in range(n - 1):
         for u, v in A_zero:
             if u in Arb.nodes() and v not in Arb.nodes():
                 edge_data = D_original.get_edge_data(u, v)
                 Arb.add_edge(u, v, **edge_data)
+                if boilerplate and trace:
+                    trace.add_edge("Arb", u, v, edge_data.get("w"))
                 # Restart the loop after adding an edge
                 break
 
         iteration = iteration + 1
 
-        if boilerplate and draw_step:
+        if boilerplate and trace:
             if lang == "en":
-                draw_step(
-                    Arb,
+                trace.step(
+                    "Arb",
                     id=iteration,
                     title=f"Partial arborescence - Iteration {_+1}",
                     description=f"Partial arborescence - Iteration {_+1}",
                 )
             elif lang == "pt":
-                draw_step(
-                    Arb,
+                trace.step(
+                    "Arb",
                     id=iteration,
                     title=f"Arborescência parcial - Iteração {_+1}",
                     description=f"Arborescência parcial - Iteração {_+1}",
@@ -311,7 +325,7 @@ def phase2_find_minimum_arborescence_v2(D_original, r0, A_zero, iteration=0, **k
         - iteration: Current iteration number
         - **kwargs: Additional parameters:
             - draw_fn: Optional drawing function
-            - draw_step: Optional function for step-by-step visualization
+            - trace: Optional StepTrace that records the steps on the graph "Arb"
             - log: Optional logging function
             - boilerplate: If True, enables logging (default: True)
             - lang: Language for messages ("en" or "pt", default: "pt")
@@ -323,6 +337,7 @@ def phase2_find_minimum_arborescence_v2(D_original, r0, A_zero, iteration=0, **k
     # Extract parameters from kwargs with defaults
     draw_fn = kwargs.get("draw_fn", None)
     draw_step = kwargs.get("draw_step", None)
+    trace = kwargs.get("trace", None)
     log = kwargs.get("log", None)
     boilerplate = kwargs.get("boilerplate", True)
     lang = kwargs.get("lang", "pt")
@@ -344,19 +359,15 @@ def phase2_find_minimum_arborescence_v2(D_original, r0, A_zero, iteration=0, **k
 
     if boilerplate and draw_fn:
         if lang == "en":
-            draw_step(
-                Arb,
-                id=iteration,
-                title=f"Initial arborescence with weights - Phase 2",
-                description=f"Initial arborescence with weights - Phase 2",
-            )
+            title = f"Initial arborescence with weights - Phase 2"
         elif lang == "pt":
-            draw_step(
-                Arb,
-                id=iteration,
-                title=f"Arborescência inicial com pesos - Fase 2",
-                description=f"Arborescência inicial com pesos - Fase 2",
-            )
+            title = f"Arborescência inicial com pesos - Fase 2"
+        # Without a trace (phase 2 called on its own), draw right away
+        if trace:
+            trace.init("Arb", Arb)
+            trace.step("Arb", id=iteration, title=title, description=title)
+        else:
+            draw_step(Arb, id=iteration, title=title, description=title)
 
     # While the queue is not empty
     while q:
@@ -432,7 +443,9 @@ def andras_frank_algorithm(D, **kwargs):
         - D: directed graph (DiGraph)
         - **kwargs: Additional parameters:
             - draw_fn: Optional drawing function
-            - draw_step: Optional function for step-by-step visualization
+            - draw_step: Optional function for step-by-step visualization. Without
+              a trace, the steps are recorded and drawn once the algorithm is done
+            - trace: Optional StepTrace that records the steps
             - log: Optional logging function
             - boilerplate: If True, enables logging (default: True)
             - lang: Language for messages ("en" or "pt", default: "pt")
@@ -450,6 +463,11 @@ def andras_frank_algorithm(D, **kwargs):
     log = kwargs.get("log", None)
     boilerplate = kwargs.get("boilerplate", True)
     lang = kwargs.get("lang", "pt")
+    trace = kwargs.get("trace", None)
+
+    if trace is None and boilerplate and draw_step:
+        return run_traced(andras_frank_algorithm, D, **kwargs)
+
     if boilerplate and log:
         if lang == "en":
             log(f"\nExecuting András Frank algorithm...")
@@ -534,7 +552,8 @@ def find_minimum_arborescence_v1(D, r0, iteration=0, **kwargs):
         - D: directed graph (DiGraph)
         - r0: root node
         - iteration: Current iteration number
-        - **kwargs: Additional parameters passed to phase functions
+        - **kwargs: Additional parameters passed to phase functions. A draw_step
+          without a trace gets the steps drawn once the algorithm is done
 
     Returns:
         - arborescence_frank: DiGraph representing the minimum arborescence
@@ -546,6 +565,11 @@ def find_minimum_arborescence_v1(D, r0, iteration=0, **kwargs):
     log = kwargs.get("log", None)
     boilerplate = kwargs.get("boilerplate", True)
     lang = kwargs.get("lang", "pt")
+    trace = kwargs.get("trace", None)
+
+    if trace is None and boilerplate and draw_step:
+        return run_traced(find_minimum_arborescence_v1, D, r0, iteration, **kwargs)
+
     if boilerplate and log:
         if lang == "en":
             log(f"\nExecuting András Frank algorithm...")
@@ -611,7 +635,8 @@ def find_minimum_arborescence_v2(D, r0, iteration=0, **kwargs):
         - D: directed graph (DiGraph)
         - r0: root node
         - iteration: Current iteration number
-        - **kwargs: Additional parameters passed to phase functions
+        - **kwargs: Additional parameters passed to phase functions. A draw_step
+          without a trace gets the steps drawn once the algorithm is done
 
     Returns:
         - arborescence_frank_v2: DiGraph representing the minimum arborescence
@@ -623,6 +648,11 @@ def find_minimum_arborescence_v2(D, r0, iteration=0, **kwargs):
     log = kwargs.get("log", None)
     boilerplate = kwargs.get("boilerplate", True)
     lang = kwargs.get("lang", "pt")
+    trace = kwargs.get("trace", None)
+
+    if trace is None and boilerplate and draw_step:
+        return run_traced(find_minimum_arborescence_v2, D, r0, iteration, **kwargs)
+
     if boilerplate and log:
         if lang == "en":
             log(f"\nExecuting András Frank algorithm...")
@@ -1,5 +1,7 @@
 import networkx as nx
 
+from util.step_trace import run_traced
+
 
 # Normalização dos pesos das arestas que entram em um vértice
 def normalize_incoming_edge_weights(D: nx.DiGraph, node: str, lang="pt"):
@@ -13,7 +15,8 @@ def normalize_incoming_edge_weights(D: nx.DiGraph, node: str, lang="pt"):
         - lang: Language for error messages ("en" for English, "pt" for Portuguese)
 
     Returns:
-        - Nothing (the graph G is modified in place)
+        - yv: The minimum incoming weight subtracted from each edge, or None if
+          the node has no incoming edges (the graph G is modified in place)
     """
 
     if lang == "en":
@@ -29,7 +32,7 @@ def normalize_incoming_edge_weights(D: nx.DiGraph, node: str, lang="pt"):
     predecessors = list(D.in_edges(node, data="w"))
 
     if not predecessors:
-        return
+        return None
 
     # Calculate the minimum weight among the incoming edges
     yv = min((w for _, _, w in predecessors))
@@ -37,6 +40,7 @@ def normalize_incoming_edge_weights(D: nx.DiGraph, node: str, lang="pt"):
     # Subtract Yv from each incoming edge
     for u, _, _ in predecessors:
         D[u][node]["w"] -= yv
+    return yv
 
 
 # Cria o conjunto F*
@@ -256,7 +260,10 @@ def find_optimum_arborescence_chuliu(D: nx.DiGraph, r0: str, level=0, id=1, **kw
         - id: Current step ID for visualization
         - **kwargs: Additional parameters:
             - draw_fn: Optional function to visualize the graph at each step
-            - draw_step: Optional function for step-by-step visualization
+            - draw_step: Optional function for step-by-step visualization. Without
+              a trace, the steps are recorded and drawn once the algorithm is done
+            - trace: Optional StepTrace that records the steps as deltas on the
+              graphs "D" (working graph) and "F_star"
             - log: Optional logging function to log information
             - boilerplate: If True, enables logging and visualization (default: True)
             - lang: Language for logging messages ("en" or "pt", default: "pt")
@@ -280,6 +287,10 @@ def find_optimum_arborescence_chuliu(D: nx.DiGraph, r0: str, level=0, id=1, **kw
     log = kwargs.get("log", None)
     boilerplate = kwargs.get("boilerplate", True)
     lang = kwargs.get("lang", "pt")
+    trace = kwargs.get("trace", None)
+
+    if level == 0 and trace is None and boilerplate and draw_step:
+        return run_traced(find_optimum_arborescence_chuliu, D, r0, level, id, **kwargs)
 
     indent = "  " * level
 
@@ -296,30 +307,36 @@ def find_optimum_arborescence_chuliu(D: nx.DiGraph, r0: str, level=0, id=1, **kw
 
     D_copy = D.copy()
 
+    # The working graph of a level starts as the contracted graph of the level
+    # above, so only the first level records it whole
+    if boilerplate and trace and level == 0:
+        trace.init("D", D_copy)
+
     if boilerplate and log:
         if lang == "en":
             log(f"Removing edges entering '{r0}'")
         elif lang == "pt":
             log(f"Removendo arestas que entram em '{r0}'")
-        if draw_step:
-            if lang == "en":
-                draw_step(
-                    D_copy,
-                    id=id,
-                    title=f"After removing incoming edges",
-                    description=f"After removing incoming edges",
-                )
-            elif lang == "pt":
-                draw_step(
-                    D_copy,
-                    id=id,
-                    title=f"Após remoção de entradas",
-                    description=f"Após remoção de entradas",
-                )
+    if boilerplate and log and trace:
+        if lang == "en":
+            trace.step(
+                "D",
+                id=id,
+                title=f"After removing incoming edges",
+                description=f"After removing incoming edges",
+            )
+        elif lang == "pt":
+            trace.step(
+                "D",
+                id=id,
+                title=f"Após remoção de entradas",
+                description=f"Após remoção de entradas",
+            )
 
     for v in D_copy.nodes:
+        yv = None
         if v != r0:
-            normalize_incoming_edge_weights(D_copy, v, lang=lang)
+            yv = normalize_incoming_edge_weights(D_copy, v, lang=lang)
 
         if boilerplate and log:
             if lang == "en":
@@ -327,18 +344,22 @@ def find_optimum_arborescence_chuliu(D: nx.DiGraph, r0: str, level=0, id=1, **kw
             elif lang == "pt":
                 log(f"Normalizando pesos de arestas de entrada para '{v}'")
 
+        if boilerplate and trace and yv:
+            trace.normalize("D", v, yv)
+
+        if boilerplate and log:
             id = id + 1
-            if draw_step:
+            if trace:
                 if lang == "en":
-                    draw_step(
-                        D_copy,
+                    trace.step(
+                        "D",
                         id=id,
                         title=f"Weight adjustment",
                         description=f"After weight adjustment",
                     )
                 elif lang == "pt":
-                    draw_step(
-                        D_copy,
+                    trace.step(
+                        "D",
                         id=id,
                         title=f"Ajuste de pesos",
                         description=f"Após ajuste de pesos",
@@ -354,21 +375,23 @@ def find_optimum_arborescence_chuliu(D: nx.DiGraph, r0: str, level=0, id=1, **kw
             log(f"{indent}Building F_star")
         elif lang == "pt":
             log(f"{indent}Construindo F_star")
-        if draw_step:
-            if lang == "pt":
-                draw_step(
-                    F_star,
-                    id=id,
-                    title=f"F_star",
-                    description=f"Conjunto F* (arestas de custo zero após ajuste dos pesos de entrada de cada vértice, exceto a raiz).",
-                )
-            elif lang == "en":
-                draw_step(
-                    F_star,
-                    id=id,
-                    title=f"F_star",
-                    description=f"Set F* (edges with zero cost after adjusting the weights of incoming edges to each vertex, except the root).",
-                )
+    if boilerplate and trace:
+        trace.init("F_star", F_star)
+    if boilerplate and log and trace:
+        if lang == "pt":
+            trace.step(
+                "F_star",
+                id=id,
+                title=f"F_star",
+                description=f"Conjunto F* (arestas de custo zero após ajuste dos pesos de entrada de cada vértice, exceto a raiz).",
+            )
+        elif lang == "en":
+            trace.step(
+                "F_star",
+                id=id,
+                title=f"F_star",
+                description=f"Set F* (edges with zero cost after adjusting the weights of incoming edges to each vertex, except the root).",
+            )
 
     if nx.is_arborescence(F_star):
         for u, v in F_star.edges:
@@ -393,6 +416,8 @@ def find_optimum_arborescence_chuliu(D: nx.DiGraph, r0: str, level=0, id=1, **kw
         in_to_cycle, out_from_cycle = contract_cycle(
             D_copy, C, contracted_label, lang=lang
         )
+        if boilerplate and trace:
+            trace.contract("D", contracted_label, C.nodes, in_to_cycle, out_from_cycle)
 
         # Recursive call
         F_prime = find_optimum_arborescence_chuliu(
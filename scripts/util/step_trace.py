@@ -0,0 +1,253 @@
+import json
+import networkx as nx
+
+# A step trace is a list of operations on named graphs. Graphs are created by
+# an "init" operation and then only changed by small deltas; a "step"
+# operation marks a point of the run that the visualizer shows. Each operation
+# is a JSON object, so a trace is written as JSON-lines, one operation per line:
+#     {"op": "init", "g": "D", "nodes": [...], "edges": [[u, v, w], ...]}
+#     {"op": "normalize", "g": "D", "v": v, "y": 3.0}
+#     {"op": "step", "g": "D", "id": 2, "title": "...", "description": "..."}
+
+
+class StepTrace:
+    """
+    Records the steps of a solver as deltas instead of drawing them.
+    The solver calls the recording methods while it runs; StepReplayer rebuilds
+    the graph of any step afterwards.
+
+    Attributes:
+        - ops: list of operations (dicts), in order
+        - steps: positions in ops of the "step" operations
+    """
+
+    def __init__(self):
+        self.ops = []
+        self.steps = []
+
+    def init(self, g: str, G: nx.DiGraph):
+        """
+        Start (or restart) graph g as a copy of G.
+        """
+        self.ops.append(
+            {
+                "op": "init",
+                "g": g,
+                "nodes": list(G.nodes),
+                "edges": [[u, v, w] for u, v, w in G.edges(data="w")],
+            }
+        )
+
+    def add_edge(self, g: str, u, v, w=None):
+        """
+        Add the edge (u, v) to graph g, with weight w if given.
+        """
+        self.ops.append({"op": "add_edge", "g": g, "u": u, "v": v, "w": w})
+
+    def normalize(self, g: str, v, y: float):
+        """
+        Subtract y from the weight of every edge entering v in graph g.
+        """
+        self.ops.append({"op": "normalize", "g": g, "v": v, "y": y})
+
+    def contract(
+        self,
+        g: str,
+        label,
+        cycle,
+        in_to_cycle: dict,
+        out_from_cycle: dict,
+    ):
+        """
+        Replace the vertices of cycle by the supernode label in graph g, as
+        contract_cycle does: u -> label for each u in in_to_cycle and
+        label -> v for each v in out_from_cycle, with their weights.
+        """
+        self.ops.append(
+            {
+                "op": "contract",
+                "g": g,
+                "label": label,
+                "cycle": list(cycle),
+                "in": [[u, w] for u, (_, w) in in_to_cycle.items()],
+                "out": [[v, w] for v, (_, w) in out_from_cycle.items()],
+            }
+        )
+
+    def expand(self, g: str, label, edges: list):
+        """
+        Add edges (u, v) to graph g and remove the supernode label.
+        The weights of the new edges are set by a later weights operation.
+        """
+        self.ops.append(
+            {"op": "expand", "g": g, "label": label, "edges": [list(e) for e in edges]}
+        )
+
+    def weights(self, g: str, edges: list):
+        """
+        Set the weight of the edges (u, v, w) of graph g.
+        """
+        self.ops.append(
+            {"op": "weights", "g": g, "edges": [list(e) for e in edges]}
+        )
+
+    def step(self, g: str, title: str, description: str = "", id=None, view=None):
+        """
+        Mark a step showing graph g. With view="condensation" the step shows
+        the condensation of g instead of g itself.
+        """
+        self.steps.append(len(self.ops))
+        self.ops.append(
+            {
+                "op": "step",
+                "g": g,
+                "id": id if id is not None else len(self.steps),
+                "title": title,
+                "description": description,
+                "view": view,
+            }
+        )
+
+    def next_id(self) -> int:
+        """
+        Return an id after the id of the last step.
+        """
+        if not self.steps:
+            return 1
+        return self.ops[self.steps[-1]]["id"] + 1
+
+    def to_jsonl(self) -> str:
+        """
+        Serialize the trace as JSON-lines.
+        """
+        return "\n".join(json.dumps(op, ensure_ascii=False) for op in self.ops)
+
+    @classmethod
+    def from_jsonl(cls, text: str):
+        """
+        Load a trace written by to_jsonl.
+        """
+        trace = cls()
+        for line in text.splitlines():
+            if line.strip():
+                op = json.loads(line)
+                if op["op"] == "step":
+                    trace.steps.append(len(trace.ops))
+                trace.ops.append(op)
+        return trace
+
+
+class StepReplayer:
+    """
+    Rebuilds the graphs of a StepTrace. Moving forward only applies the
+    operations between two steps; moving back to an earlier step replays the
+    trace from its start.
+
+    Parameters:
+        - trace: A StepTrace
+    """
+
+    def __init__(self, trace: StepTrace):
+        self.trace = trace
+        self.graphs = {}
+        self.position = 0
+
+    def _apply(self, op: dict):
+        kind = op["op"]
+        if kind == "step":
+            return
+        if kind == "init":
+            G = nx.DiGraph()
+            G.add_nodes_from(op["nodes"])
+            G.add_weighted_edges_from(op["edges"], weight="w")
+            self.graphs[op["g"]] = G
+            return
+
+        G = self.graphs[op["g"]]
+        if kind == "add_edge":
+            if op["w"] is None:
+                G.add_edge(op["u"], op["v"])
+            else:
+                G.add_edge(op["u"], op["v"], w=op["w"])
+        elif kind == "normalize":
+            v, y = op["v"], op["y"]
+            for u in G.pred[v]:
+                G[u][v]["w"] -= y
+        elif kind == "contract":
+            label = op["label"]
+            for u, w in op["in"]:
+                G.add_edge(u, label, w=w)
+            for v, w in op["out"]:
+                G.add_edge(label, v, w=w)
+            G.remove_nodes_from(op["cycle"])
+        elif kind == "expand":
+            G.add_edges_from(op["edges"])
+            G.remove_node(op["label"])
+        elif kind == "weights":
+            for u, v, w in op["edges"]:
+                G[u][v]["w"] = w
+
+    def _seek(self, k: int) -> dict:
+        # Apply the operations up to the k-th step and return its marker
+        end = self.trace.steps[k]
+        if end < self.position:
+            self.graphs = {}
+            self.position = 0
+        ops = self.trace.ops
+        for i in range(self.position, end):
+            self._apply(ops[i])
+        self.position = end
+        return ops[end]
+
+    def _view(self, step: dict) -> nx.DiGraph:
+        G = self.graphs.get(step["g"], nx.DiGraph())
+        if step["view"] == "condensation":
+            return nx.condensation(G)
+        return G
+
+    def graph_at(self, k: int):
+        """
+        Rebuild step k.
+
+        Parameters:
+            - k: Step index, from 0 to len(trace.steps) - 1
+
+        Returns:
+            - step: The step marker (id, title, description)
+            - G: A copy of the graph shown at that step (networkx.DiGraph)
+        """
+        step = self._seek(k)
+        return step, self._view(step).copy()
+
+    def __iter__(self):
+        """
+        Iterate over (step, graph) in order. The graph is the replayer's live
+        graph, valid until the iteration moves on.
+        """
+        for k in range(len(self.trace.steps)):
+            step = self._seek(k)
+            yield step, self._view(step)
+
+
+def replay_steps(trace: StepTrace, draw_step):
+    """
+    Draw every step of a trace with draw_step(G, id=..., title=..., description=...).
+    """
+    for step, G in StepReplayer(trace):
+        draw_step(
+            G, id=step["id"], title=step["title"], description=step["description"]
+        )
+
+
+def run_traced(solver, *args, **kwargs):
+    """
+    Run solver(*args, trace=StepTrace(), **kwargs) and then draw its steps with
+    kwargs["draw_step"], so the solver's running time does not include rendering.
+
+    Returns:
+        - Whatever the solver returns
+    """
+    trace = StepTrace()
+    result = solver(*args, trace=trace, **kwargs)
+    replay_steps(trace, kwargs["draw_step"])
+    return result
@@ -0,0 +1,452 @@
+NIL = -1
+
+class UnionFind:
+    """
+    Disjoint-set forest with path compression over integer elements.
+    New elements can be created with `make_set`, which is how the
+    super-vertices produced by contractions get their own identifiers.
+
+    Parameters:
+        - n: Number of initial singleton sets (elements 0..n-1)
+    """
+
+    def __init__(self, n: int = 0):
+        self.parent = list(range(n))
+
+    def make_set(self) -> int:
+        """
+        Create a new singleton set and return its element.
+        """
+        x = len(self.parent)
+        self.parent.append(x)
+        return x
+
+    def find(self, x: int) -> int:
+        """
+        Return the representative of the set containing x.
+        """
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        # Path compression
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def link(self, child: int, root: int):
+        """
+        Attach the representative `child` below the representative `root`.
+        """
+        self.parent[child] = root
+
+class SkewHeap:
+    """
+    Pool of skew heaps (self-adjusting meldable min-heaps) with lazy additive
+    offsets. A heap is identified by the index of its root node and NIL is
+    the empty heap. Each node stores a key and an integer item; ties on the
+    key are broken by the smaller item.
+    """
+
+    def __init__(self):
+        self.key = []
+        self.item = []
+        self.left = []
+        self.right = []
+        self.lazy = []
+
+    def node(self, key, item: int) -> int:
+        """
+        Create a single-node heap and return its root.
+        """
+        x = len(self.key)
+        self.key.append(key)
+        self.item.append(item)
+        self.left.append(NIL)
+        self.right.append(NIL)
+        self.lazy.append(0)
+        return x
+
+    def chain(self, keys: list, items: list) -> int:
+        """
+        Build a heap from items already sorted by key, as a left-leaning path.
+        Returns the root (NIL if `items` is empty).
+        """
+        h = NIL
+        for i in range(len(items) - 1, -1, -1):
+            x = self.node(keys[i], items[i])
+            self.left[x] = h
+            h = x
+        return h
+
+    def _push(self, x: int):
+        # Propagate the pending offset of x to its key and children
+        d = self.lazy[x]
+        if d:
+            self.key[x] += d
+            if self.left[x] != NIL:
+                self.lazy[self.left[x]] += d
+            if self.right[x] != NIL:
+                self.lazy[self.right[x]] += d
+            self.lazy[x] = 0
+
+    def top(self, h: int) -> tuple:
+        """
+        Return (key, item) of the minimum of heap h (h must not be NIL).
+        """
+        self._push(h)
+        return self.key[h], self.item[h]
+
+    def add(self, h: int, delta):
+        """
+        Add `delta` to every key in heap h.
+        """
+        if h != NIL:
+            self.lazy[h] += delta
+
+    def meld(self, a: int, b: int) -> int:
+        """
+        Meld heaps a and b and return the root of the result.
+        """
+        key, item, left, right = self.key, self.item, self.left, self.right
+        path = []
+        while a != NIL and b != NIL:
+            self._push(a)
+            self._push(b)
+            if key[b] < key[a] or (key[b] == key[a] and item[b] < item[a]):
+                a, b = b, a
+            path.append(a)
+            a = right[a]
+        rest = a if a != NIL else b
+        # Walk back up the merge path swapping children
+        for x in reversed(path):
+            right[x] = left[x]
+            left[x] = rest
+            rest = x
+        return rest
+
+    def pop(self, h: int) -> int:
+        """
+        Remove the minimum of heap h and return the root of the remaining heap.
+        """
+        self._push(h)
+        return self.meld(self.left[h], self.right[h])
+
+class ZeroArcComponents:
+    """
+    Strongly connected components of a digraph that only grows by arcs whose
+    head lies in a source component (one no arc enters), as D_zero does in
+    phase 1 of András Frank's algorithm. Under that rule the condensation is a
+    branching: every component is entered by at most one arc. An arc (u, v)
+    then either hangs the tree of v's component below u's, or, when both lie
+    in the same tree, closes a cycle through the tree path from v's component
+    down to u's, and the components on that path merge into a new source.
+    Each arc costs near-constant amortized time: the tree test is a
+    union-find lookup and every step of a path walk is paid by a merge.
+
+    Given the heads of the arcs of the whole graph, the structure also indexes
+    the arcs entering each component: every vertex keeps the ids of its
+    in-arcs, a merge only chains the lists of the merged components, and the
+    arcs that became internal are dropped the next time the component is asked
+    for its entering arcs.
+
+    Parameters:
+        - n: Number of vertices (0..n-1), each starting as its own source component
+        - dst: Optional head of every arc of the graph, by arc id
+
+    Attributes:
+        - members: list of the vertices of each component, indexed by its representative
+        - sources: representatives of the source components, in insertion order
+        - least: smallest vertex of each component, indexed by its representative
+        - arcs: number of arcs added
+    """
+
+    def __init__(self, n: int, dst: list[int] | None = None):
+        self.scc = UnionFind(n)
+        self.tree = UnionFind(n)
+        self.entering = [NIL] * n
+        self.members = [[v] for v in range(n)]
+        self.sources = dict.fromkeys(range(n))
+        self.least = list(range(n))
+        self.arcs = 0
+        self.in_arcs = None
+        if dst is not None:
+            in_arcs = [[] for _ in range(n)]
+            for e, v in enumerate(dst):
+                in_arcs[v].append(e)
+            # Each component holds a list of chunks of arc ids
+            self.in_arcs = [[ids] for ids in in_arcs]
+
+    def find(self, v: int) -> int:
+        """
+        Return the representative of the component containing v.
+        """
+        return self.scc.find(v)
+
+    def entering_arcs(self, c: int, src: list[int]) -> list[int]:
+        """
+        Return the ids of the arcs entering component c, in increasing order.
+        Requires the structure to be built with dst.
+
+        Parameters:
+            - c: Representative of the component
+            - src: Tail of every arc of the graph, by arc id
+
+        Returns:
+            - The ids of the arcs (u, v) with v in c and u outside c
+        """
+        find = self.scc.find
+        chunks = self.in_arcs[c]
+        ids = [e for chunk in chunks for e in chunk if find(src[e]) != c]
+        if len(chunks) > 1:
+            ids.sort()
+        self.in_arcs[c] = [ids]
+        return ids
+
+    def add_arc(self, u: int, v: int) -> list[int]:
+        """
+        Add the arc (u, v); the component of v must be a source.
+
+        Returns:
+            - The representatives of the components merged into the component
+              of v by the arc, or an empty list if the arc closes no cycle
+        """
+        find = self.scc.find
+        a, b = find(u), find(v)
+        self.arcs += 1
+        if a == b:
+            return []
+
+        tree = self.tree
+        ta, tb = tree.find(u), tree.find(v)
+        if ta != tb:
+            # b stops being a source and its tree hangs below a
+            self.entering[b] = u
+            del self.sources[b]
+            tree.link(tb, ta)
+            return []
+
+        # b is the root of the tree containing a: merge the path from a up to b
+        path = [a]
+        c = a
+        while c != b:
+            c = find(self.entering[c])
+            path.append(c)
+
+        members = self.members
+        rep = max(path, key=lambda c: len(members[c]))
+        self.least[rep] = min(self.least[c] for c in path)
+        for c in path:
+            if c != rep:
+                members[rep].extend(members[c])
+                members[c] = None
+                if self.in_arcs is not None:
+                    self.in_arcs[rep].extend(self.in_arcs[c])
+                    self.in_arcs[c] = None
+                self.scc.link(c, rep)
+        self.entering[rep] = NIL
+        del self.sources[b]
+        self.sources[rep] = None
+        return path
+
+class LaminarForest:
+    """
+    Laminar family of vertex sets (any two are disjoint or nested), stored as
+    a forest: the parent of a set is the smallest set of the family that
+    contains it, and equal sets are chained. The sets X of sigma in phase 1 of
+    András Frank's algorithm form such a family, because D_zero's components
+    only merge. Building the forest visits each set once, from the smallest.
+
+    Parameters:
+        - sets: iterable of sets of vertices forming a laminar family
+
+    Attributes:
+        - parent: parent[k] is the set right above set k (NIL for a root)
+        - leaf: smallest set containing each vertex, for the vertices in some set
+        - order: the sets from the smallest up, so children come before parents
+    """
+
+    def __init__(self, sets):
+        sets = list(sets)
+        self.parent = [NIL] * len(sets)
+        self.leaf = {}
+        self.order = sorted(range(len(sets)), key=lambda k: len(sets[k]))
+        top = {}  # largest set seen so far containing each vertex
+        for k in self.order:
+            for v in sets[k]:
+                t = top.get(v)
+                if t is None:
+                    self.leaf[v] = k
+                elif t != k:
+                    self.parent[t] = k
+                top[v] = k
+
+    def __len__(self):
+        return len(self.parent)
+
+    def lca(self, pairs: list[tuple[int, int]]) -> list[int]:
+        """
+        Lowest common ancestor of each pair of sets (NIL when the two lie in
+        different trees), computed offline with Tarjan's union-find traversal.
+        """
+        k = len(self.parent)
+        children = [[] for _ in range(k)]
+        roots = []
+        for c, p in enumerate(self.parent):
+            if p == NIL:
+                roots.append(c)
+            else:
+                children[p].append(c)
+
+        queries = [[] for _ in range(k)]
+        for j, (a, b) in enumerate(pairs):
+            queries[a].append((b, j))
+            queries[b].append((a, j))
+
+        answer = [NIL] * len(pairs)
+        uf = UnionFind(k)
+        done = bytearray(k)
+        tree = [NIL] * k
+        nxt = [0] * k
+        for root in roots:
+            tree[root] = root
+            stack = [root]
+            while stack:
+                x = stack[-1]
+                if nxt[x] < len(children[x]):
+                    c = children[x][nxt[x]]
+                    nxt[x] += 1
+                    tree[c] = root
+                    stack.append(c)
+                    continue
+                stack.pop()
+                done[x] = 1
+                # The representative of a finished set is its lowest ancestor on the stack
+                for y, j in queries[x]:
+                    if done[y] and tree[y] == root:
+                        answer[j] = uf.find(y)
+                if stack:
+                    uf.link(x, stack[-1])
+        return answer
+
+    def entering_counts(self, arcs) -> list[int]:
+        """
+        Count, for every set, the arcs (u, v) with v inside and u outside.
+        Such an arc enters the sets from leaf[v] up to, but excluding, the
+        lowest set that also holds u. So each arc adds 1 at leaf[v] and
+        subtracts 1 at that common ancestor, and one pass from the leaves up
+        sums the subtrees.
+
+        Parameters:
+            - arcs: iterable of arcs (u, v)
+
+        Returns:
+            - count: count[k] is the number of arcs entering set k
+        """
+        leaf = self.leaf
+        count = [0] * len(self.parent)
+        pairs = []
+        for u, v in arcs:
+            b = leaf.get(v)
+            if b is None:
+                continue
+            count[b] += 1
+            a = leaf.get(u)
+            if a is not None:
+                pairs.append((a, b))
+
+        for c in self.lca(pairs):
+            if c != NIL:
+                count[c] -= 1
+
+        parent = self.parent
+        for k in self.order:
+            if parent[k] != NIL:
+                count[parent[k]] += count[k]
+        return count
+
+class LaminarSigma(LaminarForest):
+    """
+    The dual solution sigma of phase 1 of András Frank's algorithm, stored as
+    the laminar forest of its sets instead of one set of vertices per entry.
+    A set is either a single vertex (a leaf) or the union of the sets it was
+    merged from (its children), so sigma takes O(n + |sigma|) memory and the
+    vertices of a set are only listed when asked for.
+
+    Iterating (or indexing) gives the (a, X, z(X)) tuples of the list form,
+    building each X on the way; F is simply the `arc` list.
+
+    Attributes:
+        - parent: parent[k] is the set right above set k (NIL for a root)
+        - arc: arc[k] is the arc of F chosen to enter set k
+        - z: z[k] is z(X) for set k
+        - size: size[k] is the number of vertices of set k
+        - vertex: vertex[k] is the vertex of a leaf set, None otherwise
+        - children: children[k] lists the sets merged into set k, in merge order
+        - leaf: smallest set containing each vertex, for the vertices in some set
+    """
+
+    def __init__(self):
+        self.parent = []
+        self.arc = []
+        self.z = []
+        self.size = []
+        self.vertex = []
+        self.children = []
+        self.leaf = {}
+
+    @property
+    def order(self):
+        # A set is added after the sets it was merged from
+        return range(len(self.parent))
+
+    def append(self, arc, z, size: int, children: list[int] = (), vertex=None) -> int:
+        """
+        Add a set: either the single vertex `vertex` or the union of the
+        `children` sets, which get the new set as parent.
+
+        Returns:
+            - k: index of the new set
+        """
+        k = len(self.parent)
+        self.parent.append(NIL)
+        self.arc.append(arc)
+        self.z.append(z)
+        self.size.append(size)
+        self.vertex.append(vertex)
+        self.children.append(list(children))
+        if vertex is not None:
+            self.leaf[vertex] = k
+        for c in children:
+            self.parent[c] = k
+        return k
+
+    def members(self, k: int) -> set:
+        """
+        Return the vertices of set k, in O(size[k]). They are visited in merge
+        order, the order in which ZeroArcComponents lists the members.
+        """
+        X = set()
+        stack = [k]
+        while stack:
+            x = stack.pop()
+            if self.vertex[x] is not None:
+                X.add(self.vertex[x])
+            stack.extend(reversed(self.children[x]))
+        return X
+
+    def __getitem__(self, k: int) -> tuple:
+        return self.arc[k], self.members(k), self.z[k]
+
+    def __iter__(self):
+        for k in range(len(self.parent)):
+            yield self[k]
+
+    def tuples(self) -> list[tuple]:
+        """
+        Return sigma in list form, [(a, X, z(X)), ...].
+        """
+        return list(self)
+
+    def __repr__(self):
+        return repr(self.tuples())
@@ -0,0 +1,73 @@
+"""Unit tests for András Frank's algorithm (andrasfrank.py) on seeded graphs."""
+
+import pytest
+
+from andrasfrank import phase1, phase2, phase2_order, phase2_v2
+from chuliu import chuliu_edmonds
+from conftest import SEEDS, cost, instance
+from tests import ADVERSARIAL_FAMILIES, FAMILIES
+
+PHASE1_ENGINES = ("heap", "batch")
+
+
+def rescan_order(F: list, r) -> list:
+    # The arcs phase2 picks by rescanning F from the start every time
+    reached = {r}
+    order = []
+    while True:
+        arc = next(((u, v) for u, v in F if u in reached and v not in reached), None)
+        if arc is None:
+            return order
+        reached.add(arc[1])
+        order.append(arc)
+
+
+@pytest.mark.parametrize("family", FAMILIES + ADVERSARIAL_FAMILIES)
+def test_phase2_order_matches_rescan(family):
+    for seed in SEEDS:
+        D = instance(family, seed)
+        F = list(phase1(D, 0, boilerplate=False).arc)
+        assert list(phase2_order(F, 0)) == rescan_order(F, 0)
+        linear = phase2(D, 0, F, boilerplate=False, linear=True)
+        assert list(linear.edges(data="w")) == list(
+            phase2(D, 0, F, boilerplate=False).edges(data="w")
+        )
+
+
+def test_phase2_order_serves_passed_arcs_first():
+    # (2, 3) is passed while 2 is unreached and must come right after (1, 2)
+    F = [(2, 3), (0, 1), (1, 2), (0, 4), (3, 5)]
+    assert list(phase2_order(F, 0)) == rescan_order(F, 0)
+    assert list(phase2_order(F, 0)) == [(0, 1), (1, 2), (2, 3), (0, 4), (3, 5)]
+
+
+@pytest.mark.parametrize("family", FAMILIES + ADVERSARIAL_FAMILIES)
+@pytest.mark.parametrize("engine", PHASE1_ENGINES)
+def test_phase1_engines_match_index(engine, family):
+    for seed in SEEDS:
+        for csr in (False, True):
+            D = instance(family, seed, csr)
+            expected = phase1(D, 0, boilerplate=False)
+            sigma = phase1(D, 0, boilerplate=False, engine=engine)
+            assert sigma.tuples() == expected.tuples()
+
+
+@pytest.mark.parametrize("family", FAMILIES + ADVERSARIAL_FAMILIES)
+def test_arborescence_cost_matches_cle(family):
+    for seed in SEEDS:
+        D = instance(family, seed)
+        F = list(phase1(D, 0, boilerplate=False).arc)
+        A = phase2(D, 0, F, boilerplate=False, linear=True)
+        assert A.number_of_edges() == len(D) - 1
+        assert cost(A) == cost(chuliu_edmonds(D, 0, boilerplate=False))
+
+
+@pytest.mark.parametrize("family", FAMILIES + ADVERSARIAL_FAMILIES)
+def test_phase2_v2_bucket_matches_heap(family):
+    for seed in SEEDS:
+        for csr in (False, True):
+            D = instance(family, seed, csr)
+            F = list(phase1(D, 0, boilerplate=False).arc)
+            heap = phase2_v2(D, 0, F, boilerplate=False)
+            bucket = phase2_v2(D, 0, F, boilerplate=False, queue="bucket")
+            assert list(bucket.edges(data="w")) == list(heap.edges(data="w"))
@@ -0,0 +1,55 @@
+"""Unit tests for the scaling benchmark (benchmark.py)."""
+
+import pytest
+
+from benchmark import SOLVERS, compare_to_baseline, predict, run_benchmark, summarize
+
+
+def entry(solver, n, median, iqr=0.0):
+    return {"solver": solver, "family": "random", "n": n, "median_s": median, "iqr_s": iqr}
+
+
+def test_predict():
+    assert predict([], 100) is None
+    # One point: linear growth
+    assert predict([(100, 1.0)], 1000) == pytest.approx(10.0)
+    # Quadratic growth between the last two points
+    assert predict([(10, 0.5), (100, 1.0), (1000, 100.0)], 10000) == pytest.approx(10000.0)
+    # Never extrapolate below linear
+    assert predict([(100, 1.0), (1000, 1.0)], 10000) == pytest.approx(10.0)
+
+
+def test_summarize():
+    assert summarize([2.0]) == (2.0, 0.0)
+    assert summarize([1.0, 2.0, 3.0, 4.0, 5.0]) == (3.0, 2.0)
+
+
+def test_compare_to_baseline():
+    baseline = {"results": [entry("cle", 100, 1.0, 0.01), entry("tarjan", 100, 1.0, 0.5)]}
+    current = {
+        "results": [
+            entry("cle", 100, 1.5, 0.01),
+            # Slower, but within the spread of the two runs
+            entry("tarjan", 100, 1.5, 0.5),
+            # Not in the baseline
+            entry("iterative", 100, 9.0),
+        ]
+    }
+    assert compare_to_baseline(current, baseline, 0.10) == [("cle", "random", 100, 1.0, 1.5)]
+
+
+def test_run_benchmark_skips_before_running():
+    lines = []
+    result = run_benchmark(
+        sizes=(20, 40, 10**7),
+        families=("random",),
+        solvers=SOLVERS,
+        warmup=0,
+        repeats=1,
+        time_limit=1.0,
+        log=lines.append,
+    )
+    measured = {(e["solver"], e["n"]) for e in result["results"]}
+    assert measured == {(s, n) for s in SOLVERS for n in (20, 40)}
+    assert all("skipped" in line for line in lines if "n=10000000" in line)
+    assert len([line for line in lines if "skipped" in line]) == len(SOLVERS)
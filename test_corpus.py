@@ -0,0 +1,74 @@
+"""Unit tests for the on-disk instance corpus (corpus.py)."""
+
+import numpy as np
+import pytest
+
+from corpus import build_corpus, instance_path, list_instances, load_instance, save_instance
+from tests import build_rooted_arcs
+
+
+def arcs(seed: int = 0):
+    return build_rooted_arcs(50, 200, 1, 10, "random", seed=seed)
+
+
+@pytest.mark.parametrize("mmap_mode", ("r", None))
+def test_round_trip_arrays(tmp_path, mmap_mode):
+    src, dst, weight = arcs()
+    path = str(tmp_path / "instance.npz")
+    save_instance(path, src, dst, weight, "random", 50, 123)
+    instance = load_instance(path, mmap_mode=mmap_mode)
+    keep = np.asarray(dst) != 0
+    for key, expected in zip(("src", "dst", "weight"), (src, dst, weight)):
+        np.testing.assert_array_equal(instance[key], np.asarray(expected)[keep])
+        assert instance[key].dtype == np.load(path)[key].dtype
+    assert isinstance(instance["src"], np.memmap) == (mmap_mode == "r")
+    assert (instance["family"], instance["n"], instance["m"], instance["seed"]) == (
+        "random",
+        50,
+        int(keep.sum()),
+        123,
+    )
+
+
+def test_unknown_seed_and_empty_instance(tmp_path):
+    path = str(tmp_path / "empty.npz")
+    save_instance(path, [], [], [], "sparse", 1, None)
+    instance = load_instance(path)
+    assert instance["seed"] is None
+    assert instance["m"] == 0
+    assert len(instance["src"]) == len(instance["dst"]) == len(instance["weight"]) == 0
+
+
+def test_compressed_members_are_read(tmp_path):
+    src, dst, weight = (np.asarray(a) for a in arcs(1))
+    path = str(tmp_path / "compressed.npz")
+    np.savez_compressed(
+        path,
+        src=src,
+        dst=dst,
+        weight=weight,
+        family=np.array("random"),
+        n=np.array(50),
+        m=np.array(len(src)),
+        seed=np.array(-1),
+    )
+    instance = load_instance(path)
+    np.testing.assert_array_equal(instance["src"], src)
+    np.testing.assert_array_equal(instance["weight"], weight)
+
+
+def test_build_corpus_is_deterministic_and_extensible(tmp_path):
+    first = str(tmp_path / "first")
+    second = str(tmp_path / "second")
+    paths = build_corpus(first, num_instances=3, min_vertices=20, max_vertices=40, seed=5)
+    assert paths == list_instances(first)
+    assert paths == [instance_path(first, "random", i) for i in (1, 2, 3)]
+    # Extending keeps the existing files and matches a corpus built at once
+    build_corpus(second, num_instances=2, min_vertices=20, max_vertices=40, seed=5)
+    build_corpus(second, num_instances=3, min_vertices=20, max_vertices=40, seed=5)
+    for a, b in zip(paths, list_instances(second)):
+        x, y = load_instance(a, mmap_mode=None), load_instance(b, mmap_mode=None)
+        assert x.keys() == y.keys()
+        for key in x:
+            np.testing.assert_array_equal(x[key], y[key])
+        assert 20 <= x["n"] <= 40
@@ -0,0 +1,54 @@
+"""Unit tests for CSRDigraph, against the networkx graph it was built from."""
+
+import networkx as nx
+import pytest
+
+from csr import CSRDigraph
+from tests import FAMILIES, PESO_MAX, PESO_MIN, build_rooted_digraph_np
+
+
+def labelled_instance(seed: int) -> nx.DiGraph:
+    # Non-integer labels, so ids and original vertices cannot be mixed up
+    D = build_rooted_digraph_np(30, 80, 0, PESO_MIN, PESO_MAX, "random", seed=seed)
+    return nx.relabel_nodes(D, {v: f"v{v}" for v in D.nodes})
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_networkx_round_trip(seed):
+    D = labelled_instance(seed)
+    C = CSRDigraph.from_networkx(D)
+    back = C.to_networkx()
+    assert list(back.nodes) == list(D.nodes)
+    assert list(back.edges(data="w")) == list(D.edges(data="w"))
+    assert list(C.edges()) == list(D.edges())
+    assert (C.number_of_nodes(), C.number_of_edges()) == (len(D), D.number_of_edges())
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_in_and_out_groups(seed):
+    D = labelled_instance(seed)
+    C = CSRDigraph.from_networkx(D)
+    for i, v in enumerate(C.nodes):
+        lo, hi = C.in_indptr[i], C.in_indptr[i + 1]
+        eids = C.in_eid[lo:hi].tolist()
+        # The arcs entering v, in arc order
+        assert eids == sorted(eids)
+        assert [C.nodes[u] for u in C.in_src[lo:hi].tolist()] == list(D.predecessors(v))
+        assert C.in_weight[lo:hi].tolist() == [D[u][v]["w"] for u in D.predecessors(v)]
+        lo, hi = C.out_indptr[i], C.out_indptr[i + 1]
+        assert sorted(C.nodes[u] for u in C.out_dst[lo:hi].tolist()) == sorted(
+            D.successors(v)
+        )
+        assert (C.src[C.out_eid[lo:hi]] == i).all()
+        assert (C.dst[C.out_eid[lo:hi]] == C.out_dst[lo:hi]).all()
+
+
+@pytest.mark.parametrize("family", FAMILIES)
+def test_weight_of_and_reachability(family):
+    D = build_rooted_digraph_np(40, 120, 0, PESO_MIN, PESO_MAX, family, seed=7)
+    D.remove_edges_from(list(D.in_edges(5)))
+    C = CSRDigraph.from_networkx(D)
+    for u, v, w in D.edges(data="w"):
+        assert C.weight_of(u, v) == w
+    reached = {C.nodes[i] for i in C.reachable_from(0).nonzero()[0].tolist()}
+    assert reached == nx.descendants(D, 0) | {0}
@@ -0,0 +1,47 @@
+"""Unit tests: every Chu-Liu/Edmonds engine against "cle" on seeded graphs."""
+
+import pytest
+
+from chuliu import ENGINES, chuliu_edmonds
+from conftest import SEEDS, cost, instance
+from csr import CSRDigraph
+from tests import ADVERSARIAL_FAMILIES, FAMILIES
+
+
+def is_arborescence(A, D, r) -> bool:
+    return (
+        set(A.nodes) == set(D.nodes)
+        and all(d == (0 if v == r else 1) for v, d in A.in_degree())
+        and all(D.has_edge(u, v) for u, v in A.edges)
+    )
+
+
+@pytest.mark.parametrize("family", FAMILIES + ADVERSARIAL_FAMILIES)
+@pytest.mark.parametrize("engine", tuple(ENGINES))
+def test_engine_cost_matches_cle(engine, family):
+    for seed in SEEDS:
+        D = instance(family, seed)
+        expected = cost(chuliu_edmonds(D, 0, boilerplate=False))
+        A = chuliu_edmonds(D, 0, engine=engine, boilerplate=False)
+        assert is_arborescence(A, D, 0)
+        assert cost(A) == expected
+
+
+@pytest.mark.parametrize("engine", ("cle", "iterative"))
+def test_batch_cost_matches_cle(engine):
+    for seed in SEEDS:
+        D = instance("cycles", seed)
+        expected = cost(chuliu_edmonds(D, 0, boilerplate=False))
+        A = chuliu_edmonds(D, 0, engine=engine, batch=True, boilerplate=False)
+        assert is_arborescence(A, D, 0)
+        assert cost(A) == expected
+
+
+@pytest.mark.parametrize("engine", ("cle",) + tuple(ENGINES))
+def test_csr_input_matches_networkx(engine):
+    for seed in SEEDS:
+        D = instance("random", seed)
+        expected = cost(chuliu_edmonds(D, 0, boilerplate=False))
+        A = chuliu_edmonds(CSRDigraph.from_networkx(D), 0, engine=engine, boilerplate=False)
+        assert is_arborescence(A, D, 0)
+        assert cost(A) == expected
@@ -0,0 +1,57 @@
+"""Unit tests for the vectorized instance generator of tests.py."""
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from tests import (
+    ADVERSARIAL_FAMILIES,
+    FAMILIES,
+    build_rooted_arcs,
+    build_rooted_digraph_np,
+    derive_test_seed,
+    get_edge_count_range,
+)
+
+
+@pytest.mark.parametrize("family", FAMILIES + ADVERSARIAL_FAMILIES)
+@pytest.mark.parametrize("n", (2, 10, 200))
+def test_rooted_arcs(family, n):
+    m = sum(get_edge_count_range(n, family)) // 2
+    src, dst, w = build_rooted_arcs(n, m, 1, 10, family, seed=7)
+    keys = src * n + dst
+    assert len(np.unique(keys)) == len(keys)
+    assert not (src == dst).any()
+    assert ((0 <= src) & (src < n) & (0 <= dst) & (dst < n)).all()
+    if family in FAMILIES:
+        # The structured families grow their weights by level on purpose
+        assert ((1 <= w) & (w <= 10)).all()
+    D = build_rooted_digraph_np(n, m, 0, 1, 10, family, seed=7)
+    assert nx.descendants(D, 0) | {0} == set(range(n))
+    # The same seed gives the same arcs
+    for a, b in zip((src, dst, w), build_rooted_arcs(n, m, 1, 10, family, seed=7)):
+        np.testing.assert_array_equal(a, b)
+
+
+@pytest.mark.parametrize("family", FAMILIES)
+def test_edge_count(family):
+    n = 100
+    low, high = get_edge_count_range(n, family)
+    for m in (low, high):
+        src, _, _ = build_rooted_arcs(n, m, 1, 10, family, seed=1)
+        assert len(src) == m
+
+
+def test_csr_instance_drops_root_arcs():
+    D = build_rooted_digraph_np(50, 150, 0, 1, 10, "dense", seed=2)
+    C = build_rooted_digraph_np(50, 150, 0, 1, 10, "dense", seed=2, csr=True)
+    expected = sorted((u, v, w) for u, v, w in D.edges(data="w") if v != 0)
+    arcs = [(u, v, w) for (u, v), w in zip(C.edges(), C.weight.tolist())]
+    assert sorted(arcs) == expected
+
+
+def test_derive_test_seed():
+    seeds = [derive_test_seed(0, i) for i in range(1, 100)]
+    assert seeds == [derive_test_seed(0, i) for i in range(1, 100)]
+    assert len(set(seeds)) == len(seeds)
+    assert derive_test_seed(1, 1) != derive_test_seed(0, 1)
@@ -0,0 +1,128 @@
+"""Unit tests for the browser step trace (scripts/util/step_trace.py)."""
+
+import json
+import os
+import sys
+
+import networkx as nx
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "scripts"))
+
+from solver.andrasfrank import (  # noqa: E402
+    find_minimum_arborescence_v1,
+    find_minimum_arborescence_v2,
+)
+from solver.chuliu import find_optimum_arborescence_chuliu  # noqa: E402
+from tests import PESO_MAX, PESO_MIN, build_rooted_digraph_np  # noqa: E402
+from util.step_trace import StepReplayer, StepTrace, run_traced  # noqa: E402
+
+# Frames (id, title, description, nodes, weighted edges) that the browser
+# solvers drew with synchronous draw_step calls before the step trace, keyed by
+# "solver/family/seed/lang"
+with open(os.path.join(HERE, "test_step_trace_frames.json"), encoding="utf-8") as f:
+    FRAMES = json.load(f)
+PAGE_SOLVERS = {
+    "chuliu": find_optimum_arborescence_chuliu,
+    "andrasfrank_v1": find_minimum_arborescence_v1,
+    "andrasfrank_v2": find_minimum_arborescence_v2,
+}
+
+
+def snapshot(G: nx.DiGraph):
+    return sorted(map(repr, G.nodes)), sorted(map(repr, G.edges(data="w")))
+
+
+def page_graph(n: int, m: int, family: str, seed: int) -> nx.DiGraph:
+    # The browser solvers name the root "r0"
+    D = build_rooted_digraph_np(n, m, 0, PESO_MIN, PESO_MAX, family, seed=seed)
+    return nx.relabel_nodes(D, {v: "r0" if v == 0 else f"v{v}" for v in D.nodes})
+
+
+def solver_trace(seed: int) -> StepTrace:
+    D = page_graph(12, 40, "cycles", seed)
+    trace = StepTrace()
+    find_optimum_arborescence_chuliu(D, "r0", trace=trace, log=lambda *args: None)
+    return trace
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_jsonl_round_trip(seed):
+    trace = solver_trace(seed)
+    assert trace.steps
+    loaded = StepTrace.from_jsonl(trace.to_jsonl())
+    assert loaded.ops == trace.ops
+    assert loaded.steps == trace.steps
+    assert loaded.to_jsonl() == trace.to_jsonl()
+    for (step, G), (step2, G2) in zip(StepReplayer(trace), StepReplayer(loaded)):
+        assert step == step2
+        assert snapshot(G) == snapshot(G2)
+
+
+def test_graph_at_matches_iteration():
+    trace = solver_trace(0)
+    forward = [(step, snapshot(G)) for step, G in StepReplayer(trace)]
+    replayer = StepReplayer(trace)
+    # Seeking backwards replays the trace from its start
+    for k in reversed(range(len(forward))):
+        step, G = replayer.graph_at(k)
+        assert (step, snapshot(G)) == forward[k]
+
+
+def test_replay_applies_deltas():
+    G = nx.DiGraph()
+    G.add_weighted_edges_from([(0, 1, 5), (2, 1, 3), (1, 2, 4)], weight="w")
+    trace = StepTrace()
+    trace.init("D", G)
+    trace.normalize("D", 1, 3)
+    trace.step("D", "normalized")
+    trace.contract("D", "C", [1, 2], {0: ((0, 1), 2)}, {})
+    trace.step("D", "contracted")
+    trace.expand("D", "C", [(0, 1), (1, 2)])
+    trace.weights("D", [(0, 1, 5), (1, 2, 4)])
+    trace.step("D", "expanded")
+    graphs = [sorted(G.edges(data="w")) for _, G in StepReplayer(trace)]
+    assert graphs == [
+        [(0, 1, 2), (1, 2, 4), (2, 1, 0)],
+        [(0, "C", 2)],
+        [(0, 1, 5), (1, 2, 4)],
+    ]
+
+
+def test_run_traced_draws_every_step():
+    drawn = []
+    trace = StepTrace()
+    trace.init("D", nx.DiGraph([(0, 1)]))
+    trace.step("D", "first")
+    trace.add_edge("D", 1, 2, 7)
+    trace.step("D", "second", id=9)
+
+    def solver(*args, **kwargs):
+        kwargs["trace"].ops[:] = trace.ops
+        kwargs["trace"].steps[:] = trace.steps
+        return "done"
+
+    def draw_step(G, id, title, description):
+        drawn.append((id, title, sorted(G.edges)))
+
+    assert run_traced(solver, draw_step=draw_step) == "done"
+    assert drawn == [(1, "first", [(0, 1)]), (9, "second", [(0, 1), (1, 2)])]
+
+
+@pytest.mark.parametrize("case", sorted(FRAMES))
+def test_replay_matches_pre_trace_frames(case):
+    name, family, seed, lang = case.split("/")
+    D = page_graph(7, 16, family, int(seed))
+    frames = []
+
+    def draw_step(G, id=None, title="", description=""):
+        nodes = sorted(map(str, G.nodes))
+        edges = sorted([str(u), str(v), w] for u, v, w in G.edges(data="w"))
+        frames.append([id, title, description, nodes, edges])
+
+    # Without a trace the solvers record the steps and draw them with run_traced
+    PAGE_SOLVERS[name](
+        D, "r0", draw_fn=None, draw_step=draw_step, log=lambda msg: None, lang=lang
+    )
+    assert frames == FRAMES[case]
@@ -0,0 +1,166 @@
+"""Unit tests for the data structures of structures.py, against brute force."""
+
+import random
+
+import networkx as nx
+
+from andrasfrank import check_dual_optimality_condition, phase1, phase2
+from structures import (
+    NIL,
+    LaminarForest,
+    LaminarSigma,
+    SkewHeap,
+    UnionFind,
+    ZeroArcComponents,
+)
+from tests import PESO_MAX, PESO_MIN, build_rooted_digraph_np
+
+
+def test_union_find_matches_labels():
+    rng = random.Random(0)
+    uf = UnionFind(50)
+    label = list(range(50))
+    for _ in range(40):
+        a, b = uf.find(rng.randrange(50)), uf.find(rng.randrange(50))
+        if a != b:
+            uf.link(a, b)
+            label = [b if l == a else l for l in label]
+        x = uf.make_set()
+        label.append(x)
+    for x in range(len(label)):
+        assert uf.find(x) == label[x]
+
+
+def test_skew_heap_pops_in_key_order():
+    rng = random.Random(2)
+    heap = SkewHeap()
+    roots = []
+    reference = []
+    for i in range(20):
+        keys = sorted(rng.randint(0, 50) for _ in range(10))
+        items = list(range(10 * i, 10 * i + 10))
+        roots.append(heap.chain(keys, items))
+        reference.append(list(zip(keys, items)))
+    for i in range(20):
+        delta = rng.randint(-20, 20)
+        heap.add(roots[i], delta)
+        reference[i] = [(k + delta, x) for k, x in reference[i]]
+    h = NIL
+    for root in roots:
+        h = heap.meld(h, root)
+    expected = sorted(e for part in reference for e in part)
+    popped = []
+    while h != NIL:
+        popped.append(heap.top(h))
+        h = heap.pop(h)
+    assert popped == expected
+
+
+def test_zero_arc_components_match_condensation():
+    rng = random.Random(4)
+    n = 40
+    src = [rng.randrange(n) for _ in range(300)]
+    dst = [rng.randrange(n) for _ in range(300)]
+    components = ZeroArcComponents(n, dst)
+    G = nx.DiGraph()
+    G.add_nodes_from(range(n))
+    for _ in range(150):
+        # Only arcs entering a source component may be added
+        e = rng.randrange(len(src))
+        u, v = src[e], dst[e]
+        if components.find(v) not in components.sources:
+            continue
+        components.add_arc(u, v)
+        G.add_edge(u, v)
+
+        C = nx.condensation(G)
+        mapping = C.graph["mapping"]
+        for c in C.nodes:
+            members = C.nodes[c]["members"]
+            rep = components.find(next(iter(members)))
+            assert set(components.members[rep]) == members
+            assert components.least[rep] == min(members)
+            assert (rep in components.sources) == (C.in_degree(c) == 0)
+        rep = components.find(v)
+        expected = [
+            e
+            for e in range(len(src))
+            if mapping[dst[e]] == mapping[v] and mapping[src[e]] != mapping[v]
+        ]
+        assert components.entering_arcs(rep, src) == expected
+
+
+def random_laminar_family(rng: random.Random, vertices: list) -> list:
+    # Split the vertices recursively, keeping each part with some probability
+    sets = []
+    stack = [vertices]
+    while stack:
+        part = stack.pop()
+        if rng.random() < 0.7:
+            sets.append(set(part))
+        if len(part) > 1:
+            cut = rng.randrange(1, len(part))
+            stack += [part[:cut], part[cut:]]
+    rng.shuffle(sets)
+    return sets
+
+
+def test_laminar_forest_entering_counts_match_brute_force():
+    rng = random.Random(5)
+    for _ in range(20):
+        n = 30
+        vertices = list(range(n))
+        rng.shuffle(vertices)
+        sets = random_laminar_family(rng, vertices[: rng.randint(1, n)])
+        forest = LaminarForest(sets)
+        for k, p in enumerate(forest.parent):
+            smallest = min(
+                (j for j, Y in enumerate(sets) if j != k and sets[k] <= Y),
+                key=lambda j: len(sets[j]),
+                default=NIL,
+            )
+            assert p == NIL if smallest == NIL else sets[p] == sets[smallest]
+        arcs = [(rng.randrange(n), rng.randrange(n)) for _ in range(60)]
+        assert forest.entering_counts(arcs) == [
+            sum(1 for u, v in arcs if v in X and u not in X) for X in sets
+        ]
+
+
+def test_laminar_sigma_members():
+    sigma = LaminarSigma()
+    a = sigma.append((0, 1), 2, 1, vertex=1)
+    b = sigma.append((1, 2), 3, 1, vertex=2)
+    c = sigma.append((0, 3), 1, 1, vertex=3)
+    ab = sigma.append((3, 1), 1, 2, children=[a, b])
+    sigma.append((0, 2), 4, 3, children=[ab, c])
+    assert sigma.tuples() == [
+        ((0, 1), {1}, 2),
+        ((1, 2), {2}, 3),
+        ((0, 3), {3}, 1),
+        ((3, 1), {1, 2}, 1),
+        ((0, 2), {1, 2, 3}, 4),
+    ]
+    assert sigma.parent == [ab, ab, 4, 4, NIL]
+    assert sigma.leaf == {1: a, 2: b, 3: c}
+
+
+def test_laminar_sigma_matches_list_sigma():
+    for seed in range(10):
+        D = build_rooted_digraph_np(40, 120, 0, PESO_MIN, PESO_MAX, "random", seed=seed)
+        sigma = phase1(D, 0, boilerplate=False)
+        tuples = sigma.tuples()
+        assert list(sigma) == tuples
+        for k, (arc, X, z) in enumerate(tuples):
+            assert (arc, z) == (sigma.arc[k], sigma.z[k])
+            assert len(X) == sigma.size[k]
+            if sigma.vertex[k] is not None:
+                assert X == {sigma.vertex[k]}
+            else:
+                assert X == set().union(*(tuples[c][1] for c in sigma.children[k]))
+        # The same forest as the list form, and the same dual check
+        forest = LaminarForest(X for _, X, _ in tuples)
+        assert forest.parent == sigma.parent
+        A = phase2(D, 0, list(sigma.arc), boilerplate=False, linear=True)
+        assert forest.entering_counts(D.edges) == sigma.entering_counts(D.edges)
+        assert check_dual_optimality_condition(A, tuples, boilerplate=False)
+        assert check_dual_optimality_condition(A, sigma, boilerplate=False)
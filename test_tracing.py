@@ -0,0 +1,108 @@
+"""Unit tests for the trace event sinks (tracing.py)."""
+
+import ast
+import inspect
+import sys
+
+import networkx as nx
+import pytest
+
+import andrasfrank
+import chuliu
+from andrasfrank import andras_frank_algorithm
+from chuliu import chuliu_edmonds
+from tests import PESO_MAX, PESO_MIN, build_rooted_digraph_np
+import tracing
+from tracing import (
+    AF_DRAW_SCC,
+    LogSink,
+    RecordingSink,
+    _TraceStripper,
+    get_sink,
+    load_untraced,
+)
+
+
+def instance():
+    return build_rooted_digraph_np(15, 45, 0, PESO_MIN, PESO_MAX, "cycles", seed=3)
+
+
+def run_solvers(**kwargs):
+    chuliu_edmonds(instance(), 0, **kwargs)
+    andras_frank_algorithm(instance(), **kwargs)
+
+
+@pytest.mark.parametrize("lang", ("en", "pt"))
+def test_replay_matches_live_log(lang):
+    live_lines, live_drawings = [], []
+    run_solvers(
+        log=live_lines.append,
+        draw_fn=lambda G, title: live_drawings.append((title, sorted(G.edges(data="w")))),
+        lang=lang,
+    )
+
+    recording = RecordingSink()
+    run_solvers(trace=recording, lang=lang)
+    lines, drawings = [], []
+    recording.replay(
+        LogSink(
+            lines.append,
+            lambda G, title: drawings.append((title, sorted(G.edges(data="w")))),
+            lang,
+        )
+    )
+    assert live_lines and live_drawings
+    assert lines == live_lines
+    assert drawings == live_drawings
+
+
+def test_snapshot_keeps_the_recorded_state():
+    G = nx.DiGraph([(0, 1)])
+    parent = {1: 0}
+    recording = RecordingSink()
+    recording(1, G, parent)
+    by_reference = RecordingSink(snapshot=False)
+    by_reference(1, G, parent)
+    G.add_edge(1, 2)
+    parent[2] = 1
+    (_, (G_copy, parent_copy)), = recording.events
+    assert list(G_copy.edges) == [(0, 1)]
+    assert parent_copy == {1: 0}
+    (_, (G_ref, parent_ref)), = by_reference.events
+    assert G_ref is G and parent_ref is parent
+
+
+def test_get_sink():
+    sink = RecordingSink()
+    assert get_sink({"trace": sink, "boilerplate": False}) is sink
+    assert get_sink({"log": print, "boilerplate": False}) is None
+    assert get_sink({}) is None
+    assert isinstance(get_sink({"log": print}), LogSink)
+
+
+def test_condensation_only_when_drawing(monkeypatch):
+    calls = []
+    monkeypatch.setitem(
+        tracing.VIEWS, AF_DRAW_SCC, lambda G: calls.append(G) or nx.condensation(G)
+    )
+    andras_frank_algorithm(instance(), log=lambda line: None)
+    assert calls == []
+    drawings = []
+    andras_frank_algorithm(instance(), draw_fn=lambda G, title: drawings.append(title))
+    assert calls and len(calls) == sum("D_zero -" in title for title in drawings)
+
+
+def test_untraced_modules_match_the_solvers():
+    untraced = load_untraced()
+    assert sys.modules["chuliu"] is chuliu and sys.modules["andrasfrank"] is andrasfrank
+    for module in untraced.values():
+        tree = _TraceStripper().visit(ast.parse(inspect.getsource(module)))
+        names = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+        assert "trace" not in names
+    D = instance()
+    for engine in ("cle", "iterative", "tarjan"):
+        expected = chuliu_edmonds(D, 0, engine=engine, boilerplate=False)
+        A = untraced["chuliu"].chuliu_edmonds(D, 0, engine=engine, boilerplate=False)
+        assert list(A.edges(data="w")) == list(expected.edges(data="w"))
+    expected = andrasfrank.phase1(D, 0, boilerplate=False)
+    assert untraced["andrasfrank"].phase1(D, 0, boilerplate=False).tuples() == expected.tuples()
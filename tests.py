@@ -1,13 +1,16 @@
 import csv
+import gc
 import os
 import random
 import time
 import traceback
 import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from typing import Optional, Callable, Dict, Tuple
 
 import networkx as nx
+import numpy as np
 
 from andrasfrank import (
     phase1,
@@ -15,7 +18,11 @@ from andrasfrank import (
     phase2_v2,
     check_dual_optimality_condition,
 )
-from chuliu import chuliu_edmonds, remove_in_edges_to
+from chuliu import ENGINES, chuliu_edmonds, remove_in_edges_to
+from corpus import list_instances, load_instance
+from csr import CSRDigraph
+from structures import LaminarSigma
+from tracing import LogSink, RecordingSink, load_untraced
 
 # Default parameters
 NUM_TESTS = 2000
@@ -27,9 +34,27 @@ LOG_CSV_PATH = "test_results.csv"
 LOG_TXT_PATH = "test_log.txt"
 ROOT = 0
 LANG = "pt"  # Change to "en" for English logs
+ENGINE = "cle"  # Chu-Liu/Edmonds engine: cle | iterative | tarjan
+CSR = False  # Convert each instance once to a CSRDigraph before running the solvers
+BATCH = False  # Contract every cycle of D_zero per level (engines cle | iterative)
+FRANK_ENGINE = "index"  # András Frank phase 1 engine: index | heap | batch
+LINEAR_PHASE2 = False  # Run András Frank phase 2 in a single scan of F
+V2_QUEUE = "heap"  # András Frank phase2_v2 queue: heap | bucket
+WORKERS = 1  # Number of processes running the tests
+SEED = None  # Master seed of the tests; None draws a new one per run
+GENERATOR = "python"  # Instance generator: python | numpy
+CORPUS = None  # Directory of a corpus built by corpus.py; None generates the instances
 
 # Instance family configuration
-FAMILY = "random"  # options: random | dense | sparse | layered
+FAMILY = "random"  # options: random | dense | sparse | layered | cycles | nested | grid | powerlaw | chain
+FAMILIES = ("random", "dense", "sparse", "layered")
+# Structured families that force deep nested contractions
+ADVERSARIAL_FAMILIES = ("cycles", "nested", "grid", "powerlaw", "chain")
+# Families whose contraction depth grows linearly with n, beyond the recursion
+# limit of the recursive cle on a DiGraph
+DEEP_FAMILIES = ("nested", "grid", "chain")
+ENGINE_COMPARISON_CSV_PATH = "engine_comparison.csv"
+TRACING_CSV_PATH = "tracing_benchmark.csv"
 
 @dataclass
 class TestMetrics:
@@ -44,7 +69,7 @@ class TestMetrics:
     dual_frank_v1: Optional[bool] = None
     dual_frank_v2: Optional[bool] = None
     chu_metrics: Dict = field(
-        default_factory=lambda: {"contractions": 0, "max_depth": 0}
+        default_factory=lambda: {"contractions": 0}
     )
     frank_metrics: Dict = field(
         default_factory=lambda: {
@@ -55,6 +80,8 @@ class TestMetrics:
         }
     )
     peak_kb: Optional[int] = None  # pico de memória em KB
+    seed: Optional[int] = None  # semente do teste
+    family: Optional[str] = None  # família da instância do corpus
     success: bool = False
     erro: str = ""
 
@@ -76,6 +103,21 @@ class TestConfig:
     log: Optional[Callable] = None
     boilerplate: bool = True
     lang: str = LANG
+    engine: str = ENGINE  # motor do Chu-Liu/Edmonds
+    csr: bool = CSR  # resolve sobre CSRDigraph
+    batch: bool = BATCH  # contrai todos os ciclos de D_zero por nível
+    frank_engine: str = FRANK_ENGINE  # motor da fase 1 de András Frank
+    linear_phase2: bool = LINEAR_PHASE2  # fase 2 com uma única varredura de F
+    v2_queue: str = V2_QUEUE  # fila da fase 2 v2
+    workers: int = WORKERS  # processos executando os testes
+    seed: Optional[int] = SEED  # semente mestra
+    generator: str = GENERATOR  # gerador das instâncias
+    corpus: Optional[str] = CORPUS  # diretório do corpus
+
+
+def derive_test_seed(master_seed: Optional[int], test_num: int) -> int:
+    """Seed of test #test_num, derived only from the master seed and test_num."""
+    return random.Random(f"{master_seed}:{test_num}").getrandbits(32)
 
 
 def log_console_and_file(msg: str, log_txt_path: str = LOG_TXT_PATH) -> None:
@@ -94,6 +136,11 @@ def get_edge_count_for_family(n: int, family: str, m: Optional[int] = None) -> i
         "sparse": max(n, int(1.2 * n)),
         "layered": 2 * n,
         "random": 2 * n,
+        "cycles": 2 * n,
+        "nested": 2 * n,
+        "grid": 4 * n,
+        "powerlaw": 3 * n,
+        "chain": 3 * n,
     }
     return edge_counts.get(family, 2 * n)
 
@@ -115,13 +162,19 @@ def build_rooted_digraph(
         - root: label of root vertex (default: ROOT)
         - peso_min: minimum edge weight (default: PESO_MIN)
         - peso_max: maximum edge weight (default: PESO_MAX)
-        - family: graph family type (default: "random")
+        - family: graph family type (default: "random"); the families of
+          ADVERSARIAL_FAMILIES are built by _adversarial_arcs
 
     Returns:
         - D: directed graph (DiGraph)
     """
     m = get_edge_count_for_family(n, family, m)
 
+    if family in ADVERSARIAL_FAMILIES:
+        rng = np.random.default_rng(random.getrandbits(32))
+        src, dst, w = _adversarial_arcs(n, m, peso_min, peso_max, family, rng)
+        return _digraph_from_arcs([root] + list(range(1, n)), src, dst, w)
+
     D = nx.DiGraph()
     D.add_node(root)
     nodes = list(range(1, n))
@@ -211,6 +264,307 @@ def _build_random_graph(
             D.add_edge(u, v, w=random.randint(peso_min, peso_max))
 
 
+def _sample_arc_keys(
+    n: int,
+    count: int,
+    taken: np.ndarray,
+    rng: np.random.Generator,
+    tail_p: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Sample count distinct arcs u -> v (u != v) of an n-vertex digraph that are
+    not in taken. An arc is encoded as the key u * n + v.
+
+    Parameters:
+        - n: number of vertices
+        - count: number of arcs to sample (capped at the free pairs)
+        - taken: sorted keys of the arcs already in the graph
+        - rng: NumPy random generator
+        - tail_p: probability of each vertex being the tail (default: uniform);
+          ignored near complete density
+
+    Returns:
+        - keys: the sampled keys, in random order
+    """
+    free = n * (n - 1) - len(taken)
+    count = min(count, free)
+    if count <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    # Near complete: draw from the free pairs directly instead of rejecting
+    if 2 * count > free:
+        keys = np.arange(n * n, dtype=np.int64)
+        keys = keys[keys // n != keys % n]
+        keys = np.setdiff1d(keys, taken, assume_unique=True)
+        return rng.choice(keys, size=count, replace=False)
+
+    # Sparse enough: draw batches, drop loops and repeated arcs, repeat
+    chosen = np.empty(0, dtype=np.int64)
+    while len(chosen) < count:
+        missing = count - len(chosen)
+        batch = missing + missing // 4 + 16
+        if tail_p is None:
+            u = rng.integers(0, n, size=batch, dtype=np.int64)
+        else:
+            u = rng.choice(n, size=batch, p=tail_p)
+        v = rng.integers(0, n, size=batch, dtype=np.int64)
+        keys = np.unique((u * n + v)[u != v])
+        keys = np.setdiff1d(keys, taken, assume_unique=True)
+        keys = np.setdiff1d(keys, chosen, assume_unique=True)
+        chosen = np.concatenate([chosen, rng.permutation(keys)[:missing]])
+    return chosen
+
+
+def _random_tree_keys(n: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Keys u * n + v of a random spanning arborescence rooted at id 0: the k-th
+    vertex of a random order hangs from one of the k vertices before it, as in
+    the reached set of build_rooted_digraph.
+    """
+    order = np.concatenate([[0], rng.permutation(np.arange(1, n, dtype=np.int64))])
+    k = np.arange(1, n)
+    parent = order[(rng.random(n - 1) * k).astype(np.int64)]
+    return parent * n + order[1:]
+
+
+def _ring_levels(count: int, k: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Nested rings over the positions 0..count-1. Level 1 closes every run of k
+    consecutive positions into a ring; level l closes every run of k level
+    l-1 groups into a ring, linking the last position of each group to the
+    first position of the next one, until a single group remains.
+
+    Returns:
+        - tail, head: positions of every ring arc
+        - level: level of every ring arc (1, 2, ...)
+    """
+    tails, heads, levels = [], [], []
+    size, level = 1, 1
+    while size < count:
+        group = size * k
+        starts = np.arange(0, count, size, dtype=np.int64)
+        owner = starts // group
+        j = np.arange(len(starts))
+        last = (j + 1 == len(starts)) | (owner[np.minimum(j + 1, len(starts) - 1)] != owner)
+        nxt = np.where(last, owner * group // size, j + 1)
+        ring = nxt != j
+        tails.append(np.minimum(starts + size, count)[ring] - 1)
+        heads.append(starts[nxt[ring]])
+        levels.append(np.full(ring.sum(), level, dtype=np.int64))
+        size, level = group, level + 1
+    if not tails:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    return np.concatenate(tails), np.concatenate(heads), np.concatenate(levels)
+
+
+def _adversarial_arcs(
+    n: int,
+    m: int,
+    peso_min: int,
+    peso_max: int,
+    family: str,
+    rng: np.random.Generator,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Arcs of a structured instance over the ids 0..n-1, root at id 0. Every
+    vertex is reachable from the root.
+
+        - cycles: rings of about sqrt(n) vertices joined by one outer ring
+          (two levels of contraction)
+        - nested: rings of 3, rings of 3 rings, ... with weights growing by
+          level (about log3 n levels of contraction)
+        - chain: root -> 1 -> 2 -> ... with back arcs i+1 -> i; the cheapest
+          arcs close 1 <-> 2, then each supernode with the next vertex, so
+          there are n - 2 nested contractions
+        - grid: a square grid with arcs both ways between neighbours
+        - powerlaw: a random spanning tree plus arcs whose tails follow a
+          Zipf law, so a few hubs have most of the out-degree
+
+    The weights of cycles, nested and chain grow from peso_min by level and
+    their extra arcs (up to m) are heavier than every structural arc, so the
+    contraction order does not depend on the weight range. grid and powerlaw
+    draw every weight from [peso_min, peso_max].
+
+    Returns:
+        - src, dst: tail and head ids of every arc
+        - w: weight of every arc
+    """
+    count = n - 1
+    if count <= 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    if family in ("cycles", "nested"):
+        k = 3 if family == "nested" else max(2, int(np.ceil(np.sqrt(count))))
+        tail, head, level = _ring_levels(count, k)
+        depth = int(level.max(initial=0))
+        src = np.concatenate([[0], tail + 1])
+        dst = np.concatenate([[1], head + 1])
+        w = np.concatenate([[peso_min + depth + 2], peso_min + level - 1])
+    elif family == "chain":
+        ids = np.arange(1, n, dtype=np.int64)
+        src = np.concatenate([[0], ids[:-1], ids[1:]])
+        dst = np.concatenate([[1], ids[1:], ids[:-1]])
+        w = np.concatenate(
+            [
+                [peso_min + n + 1],
+                np.full(count - 1, peso_min, dtype=np.int64),
+                np.full(count - 1, peso_min + 1, dtype=np.int64),
+            ]
+        )
+    elif family == "grid":
+        side = max(1, int(np.ceil(np.sqrt(count))))
+        p = np.arange(count, dtype=np.int64)
+        right = p[(p % side != side - 1) & (p + 1 < count)]
+        down = p[p + side < count]
+        a = np.concatenate([right, down])
+        b = np.concatenate([right + 1, down + side])
+        src = np.concatenate([[0], a + 1, b + 1])
+        dst = np.concatenate([[1], b + 1, a + 1])
+        w = rng.integers(peso_min, peso_max + 1, size=len(src), dtype=np.int64)
+    else:  # powerlaw
+        keys = np.unique(_random_tree_keys(n, rng))
+        tail_p = np.empty(n)
+        tail_p[rng.permutation(n)] = 1.0 / np.arange(1, n + 1)
+        tail_p /= tail_p.sum()
+        keys = np.concatenate(
+            [keys, _sample_arc_keys(n, m - len(keys), keys, rng, tail_p)]
+        )
+        src, dst = keys // n, keys % n
+        w = rng.integers(peso_min, peso_max + 1, size=len(keys), dtype=np.int64)
+        return src, dst, w
+
+    src, dst, w = src.astype(np.int64), dst.astype(np.int64), w.astype(np.int64)
+
+    # Fill up to m arcs; extra arcs on the rings and the chain are heavier
+    # than every structural arc
+    if family == "grid":
+        low, high = peso_min, peso_max
+    else:
+        low = 2 * int(w.max())
+        high = low + peso_max - peso_min
+    keys = src * n + dst
+    order = np.argsort(keys, kind="stable")
+    extra = _sample_arc_keys(n, m - len(keys), keys[order], rng)
+    src = np.concatenate([src, extra // n])
+    dst = np.concatenate([dst, extra % n])
+    w = np.concatenate(
+        [w, rng.integers(low, high + 1, size=len(extra), dtype=np.int64)]
+    )
+    return src, dst, w
+
+
+def build_rooted_arcs(
+    n: int = MIN_VERTICES,
+    m: Optional[int] = None,
+    peso_min: int = PESO_MIN,
+    peso_max: int = PESO_MAX,
+    family: str = "random",
+    seed: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized version of build_rooted_digraph: sample the arcs of an instance
+    of the family as arrays over the vertex ids 0..n-1, with the root at id 0.
+    The spanning tree and the extra arcs are drawn in bulk, so the running time
+    is O((n + m) log m) instead of O(n^2).
+
+    Parameters:
+        - n: number of vertices (default: MIN_VERTICES)
+        - m: number of edges (default: computed based on family)
+        - peso_min: minimum edge weight (default: PESO_MIN)
+        - peso_max: maximum edge weight (default: PESO_MAX)
+        - family: graph family type (default: "random")
+        - seed: seed of the NumPy generator (default: None)
+
+    Returns:
+        - src, dst: tail and head ids of every arc
+        - w: weight of every arc
+    """
+    m = get_edge_count_for_family(n, family, m)
+    rng = np.random.default_rng(seed)
+    if family in ADVERSARIAL_FAMILIES:
+        return _adversarial_arcs(n, m, peso_min, peso_max, family, rng)
+
+    keys = _random_tree_keys(n, rng)
+
+    if family == "layered":
+        # Layers of the vertices 1..n-1 by i % 3; the root reaches all of layer 0
+        ids = np.arange(1, n, dtype=np.int64)
+        layers = [ids[i::3] for i in range(3)]
+        keys = np.union1d(keys, layers[0])
+
+        # Each pair of consecutive layers is taken with probability 1/2, in
+        # row order, until there are m arcs
+        for layer in range(2):
+            tails, heads = layers[layer], layers[layer + 1]
+            if len(heads) == 0:
+                break
+            rows = 2 * max(0, m - len(keys)) // len(heads) + 1
+            start = 0
+            while len(keys) < m and start < len(tails):
+                block = tails[start:start + rows]
+                start += rows
+                hit = rng.random((len(block), len(heads))) < 0.5
+                pairs = (block[:, None] * n + heads[None, :])[hit]
+                pairs = pairs[~np.isin(pairs, keys, assume_unique=True)]
+                keys = np.union1d(keys, pairs[: m - len(keys)])
+    else:
+        keys = np.unique(keys)
+
+    extra = _sample_arc_keys(n, m - len(keys), keys, rng)
+    keys = np.concatenate([keys, extra])
+    src, dst = keys // n, keys % n
+    w = rng.integers(peso_min, peso_max + 1, size=len(keys), dtype=np.int64)
+    return src, dst, w
+
+
+def build_rooted_digraph_np(
+    n: int = MIN_VERTICES,
+    m: Optional[int] = None,
+    root: int = ROOT,
+    peso_min: int = PESO_MIN,
+    peso_max: int = PESO_MAX,
+    family: str = "random",
+    **kwargs,
+) -> nx.DiGraph | CSRDigraph:
+    """
+    Create a directed graph with n vertices and m edges with build_rooted_arcs,
+    labelled as build_rooted_digraph labels it (root, 1, ..., n-1).
+
+    Parameters:
+        - n, m, root, peso_min, peso_max, family: as in build_rooted_digraph
+        - **kwargs: Additional parameters:
+            - seed: seed of the NumPy generator (default: None)
+            - csr: If True, return a CSRDigraph without the arcs entering the
+              root, skipping networkx entirely (default: False)
+
+    Returns:
+        - D: directed graph (DiGraph or CSRDigraph)
+    """
+    src, dst, w = build_rooted_arcs(
+        n, m, peso_min, peso_max, family, seed=kwargs.get("seed", None)
+    )
+    nodes = [root] + list(range(1, n))
+    if kwargs.get("csr", False):
+        keep = dst != 0
+        return CSRDigraph(nodes, src[keep], dst[keep], w[keep])
+
+    return _digraph_from_arcs(nodes, src, dst, w)
+
+
+def _digraph_from_arcs(
+    nodes: list, src: np.ndarray, dst: np.ndarray, w: np.ndarray
+) -> nx.DiGraph:
+    """Build a DiGraph from arc arrays over positions of nodes, in one pass."""
+    labels = np.array(nodes, dtype=object)
+    D = nx.DiGraph()
+    D.add_nodes_from(nodes)
+    D.add_weighted_edges_from(
+        zip(labels[src].tolist(), labels[dst].tolist(), w.tolist()), weight="w"
+    )
+    return D
+
+
 def contains_arborescence(D: nx.DiGraph, r: int) -> Tuple[bool, nx.DiGraph]:
     """Check if graph contains an arborescence with root r."""
     tree = nx.dfs_tree(D, source=r)
@@ -228,6 +582,11 @@ def get_edge_count_range(n: int, family: str) -> Tuple[int, int]:
         "dense": (3 * n, min(n * (n - 1), 6 * n)),
         "sparse": (n - 1, int(1.5 * n)),
         "layered": (2 * n, 3 * n),
+        "cycles": (n, 3 * n),
+        "nested": (n, 3 * n),
+        "grid": (4 * n, 5 * n),
+        "powerlaw": (2 * n, 4 * n),
+        "chain": (2 * n, 4 * n),
     }
     return ranges.get(family, (n, 3 * n))
 
@@ -258,7 +617,11 @@ def initialize_csv_log(log_csv_path: str) -> None:
                 "D0_nodes",
                 "Dual_count",
                 "Fase1_iter",
+                "Fila_v2",
+                "V2_pushes",
+                "V2_pops",
                 "PeakMem_kB",
+                "Seed",
                 "Sucesso",
                 "Erro",
                 "Total_sucessos",
@@ -302,12 +665,16 @@ def write_test_result(
                 metrics.dual_frank_v1,
                 metrics.dual_frank_v2,
                 metrics.chu_metrics.get("contractions"),
-                metrics.chu_metrics.get("max_depth"),
+                metrics.chu_metrics.get("max_depth", "-"),
                 metrics.frank_metrics.get("d0_edges"),
                 metrics.frank_metrics.get("d0_nodes"),
                 metrics.frank_metrics.get("dual_count"),
                 metrics.frank_metrics.get("phase1_iterations"),
+                metrics.frank_metrics.get("phase2_v2_queue"),
+                metrics.frank_metrics.get("phase2_v2_pushes"),
+                metrics.frank_metrics.get("phase2_v2_pops"),
                 metrics.peak_kb,
+                metrics.seed,
                 "OK" if metrics.success else "FAIL",
                 metrics.erro,
                 success_count,
@@ -319,7 +686,7 @@ def write_test_result(
 
 
 def run_chuliu_algorithm(
-    D: nx.DiGraph,
+    D: nx.DiGraph | CSRDigraph,
     r: int,
     config: TestConfig,
     chu_metrics: Dict,
@@ -334,17 +701,19 @@ def run_chuliu_algorithm(
         boilerplate=config.boilerplate,
         metrics=chu_metrics,
         lang=config.lang,
+        engine=config.engine,
+        batch=config.batch,
     )
     t_elapsed = time.perf_counter() - t1
     return arbo, t_elapsed
 
 
 def run_frank_phase1(
-    D: nx.DiGraph,
+    D: nx.DiGraph | CSRDigraph,
     r: int,
     config: TestConfig,
     frank_metrics: Dict,
-) -> Tuple[list, list, float, int]:
+) -> Tuple[list, LaminarSigma, float, int]:
     """Run András Frank Phase 1 with memory tracking."""
     tracemalloc.start()
     t1 = time.perf_counter()
@@ -356,8 +725,9 @@ def run_frank_phase1(
         boilerplate=config.boilerplate,
         lang=config.lang,
         metrics=frank_metrics,
+        engine=config.frank_engine,
     )
-    F = [a for a, _, _ in sigma]
+    F = list(sigma.arc)
     t_elapsed = time.perf_counter() - t1
     current, peak = tracemalloc.get_traced_memory()
     tracemalloc.stop()
@@ -366,11 +736,12 @@ def run_frank_phase1(
 
 
 def run_frank_phase2(
-    D: nx.DiGraph,
+    D: nx.DiGraph | CSRDigraph,
     r: int,
     F: list,
     config: TestConfig,
     use_v2: bool = False,
+    frank_metrics: Optional[Dict] = None,
 ) -> Tuple[nx.DiGraph, float]:
     """Run András Frank Phase 2 (v1 or v2)."""
     phase_func = phase2_v2 if use_v2 else phase2
@@ -383,6 +754,9 @@ def run_frank_phase2(
         log=None,
         boilerplate=config.boilerplate,
         lang=config.lang,
+        linear=config.linear_phase2,
+        queue=config.v2_queue,
+        metrics=frank_metrics,
     )
     t_elapsed = time.perf_counter() - t1
     return arbo, t_elapsed
@@ -392,7 +766,7 @@ def verify_algorithms(
     arbo_chuliu: nx.DiGraph,
     arbo_frank_v1: nx.DiGraph,
     arbo_frank_v2: nx.DiGraph,
-    sigma: list,
+    sigma: LaminarSigma,
     config: TestConfig,
 ) -> Tuple[float, float, float, bool, bool]:
     """Verify both algorithms and check dual conditions."""
@@ -408,7 +782,7 @@ def verify_algorithms(
         custo_chuliu == custo_frank_v2
     ), f"\n x Custos diferentes! Chu-Liu: {custo_chuliu}, Frank v2: {custo_frank_v2}"
 
-    # Check dual conditions
+    # Check dual conditions; sigma is already a laminar forest
     dual_v1 = check_dual_optimality_condition(
         arbo_frank_v1,
         sigma,
@@ -468,32 +842,67 @@ def run_single_test(
     test_num: int,
     config: TestConfig,
 ) -> Tuple[TestMetrics, int, int, float]:
-    """Run a single test iteration."""
+    """Run a single test iteration, drawing from its own seed."""
     metrics = TestMetrics()
+    metrics.seed = derive_test_seed(config.seed, test_num)
+    instance = None
+    if config.corpus is not None:
+        # Stored instance #test_num, mapped from disk
+        instance = load_instance(list_instances(config.corpus)[test_num - 1])
+        metrics.seed = instance["seed"]
+        metrics.family = instance["family"]
+        n, m = instance["n"], instance["m"]
+    else:
+        random.seed(metrics.seed)
 
-    # Generate graph parameters
-    n = random.randint(config.min_vertices, config.max_vertices)
-    min_edges, max_edges = get_edge_count_range(n, config.family)
-    m = random.randint(min_edges, max_edges)
+        # Generate graph parameters
+        n = random.randint(config.min_vertices, config.max_vertices)
+        min_edges, max_edges = get_edge_count_range(n, config.family)
+        m = random.randint(min_edges, max_edges)
 
     log_test_start(test_num, n, m, config)
 
     t0_total = time.perf_counter()
 
     try:
-        # Build graph
-        D = build_rooted_digraph(
-            n=n,
-            m=m,
-            root=config.r,
-            peso_min=config.peso_min,
-            peso_max=config.peso_max,
-            family=config.family,
-        )
-        D_copy = nx.DiGraph(D)
-
-        # Check if graph contains arborescence
-        has_arbo, tree = contains_arborescence(D_copy, config.r)
+        # Build graph; a corpus instance or the numpy generator can build the
+        # CSRDigraph directly, already without the arcs entering the root
+        direct_csr = (config.generator == "numpy" or instance is not None) and config.csr
+        nodes = [config.r] + list(range(1, n))
+        if instance is not None and direct_csr:
+            D = CSRDigraph(nodes, instance["src"], instance["dst"], instance["weight"])
+        elif instance is not None:
+            D = _digraph_from_arcs(
+                nodes, instance["src"], instance["dst"], instance["weight"]
+            )
+        elif config.generator == "numpy":
+            D = build_rooted_digraph_np(
+                n=n,
+                m=m,
+                root=config.r,
+                peso_min=config.peso_min,
+                peso_max=config.peso_max,
+                family=config.family,
+                seed=metrics.seed,
+                csr=direct_csr,
+            )
+        else:
+            D = build_rooted_digraph(
+                n=n,
+                m=m,
+                root=config.r,
+                peso_min=config.peso_min,
+                peso_max=config.peso_max,
+                family=config.family,
+            )
+
+        # Record the arcs actually built: the structural arcs of some families
+        # alone can exceed the requested m
+        m = len(D.src) if direct_csr else D.number_of_edges()
+
+        # Check if graph contains arborescence (the spanning tree of the
+        # generator guarantees one for a CSRDigraph built directly)
+        has_arbo = direct_csr or contains_arborescence(D, config.r)[0]
         if not has_arbo:
             if config.boilerplate and config.log:
                 msg = (
@@ -505,24 +914,30 @@ def run_single_test(
             return metrics, n, m, time.perf_counter() - t0_total
 
         # Remove edges to root
-        remove_in_edges_to(D_copy, config.r)
+        if not direct_csr:
+            remove_in_edges_to(D, config.r)
+
+        # Convert once; every solver below reads the same CSRDigraph
+        if config.csr and not direct_csr:
+            D = CSRDigraph.from_networkx(D)
 
         # Run Chu-Liu/Edmonds
         arbo_chuliu, metrics.t_chuliu = run_chuliu_algorithm(
-            D_copy, config.r, config, metrics.chu_metrics
+            D, config.r, config, metrics.chu_metrics
         )
 
         # Run András Frank Phase 1
         F, sigma, metrics.t_phase1, metrics.peak_kb = run_frank_phase1(
-            D_copy, config.r, config, metrics.frank_metrics
+            D, config.r, config, metrics.frank_metrics
         )
 
         # Run András Frank Phase 2 (both versions)
         arbo_frank_v1, metrics.t_phase2_v1 = run_frank_phase2(
-            D_copy, config.r, F, config, use_v2=False
+            D, config.r, F, config, use_v2=False
         )
         arbo_frank_v2, metrics.t_phase2_v2 = run_frank_phase2(
-            D_copy, config.r, F, config, use_v2=True
+            D, config.r, F, config, use_v2=True,
+            frank_metrics=metrics.frank_metrics,
         )
 
         # Verify results
@@ -573,12 +988,31 @@ def volume_tester(
         - peso_max: Maximum edge weight
         - log_csv_path: Path to CSV log file
         - log_txt_path: Path to text log file
-        - family: Instance family ("random", "dense", "sparse", "layered")
+        - family: Instance family ("random", "dense", "sparse", "layered", or
+          one of ADVERSARIAL_FAMILIES)
         - **kwargs: Additional parameters:
             - draw_fn: Optional drawing function
             - log: Optional logging function
             - boilerplate: If True, enables logging (default: True)
             - lang: Language for messages ("en" or "pt", default: "pt")
+            - engine: Chu-Liu/Edmonds engine (default: ENGINE); "cle" on a DiGraph
+              of one of DEEP_FAMILIES runs as "iterative"
+            - csr: If True, run the solvers on a CSRDigraph (default: CSR)
+            - batch: If True, contract every cycle of D_zero per level (default: BATCH)
+            - frank_engine: András Frank phase 1 engine (default: FRANK_ENGINE)
+            - linear_phase2: If True, run phase 2 in linear mode (default: LINEAR_PHASE2)
+            - v2_queue: Queue of phase2_v2, "heap" or "bucket" (default: V2_QUEUE)
+            - workers: Number of processes running the tests (default: WORKERS);
+              with more than one, log and draw_fn must be picklable
+            - seed: Master seed (default: SEED); test i draws from
+              derive_test_seed(seed, i), which the Seed column of the CSV records
+            - tests: Test numbers to run (default: 1..num_tests), e.g. [17]
+              with the same seed reruns test #17 alone
+            - generator: Instance generator, "python" (build_rooted_digraph) or
+              "numpy" (build_rooted_digraph_np) (default: GENERATOR)
+            - corpus: Directory of a corpus built by corpus.build_corpus (default:
+              CORPUS); test i runs its i-th instance, so every run and engine
+              reads the same arcs, and n, m, family and seed come from the file
     """
     # Create configuration
     config = TestConfig(
@@ -595,7 +1029,25 @@ def volume_tester(
         log=kwargs.get("log", None),
         boilerplate=kwargs.get("boilerplate", True),
         lang=kwargs.get("lang", LANG),
+        engine=kwargs.get("engine", ENGINE),
+        csr=kwargs.get("csr", CSR),
+        batch=kwargs.get("batch", BATCH),
+        frank_engine=kwargs.get("frank_engine", FRANK_ENGINE),
+        linear_phase2=kwargs.get("linear_phase2", LINEAR_PHASE2),
+        v2_queue=kwargs.get("v2_queue", V2_QUEUE),
+        workers=kwargs.get("workers", WORKERS),
+        seed=kwargs.get("seed", SEED),
+        generator=kwargs.get("generator", GENERATOR),
+        corpus=kwargs.get("corpus", CORPUS),
     )
+    if config.seed is None:
+        config.seed = random.SystemRandom().getrandbits(32)
+
+    # The recursive cle recurses once per contraction, so run the iterative
+    # driver on the deep families (the CSRDigraph path of cle is a loop)
+    deep = config.engine == "cle" and not config.csr and config.family in DEEP_FAMILIES
+    if deep:
+        config.engine = "iterative"
 
     # Initialize counters
     success_count = 0
@@ -610,47 +1062,70 @@ def volume_tester(
 
     # Initialize CSV
     initialize_csv_log(config.log_csv_path)
+    if config.boilerplate and config.log:
+        log_console_and_file(f"\n Seed: {config.seed}", config.log_txt_path)
+        if deep:
+            msg = (
+                f"\n Family {config.family} is too deep for the recursive cle; using the iterative engine."
+                if config.lang == "en"
+                else f"\n A família {config.family} é profunda demais para o cle recursivo; usando o motor iterative."
+            )
+            log_console_and_file(msg, config.log_txt_path)
+
+    # Run tests; a process pool may finish them out of order, but the results
+    # are read back and written in test order
+    if config.corpus is not None:
+        config.num_tests = min(config.num_tests, len(list_instances(config.corpus)))
+    numbers = list(kwargs.get("tests", range(1, config.num_tests + 1)))
+    executor = None
+    if config.workers > 1:
+        executor = ProcessPoolExecutor(max_workers=config.workers)
+        futures = [executor.submit(run_single_test, i, config) for i in numbers]
+        results = (future.result() for future in futures)
+    else:
+        results = (run_single_test(i, config) for i in numbers)
 
-    # Run tests
-    for i in range(1, config.num_tests + 1):
-        metrics, n, m, elapsed = run_single_test(i, config)
-
-        # Update counters
-        if metrics.success:
-            success_count += 1
-        else:
-            failure_count += 1
-            if metrics.custo_chuliu is not None and metrics.custo_frank_v1 is not None:
-                if metrics.custo_chuliu > metrics.custo_frank_v1:
-                    chuliu_greater_than_frank += 1
-                elif metrics.custo_frank_v1 > metrics.custo_chuliu:
-                    frank_greater_than_chuliu += 1
-
-        # Write results to CSV
-        write_test_result(
-            config.log_csv_path,
-            i,
-            config.family,
-            n,
-            m,
-            metrics,
-            elapsed,
-            success_count,
-            failure_count,
-            chuliu_greater_than_frank,
-            frank_greater_than_chuliu,
-        )
-
-        # Break on failure
-        if not metrics.success:
-            if config.boilerplate and config.log:
-                msg = (
-                    f"\nx Test #{i} failed. Stopping test execution."
-                    if config.lang == "en"
-                    else f"\nx Teste #{i} falhou. Interrompendo execução dos testes."
-                )
-                log_console_and_file(msg, config.log_txt_path)
-            break
+    try:
+        for i, (metrics, n, m, elapsed) in zip(numbers, results):
+            # Update counters
+            if metrics.success:
+                success_count += 1
+            else:
+                failure_count += 1
+                if metrics.custo_chuliu is not None and metrics.custo_frank_v1 is not None:
+                    if metrics.custo_chuliu > metrics.custo_frank_v1:
+                        chuliu_greater_than_frank += 1
+                    elif metrics.custo_frank_v1 > metrics.custo_chuliu:
+                        frank_greater_than_chuliu += 1
+
+            # Write results to CSV
+            write_test_result(
+                config.log_csv_path,
+                i,
+                metrics.family or config.family,
+                n,
+                m,
+                metrics,
+                elapsed,
+                success_count,
+                failure_count,
+                chuliu_greater_than_frank,
+                frank_greater_than_chuliu,
+            )
+
+            # Break on failure
+            if not metrics.success:
+                if config.boilerplate and config.log:
+                    msg = (
+                        f"\nx Test #{i} failed. Stopping test execution."
+                        if config.lang == "en"
+                        else f"\nx Teste #{i} falhou. Interrompendo execução dos testes."
+                    )
+                    log_console_and_file(msg, config.log_txt_path)
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
 
     # Log summary
     if config.boilerplate and config.log:
@@ -662,6 +1137,236 @@ def volume_tester(
         log_console_and_file(f"\n Custo Frank > ChuLiu: {frank_greater_than_chuliu}")
 
 
+
+def compare_engines(
+    num_tests: int = 20,
+    min_vertices: int = 200,
+    max_vertices: int = 200,
+    families: Tuple[str, ...] = FAMILIES,
+    engines: Tuple[str, ...] = tuple(ENGINES),
+    r: int = ROOT,
+    peso_min: int = PESO_MIN,
+    peso_max: int = PESO_MAX,
+    log_csv_path: str = ENGINE_COMPARISON_CSV_PATH,
+    batch: bool = BATCH,
+) -> Dict[Tuple[str, str], float]:
+    """
+    Check every Chu-Liu/Edmonds engine against the reference `cle` on every
+    instance family and record the cost and running time of each engine.
+
+    Parameters:
+        - num_tests: Number of instances per family
+        - min_vertices: Minimum number of vertices
+        - max_vertices: Maximum number of vertices
+        - families: Instance families to generate
+        - engines: Engines to compare with "cle"
+        - r: Root vertex
+        - peso_min: Minimum edge weight
+        - peso_max: Maximum edge weight
+        - log_csv_path: Path to CSV log file
+        - batch: If True, "cle" and "iterative" contract every cycle of D_zero
+          per level; compare the Contractions/MaxDepth columns of two runs
+
+    MaxDepth is the deepest contraction level, for the engines that contract
+    level by level ("cle", "iterative"); ForestDepth is the nesting depth of
+    the contracted super-vertices, for the engine that builds a contraction
+    forest ("tarjan"). An engine leaves the other column as "-".
+
+    Returns:
+        - total running time in seconds per (family, engine), including "cle"
+    """
+    totals: Dict[Tuple[str, str], float] = {}
+
+    with open(log_csv_path, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(
+            [
+                "Teste",
+                "Familia",
+                "Vertices",
+                "Arestas",
+                "Motor",
+                "Custo",
+                "Custo_cle",
+                "Tempo_s",
+                "Contractions",
+                "MaxDepth",
+                "ForestDepth",
+            ]
+        )
+
+        for family in families:
+            for i in range(1, num_tests + 1):
+                n = random.randint(min_vertices, max_vertices)
+                min_edges, max_edges = get_edge_count_range(n, family)
+                m = random.randint(min_edges, max_edges)
+                D = build_rooted_digraph(
+                    n=n,
+                    m=m,
+                    root=r,
+                    peso_min=peso_min,
+                    peso_max=peso_max,
+                    family=family,
+                )
+                remove_in_edges_to(D, r)
+
+                custo_cle = None
+                for engine in ("cle",) + tuple(engines):
+                    chu_metrics = {"contractions": 0}
+                    t1 = time.perf_counter()
+                    arbo = chuliu_edmonds(
+                        D,
+                        r,
+                        boilerplate=False,
+                        metrics=chu_metrics,
+                        engine=engine,
+                        batch=batch,
+                    )
+                    t_elapsed = time.perf_counter() - t1
+                    custo = get_total_digraph_cost(arbo)
+                    if custo_cle is None:
+                        custo_cle = custo
+
+                    writer.writerow(
+                        [
+                            i,
+                            family,
+                            n,
+                            D.number_of_edges(),
+                            engine,
+                            custo,
+                            custo_cle,
+                            round(t_elapsed, 6),
+                            chu_metrics["contractions"],
+                            chu_metrics.get("max_depth", "-"),
+                            chu_metrics.get("forest_depth", "-"),
+                        ]
+                    )
+                    totals[(family, engine)] = (
+                        totals.get((family, engine), 0.0) + t_elapsed
+                    )
+
+                    assert (
+                        arbo.number_of_nodes() == n and nx.is_arborescence(arbo)
+                    ), f"\n x Motor {engine} não retornou uma arborescência geradora."
+                    assert (
+                        custo == custo_cle
+                    ), f"\n x Custos diferentes! cle: {custo_cle}, {engine}: {custo}"
+
+    return totals
+
+def benchmark_tracing(
+    num_tests: int = 10,
+    min_vertices: int = 300,
+    max_vertices: int = 300,
+    family: str = FAMILY,
+    engine: str = ENGINE,
+    r: int = ROOT,
+    peso_min: int = PESO_MIN,
+    peso_max: int = PESO_MAX,
+    log_csv_path: str = TRACING_CSV_PATH,
+    log_txt_path: str = LOG_TXT_PATH,
+) -> Dict[Tuple[str, str], float]:
+    """
+    Measure what the trace events cost the solvers. Each instance is solved by
+    chuliu_edmonds and by phase1 in four modes:
+        - "stripped": boilerplate=False on copies of the solver modules with
+          every trace site removed (tracing.load_untraced), the build with no
+          logging at all
+        - "off": boilerplate=False, so no sink is built
+        - "recording": events kept by a RecordingSink, nothing formatted
+        - "log": events rendered by a LogSink into a no-op log function
+    Each mode is reported with its overhead over "stripped"; the overhead of
+    "off" is what the event sites cost a run without a sink.
+
+    Parameters:
+        - num_tests: Number of instances
+        - min_vertices: Minimum number of vertices
+        - max_vertices: Maximum number of vertices
+        - family: Instance family to generate
+        - engine: Chu-Liu/Edmonds engine
+        - r: Root vertex
+        - peso_min: Minimum edge weight
+        - peso_max: Maximum edge weight
+        - log_csv_path: Path to CSV log file, one row per (solver, mode)
+        - log_txt_path: Path to text log file
+
+    Returns:
+        - total running time in seconds per (solver, mode)
+    """
+    totals: Dict[Tuple[str, str], float] = {}
+    events: Dict[str, int] = {}
+    untraced = load_untraced()
+    solvers = {
+        "chuliu": (chuliu_edmonds, untraced["chuliu"].chuliu_edmonds),
+        "phase1": (phase1, untraced["andrasfrank"].phase1),
+    }
+
+    for i in range(1, num_tests + 1):
+        n = random.randint(min_vertices, max_vertices)
+        min_edges, max_edges = get_edge_count_range(n, family)
+        m = random.randint(min_edges, max_edges)
+        D = build_rooted_digraph(
+            n=n, m=m, root=r, peso_min=peso_min, peso_max=peso_max, family=family
+        )
+        remove_in_edges_to(D, r)
+
+        for solver, (traced, stripped) in solvers.items():
+            sink = RecordingSink(snapshot=False)
+            modes = (
+                ("stripped", stripped, {"boilerplate": False}),
+                ("off", traced, {"boilerplate": False}),
+                ("recording", traced, {"trace": sink}),
+                ("log", traced, {"trace": LogSink(log=lambda msg: None, lang=LANG)}),
+            )
+            # Rotate the order so that no mode always runs first on a cold instance
+            shift = i % len(modes)
+            for mode, run, kwargs in modes[shift:] + modes[:shift]:
+                if solver == "chuliu":
+                    kwargs["engine"] = engine
+                # Start each run from a clean heap, without collections
+                gc.collect()
+                gc.disable()
+                t1 = time.perf_counter()
+                try:
+                    run(D, r, lang=LANG, **kwargs)
+                    elapsed = time.perf_counter() - t1
+                finally:
+                    gc.enable()
+                totals[(solver, mode)] = totals.get((solver, mode), 0.0) + elapsed
+            events[solver] = events.get(solver, 0) + len(sink.events)
+
+    with open(log_csv_path, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(
+            [
+                "Solver",
+                "Modo",
+                "Tempo_total_s",
+                "Sobrecarga_vs_stripped",
+                "Eventos_por_instancia",
+            ]
+        )
+        for solver in solvers:
+            for mode in ("stripped", "off", "recording", "log"):
+                total = totals[(solver, mode)]
+                overhead = total / totals[(solver, "stripped")] - 1
+                writer.writerow(
+                    [
+                        solver,
+                        mode,
+                        round(total, 6),
+                        round(overhead, 4),
+                        round(events[solver] / num_tests),
+                    ]
+                )
+                log_console_and_file(
+                    f"\n {solver} {mode}: {total:.4f}s ({100 * overhead:+.1f}%), "
+                    f"{events[solver] / num_tests:.0f} eventos/instância",
+                    log_txt_path,
+                )
+    return totals
+
 if __name__ == "__main__":
     volume_tester(
         num_tests=NUM_TESTS,